@@ -0,0 +1,118 @@
+"""
+Columnar article storage for large backfills
+"""
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from keyword_scorer import Article
+
+# Articles per sealed text chunk; bounds the extra memory of joining texts
+TEXT_CHUNK_SIZE = 4096
+
+
+class ArticleBatch:
+    """
+    Memory-compact, column-oriented set of articles
+
+    Instead of one object per article, the batch keeps parallel arrays:
+    ids, titles and urls as lists, timestamps as int64, sources as int32
+    indices into a table of interned names, and the lowercase matching text
+    of every article (normalized title + content) packed into a few large
+    buffers addressed by offsets. KeywordScorer.score_batch_columns scans
+    those buffers directly.
+    """
+
+    def __init__(self, chunk_size: int = TEXT_CHUNK_SIZE):
+        self.chunk_size = max(1, chunk_size)
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.sources: List[str] = []
+        self._source_index: Dict[str, int] = {}
+        self._timestamps: List[int] = []
+        self._source_indices: List[int] = []
+        self._pending_texts: List[str] = []
+        self._frozen = False
+
+        self.timestamps: Optional[np.ndarray] = None
+        self.source_indices: Optional[np.ndarray] = None
+        # Sealed text buffers, the row of their first article and their offsets
+        self.text_chunks: List[str] = []
+        self.chunk_starts: List[int] = []
+        self.chunk_offsets: List[np.ndarray] = []
+
+    @classmethod
+    def from_articles(cls, articles: Iterable[Article], chunk_size: int = TEXT_CHUNK_SIZE) -> "ArticleBatch":
+        """Build a frozen batch from Article objects (or any iterable of them)"""
+        batch = cls(chunk_size)
+        for article in articles:
+            batch.append(article)
+        return batch.freeze()
+
+    def append(self, article: Article):
+        """Add one article; only allowed before freeze()"""
+        if self._frozen:
+            raise ValueError("ArticleBatch is frozen")
+
+        source = article.source if isinstance(article.source, str) else str(article.source)
+        source_index = self._source_index.get(source)
+        if source_index is None:
+            source_index = len(self.sources)
+            self._source_index[source] = source_index
+            self.sources.append(sys.intern(source))
+
+        self.ids.append(article.id)
+        self.titles.append(article.title)
+        self.urls.append(article.url)
+        self._timestamps.append(int(article.timestamp))
+        self._source_indices.append(source_index)
+        self._pending_texts.append(article.normalized_text)
+        if len(self._pending_texts) >= self.chunk_size:
+            self._seal_chunk()
+
+    def _seal_chunk(self):
+        """Pack pending texts into one buffer, each preceded by a newline"""
+        texts = self._pending_texts
+        if not texts:
+            return
+        # offsets[i] is the separator before text i, offsets[-1] the buffer length
+        lengths = np.fromiter((len(text) + 1 for text in texts), dtype=np.int64, count=len(texts))
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        self.chunk_starts.append(len(self.ids) - len(texts))
+        self.chunk_offsets.append(offsets)
+        self.text_chunks.append("\n" + "\n".join(texts))
+        self._pending_texts = []
+
+    def freeze(self) -> "ArticleBatch":
+        """Seal the last text chunk and pack the staged columns into arrays"""
+        if self._frozen:
+            return self
+
+        self._seal_chunk()
+        self.timestamps = np.array(self._timestamps, dtype=np.int64)
+        self.source_indices = np.array(self._source_indices, dtype=np.int32)
+        self._timestamps = []
+        self._source_indices = []
+        self._frozen = True
+        return self
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def iter_chunks(self) -> Iterator[Tuple[int, str, np.ndarray]]:
+        """Yield (first_row, text_buffer, offsets) for every sealed chunk"""
+        return zip(self.chunk_starts, self.text_chunks, self.chunk_offsets)
+
+    def text_at(self, index: int) -> str:
+        """Matching text of one article"""
+        chunk = int(np.searchsorted(self.chunk_starts, index, side="right")) - 1
+        offsets = self.chunk_offsets[chunk]
+        local = index - self.chunk_starts[chunk]
+        return self.text_chunks[chunk][offsets[local] + 1:offsets[local + 1]]
+
+    def source_at(self, index: int) -> str:
+        return self.sources[self.source_indices[index]]
@@ -0,0 +1,309 @@
+"""
+Local article store with a full-text index, for re-scoring and search
+without refetching from FreshRSS
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from keyword_matcher import KeywordMatcher
+from keyword_scorer import Article
+from metrics import METRICS
+from score_cache import content_hash
+from text_normalizer import normalize_for_matching
+
+# Stay well below SQLite's bound-parameter limit
+_SQL_CHUNK_SIZE = 500
+
+_WORD_RE = re.compile(r"\w")
+
+
+def fts_phrase(phrase: str) -> str:
+    """Quote a keyword as an FTS5 phrase query"""
+    return '"' + phrase.replace('"', '""') + '"'
+
+
+class ArticleStore:
+    """
+    SQLite table of fetched articles, deduplicated by Article.id, with an
+    FTS5 index over the same text KeywordScorer matches (title + content)
+
+    Upserts only touch the index when an article's text changed. Phrase
+    lookups use the index to find candidates and confirm them with the
+    KeywordMatcher, so results agree exactly with keyword scoring. Without
+    FTS5 in the SQLite build, lookups fall back to scanning every article.
+    """
+
+    # Columns read back into an Article, in constructor order
+    _COLUMNS = "id, title, content, url, source, timestamp, categories"
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or settings.article_store_file
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                doc_id INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                categories TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_timestamp ON articles(timestamp)")
+        self.fts_enabled = self._create_index()
+        self.conn.commit()
+
+    def _create_index(self) -> bool:
+        """FTS5 table over a title + content view, kept in sync by triggers"""
+        try:
+            self.conn.execute("""
+                CREATE VIEW IF NOT EXISTS articles_text AS
+                SELECT doc_id, title || ' ' || content AS text FROM articles
+            """)
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                    text, content='articles_text', content_rowid='doc_id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  Full-text index unavailable, falling back to scans: {e}")
+            return False
+
+        self.conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, text) VALUES (new.doc_id, new.title || ' ' || new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, text)
+                VALUES ('delete', old.doc_id, old.title || ' ' || old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles
+            WHEN old.content_hash IS NOT new.content_hash BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, text)
+                VALUES ('delete', old.doc_id, old.title || ' ' || old.content);
+                INSERT INTO articles_fts (rowid, text) VALUES (new.doc_id, new.title || ' ' || new.content);
+            END;
+        """)
+        return True
+
+    @staticmethod
+    def _row(article: Article, stored_at: float) -> Tuple:
+        return (
+            article.id, article.title or "", article.content or "", article.url or "", article.source or "",
+            int(article.timestamp or 0), json.dumps(list(article.categories)), content_hash(article), stored_at
+        )
+
+    @staticmethod
+    def _article(row: Tuple) -> Article:
+        article_id, title, content, url, source, timestamp, categories = row
+        return Article(
+            id=article_id, title=title, content=content, url=url, source=source,
+            timestamp=timestamp, categories=tuple(json.loads(categories))
+        )
+
+    def upsert(self, article: Article) -> bool:
+        """Insert or update one article; returns True if anything changed"""
+        return self.upsert_many([article]) > 0
+
+    @METRICS.timed("article_store_upsert_seconds")
+    def upsert_many(self, articles: Iterable[Article]) -> int:
+        """Insert new articles and update changed ones in one transaction; returns the number written"""
+        now = time.time()
+        rows = [self._row(article, now) for article in articles]
+        if not rows:
+            return 0
+        with self._lock:
+            cursor = self.conn.executemany(
+                """
+                INSERT INTO articles (id, title, content, url, source, timestamp, categories, content_hash, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    content = excluded.content,
+                    url = excluded.url,
+                    source = excluded.source,
+                    timestamp = excluded.timestamp,
+                    categories = excluded.categories,
+                    content_hash = excluded.content_hash,
+                    stored_at = excluded.stored_at
+                WHERE articles.content_hash IS NOT excluded.content_hash
+                    OR articles.url IS NOT excluded.url
+                    OR articles.source IS NOT excluded.source
+                    OR articles.timestamp IS NOT excluded.timestamp
+                    OR articles.categories IS NOT excluded.categories
+                """,
+                rows
+            )
+            # Rows inserted or updated; unchanged duplicates and index triggers are not counted
+            written = cursor.rowcount
+            self.conn.commit()
+        METRICS.increment("articles_stored_total", written)
+        return written
+
+    def get(self, article_id: str) -> Optional[Article]:
+        return self.get_many([article_id])[0]
+
+    def get_many(self, article_ids: List[str]) -> List[Optional[Article]]:
+        """Articles by id, None where unknown, in the given order"""
+        found: Dict[str, Article] = {}
+        with self._lock:
+            for start in range(0, len(article_ids), _SQL_CHUNK_SIZE):
+                chunk = article_ids[start:start + _SQL_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                for row in self.conn.execute(
+                    f"SELECT {self._COLUMNS} FROM articles WHERE id IN ({placeholders})", chunk
+                ):
+                    found[row[0]] = self._article(row)
+        return [found.get(article_id) for article_id in article_ids]
+
+    def content_hashes(self, article_ids: List[str]) -> Dict[str, str]:
+        """Content hash of each stored article among article_ids"""
+        found: Dict[str, str] = {}
+        with self._lock:
+            for start in range(0, len(article_ids), _SQL_CHUNK_SIZE):
+                chunk = article_ids[start:start + _SQL_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self.conn.execute(
+                    f"SELECT id, content_hash FROM articles WHERE id IN ({placeholders})", chunk
+                ))
+        return found
+
+    def iter_articles(self, since_timestamp: Optional[int] = None, batch_size: int = 1000) -> Iterator[Article]:
+        """Stored articles, oldest first, read in batches"""
+        last_doc_id = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT doc_id, {self._COLUMNS} FROM articles "
+                    f"WHERE doc_id > ? AND timestamp >= ? ORDER BY doc_id LIMIT ?",
+                    (last_doc_id, since_timestamp or 0, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._article(row[1:])
+            last_doc_id = rows[-1][0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def _candidate_doc_ids(self, phrase: str, since_timestamp: Optional[int]) -> Optional[List[int]]:
+        """Documents that may contain phrase, from the index; None means scan everything"""
+        if not self.fts_enabled or not _WORD_RE.search(phrase):
+            return None
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT articles.doc_id FROM articles_fts JOIN articles ON articles.doc_id = articles_fts.rowid "
+                "WHERE articles_fts MATCH ? AND articles.timestamp >= ?",
+                (fts_phrase(phrase), since_timestamp or 0)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    @METRICS.timed("article_store_phrase_seconds")
+    def match_phrases(self, phrases: Iterable[str], since_timestamp: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Stored article ids containing each phrase, with KeywordScorer's
+        matching rules (case-insensitive, whole words)
+        Returns: {lowercased phrase: [article ids, in storage order]}
+        """
+        matcher = KeywordMatcher(phrases)
+        results: Dict[str, List[str]] = {phrase: [] for phrase in matcher.phrases}
+        if not matcher.phrases:
+            return results
+
+        candidates = set()
+        for phrase in matcher.phrases:
+            doc_ids = self._candidate_doc_ids(phrase, since_timestamp)
+            if doc_ids is None:
+                candidates = None
+                break
+            candidates.update(doc_ids)
+
+        # Confirm the candidates against all phrases, one packed buffer per chunk
+        for rows in self._text_chunks(candidates, since_timestamp):
+            texts = [normalize_for_matching(text) for _, _, text in rows]
+            offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+            np.cumsum([len(text) + 1 for text in texts], out=offsets[1:])
+            text_rows, phrase_ids = matcher.find_pairs_in_buffer("\n" + "\n".join(texts), offsets)
+            for row, phrase_id in zip(text_rows.tolist(), phrase_ids.tolist()):
+                results[matcher.phrases[phrase_id]].append(rows[row][1])
+        return results
+
+    def _text_chunks(self, doc_ids: Optional[Iterable[int]], since_timestamp: Optional[int]) -> Iterator[List[Tuple[int, str, str]]]:
+        """(doc_id, id, title + content) rows for the given documents, or for all of them"""
+        query = "SELECT doc_id, id, title || ' ' || content FROM articles WHERE timestamp >= ?"
+        if doc_ids is None:
+            last_doc_id = 0
+            while True:
+                with self._lock:
+                    rows = self.conn.execute(
+                        query + " AND doc_id > ? ORDER BY doc_id LIMIT ?",
+                        (since_timestamp or 0, last_doc_id, _SQL_CHUNK_SIZE)
+                    ).fetchall()
+                if not rows:
+                    return
+                yield rows
+                last_doc_id = rows[-1][0]
+
+        ordered = sorted(doc_ids)
+        for start in range(0, len(ordered), _SQL_CHUNK_SIZE):
+            chunk = ordered[start:start + _SQL_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self.conn.execute(
+                    query + f" AND doc_id IN ({placeholders}) ORDER BY doc_id", (since_timestamp or 0, *chunk)
+                ).fetchall()
+            yield rows
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[Article, str]]:
+        """
+        Full-text search in FTS5 query syntax, best matches first
+        Returns: [(article, snippet)]
+        """
+        if not self.fts_enabled:
+            print("❌ Search needs SQLite with FTS5")
+            return []
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT {', '.join('articles.' + column for column in self._COLUMNS.split(', '))}, "
+                    f"snippet(articles_fts, 0, '[', ']', '…', 12) "
+                    f"FROM articles_fts JOIN articles ON articles.doc_id = articles_fts.rowid "
+                    f"WHERE articles_fts MATCH ? ORDER BY bm25(articles_fts) LIMIT ?",
+                    (query, limit)
+                ).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"❌ Invalid search query {query!r}: {e}")
+            return []
+        return [(self._article(row[:-1]), row[-1]) for row in rows]
+
+    def delete_older_than(self, timestamp: int) -> int:
+        """Drop articles published before timestamp; returns how many"""
+        with self._lock:
+            deleted = self.conn.execute("DELETE FROM articles WHERE timestamp < ?", (timestamp,)).rowcount
+            self.conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
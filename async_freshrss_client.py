@@ -0,0 +1,321 @@
+"""
+Asynchronous FreshRSS API client with pooled connections, retries and re-auth
+"""
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from config import settings
+from freshrss_client import EDIT_TAG_CHUNK_SIZE, READ_TAG, READING_LIST, EditTagResult, FreshRSSClient
+from keyword_scorer import Article
+
+# Connection pool and retry tuning
+POOL_LIMIT = 20              # Total open connections
+POOL_LIMIT_PER_HOST = 10     # FreshRSS is a single host
+KEEPALIVE_SECONDS = 30
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5, sock_read=20)
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 10.0
+
+
+class AsyncFreshRSSClient:
+    """
+    asyncio client for the FreshRSS Google Reader API
+
+    Exposes the same get_articles/mark_as_read surface as FreshRSSClient,
+    so a monitoring loop can overlap fetches for several streams or labels
+    with asyncio.gather. Use as an async context manager to close the pool.
+    """
+
+    def __init__(self, username: str, password: str):
+        self.base_url = settings.freshrss_api_url
+        self.username = username
+        self.password = password
+        # Use pre-configured token if available; replaced on 401
+        self.auth_token = settings.freshrss_api_token
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._auth_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncFreshRSSClient":
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=POOL_LIMIT,
+                limit_per_host=POOL_LIMIT_PER_HOST,
+                keepalive_timeout=KEEPALIVE_SECONDS,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+        return self.session
+
+    async def close(self):
+        """Close the connection pool"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def authenticate(self, stale_token: Optional[str] = None) -> bool:
+        """
+        Authenticate with ClientLogin, reusing the cached token when possible
+        
+        Pass the token that was rejected as stale_token to force a new login;
+        concurrent callers that hit the same 401 share a single re-login.
+        """
+        async with self._auth_lock:
+            if self.auth_token and self.auth_token != stale_token:
+                return True
+            if not self.username or not self.password:
+                print("✗ Cannot re-authenticate: no FreshRSS credentials")
+                return False
+
+            login_data = {
+                'Email': self.username,
+                'Passwd': self.password,
+                'service': 'reader',
+                'accountType': 'HOSTED_OR_GOOGLE',
+                'source': 'FreshRSS'
+            }
+            try:
+                status, body = await self._send(
+                    "POST", f"{self.base_url}/accounts/ClientLogin", data=login_data, authorized=False
+                )
+            except Exception as e:
+                print(f"Authentication error: {e}")
+                return False
+
+            if status != 200:
+                print(f"Authentication failed: {status}")
+                return False
+
+            for line in body.strip().split('\n'):
+                if line.startswith('Auth='):
+                    self.auth_token = line.split('=', 1)[1]
+                    print(f"✓ Authentication successful, token: {self.auth_token[:20]}...")
+                    return True
+
+            print("✗ Auth token not found in response")
+            return False
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        authorized: bool = True,
+        **kwargs
+    ) -> Tuple[int, str]:
+        """
+        Send a request with jittered exponential backoff on 5xx and connection errors
+        Returns: (status, body text)
+        """
+        session = self._ensure_session()
+        last_error: Optional[Exception] = None
+
+        for attempt in range(MAX_RETRIES + 1):
+            headers = dict(kwargs.pop('headers', None) or {})
+            if authorized and self.auth_token:
+                headers['Authorization'] = f'GoogleLogin auth={self.auth_token}'
+            kwargs['headers'] = headers
+
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    body = await response.text()
+                    if response.status < 500:
+                        return response.status, body
+                    last_error = RuntimeError(f"HTTP {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+
+            if attempt < MAX_RETRIES:
+                # Full jitter keeps concurrent retries from synchronizing
+                cap = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+                await asyncio.sleep(random.uniform(0, cap))
+
+        raise last_error
+
+    async def _request(self, method: str, url: str, **kwargs) -> Tuple[int, str]:
+        """Authorized request that re-authenticates once on 401"""
+        if not self.auth_token and not await self.authenticate():
+            return 401, "Authentication required"
+
+        token_used = self.auth_token
+        status, body = await self._send(method, url, **kwargs)
+        if status == 401 and await self.authenticate(stale_token=token_used):
+            status, body = await self._send(method, url, **kwargs)
+        return status, body
+
+    async def iter_articles(
+        self,
+        page_size: int = 100,
+        max_articles: Optional[int] = None,
+        since_hours: Optional[int] = 24,
+        stream_id: str = READING_LIST,
+        unread_only: bool = False
+    ) -> AsyncIterator[Article]:
+        """Stream articles page by page, following continuation tokens"""
+        params = {'output': 'json'}
+        if unread_only:
+            # Filtered by the server, so read items are never downloaded
+            params['xt'] = READ_TAG
+        if since_hours is not None:
+            # Only items newer than this timestamp
+            params['ot'] = int((datetime.now() - timedelta(hours=since_hours)).timestamp())
+
+        stream_url = f"{self.base_url}/stream/contents/{stream_id}"
+        yielded = 0
+        continuation = None
+        while True:
+            page_params = dict(params)
+            page_params['n'] = page_size if max_articles is None else min(page_size, max_articles - yielded)
+            page_params['ck'] = int(time.time())  # Cache killer
+            if continuation:
+                page_params['c'] = continuation
+
+            try:
+                status, body = await self._request("GET", stream_url, params=page_params)
+            except Exception as e:
+                print(f"Error fetching articles: {e}")
+                return
+
+            if status != 200:
+                print(f"API request failed: {status}")
+                print(f"Response: {body[:500]}")
+                return
+
+            try:
+                data = json.loads(body)
+            except ValueError as e:
+                print(f"Error fetching articles: {e}")
+                return
+
+            if 'items' not in data:
+                print(f"No items in response. Keys: {data.keys()}")
+                return
+
+            for item in data['items']:
+                article = FreshRSSClient.parse_item(item)
+                if article is None:
+                    continue
+                yield article
+                yielded += 1
+                if max_articles is not None and yielded >= max_articles:
+                    return
+
+            continuation = data.get('continuation')
+            if not continuation or not data['items']:
+                return
+
+    async def get_articles(
+        self,
+        limit: int = 100,
+        since_hours: Optional[int] = 24,
+        unread_only: bool = False,
+        stream_id: str = READING_LIST
+    ) -> List[Article]:
+        """
+        Fetch articles from FreshRSS
+        """
+        articles = [
+            article async for article in self.iter_articles(
+                page_size=limit, max_articles=limit, since_hours=since_hours, stream_id=stream_id,
+                unread_only=unread_only
+            )
+        ]
+        print(f"✓ Retrieved {len(articles)} articles from {stream_id}")
+        return articles
+
+    async def get_articles_for_streams(
+        self,
+        stream_ids: List[str],
+        limit: int = 100,
+        since_hours: Optional[int] = 24,
+        unread_only: bool = False
+    ) -> Dict[str, List[Article]]:
+        """Fetch several streams or labels concurrently over the shared pool"""
+        results = await asyncio.gather(*[
+            self.get_articles(limit=limit, since_hours=since_hours, unread_only=unread_only, stream_id=stream_id)
+            for stream_id in stream_ids
+        ])
+        return dict(zip(stream_ids, results))
+
+    async def mark_as_read(
+        self,
+        article_ids: List[str],
+        chunk_size: int = EDIT_TAG_CHUNK_SIZE,
+        max_concurrency: int = 4
+    ) -> EditTagResult:
+        """Mark articles as read in FreshRSS"""
+        return await self._edit_tags(article_ids, add=READ_TAG, chunk_size=chunk_size, max_concurrency=max_concurrency)
+
+    async def add_tag(
+        self,
+        article_ids: List[str],
+        tag: str,
+        chunk_size: int = EDIT_TAG_CHUNK_SIZE,
+        max_concurrency: int = 4
+    ) -> EditTagResult:
+        """Add a tag or state to articles"""
+        return await self._edit_tags(article_ids, add=tag, chunk_size=chunk_size, max_concurrency=max_concurrency)
+
+    async def remove_tag(
+        self,
+        article_ids: List[str],
+        tag: str,
+        chunk_size: int = EDIT_TAG_CHUNK_SIZE,
+        max_concurrency: int = 4
+    ) -> EditTagResult:
+        """Remove a tag or state from articles"""
+        return await self._edit_tags(article_ids, remove=tag, chunk_size=chunk_size, max_concurrency=max_concurrency)
+
+    async def _edit_tags(
+        self,
+        article_ids: List[str],
+        add: Optional[str] = None,
+        remove: Optional[str] = None,
+        chunk_size: int = EDIT_TAG_CHUNK_SIZE,
+        max_concurrency: int = 4
+    ) -> EditTagResult:
+        """Apply one edit-tag change in multi-id chunks with bounded concurrency"""
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        edit_url = f"{self.base_url}/edit-tag"
+
+        async def post_chunk(chunk: List[str]) -> Optional[str]:
+            data = [('i', article_id) for article_id in chunk]
+            if add:
+                data.append(('a', add))
+            if remove:
+                data.append(('r', remove))
+            data.append(('ac', 'edit-tags'))
+
+            async with semaphore:
+                try:
+                    status, _ = await self._request("POST", edit_url, data=data)
+                except Exception as e:
+                    return str(e)
+            return None if status == 200 else f"HTTP {status}"
+
+        chunks = [article_ids[i:i + chunk_size] for i in range(0, len(article_ids), chunk_size)]
+        outcomes = await asyncio.gather(*[post_chunk(chunk) for chunk in chunks])
+
+        result = EditTagResult()
+        for chunk, error in zip(chunks, outcomes):
+            if error is None:
+                result.succeeded.extend(chunk)
+            else:
+                result.failed.update({article_id: error for article_id in chunk})
+
+        if result.failed:
+            print(f"Failed to edit tags for {len(result.failed)} of {len(article_ids)} articles")
+        return result
@@ -0,0 +1,381 @@
+"""
+Resumable backfill: score the whole FreshRSS reading list with a process pool
+"""
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import BACKFILL_CONFIG, SCORING_CONFIG, settings
+from keyword_scorer import Article
+from metrics import METRICS
+
+CHECKPOINT_FILE = "checkpoint.json"
+IDF_FILE = "idf.npz"
+
+# Document frequencies and document count of a HashedTfidfVectorizer
+IdfSnapshot = Tuple[np.ndarray, int]
+
+# Scorer name -> (result field, SCORING_CONFIG weight)
+BACKFILL_SCORERS = {
+    "keyword": ("keyword_score", SCORING_CONFIG["weights"]["keyword_score"]),
+    "semantic": ("semantic_score", SCORING_CONFIG["weights"]["semantic_score"]),
+}
+
+# Per-process scorers, built once by _init_worker
+_worker_scorers: Dict[str, Any] = {}
+
+
+def _build_scorer(name: str, idf: Optional[IdfSnapshot] = None):
+    if name == "keyword":
+        from keyword_scorer import KeywordScorer
+        return KeywordScorer()
+    if name == "semantic":
+        from semantic_scorer import HashedTfidfVectorizer, SemanticScorer
+        # Every worker scores against the same frozen IDF, so a chunk's
+        # scores do not depend on which chunks its process saw before
+        vectorizer = HashedTfidfVectorizer()
+        if idf is not None:
+            vectorizer.document_frequency, vectorizer.documents = idf
+        return SemanticScorer(vectorizer=vectorizer, update_idf=False)
+    raise ValueError(f"Unknown backfill scorer {name!r}; choose from {', '.join(BACKFILL_SCORERS)}")
+
+
+def _init_worker(scorer_names: Sequence[str], idf: Optional[IdfSnapshot] = None):
+    for name in scorer_names:
+        _worker_scorers[name] = _build_scorer(name, idf)
+
+
+def score_chunk(articles: List[Article]) -> List[Dict[str, Any]]:
+    """Score one chunk with every configured scorer; one JSON-ready record per article"""
+    records = [
+        {
+            "id": article.id,
+            "title": article.title,
+            "url": article.url,
+            "source": article.source,
+            "timestamp": article.timestamp,
+            "scores": {},
+        }
+        for article in articles
+    ]
+    for name, scorer in _worker_scorers.items():
+        field, _ = BACKFILL_SCORERS[name]
+        for record, result in zip(records, scorer.score_articles_batch(articles)):
+            record["scores"][name] = result[field]
+            if name == "keyword":
+                # keyword_matches lists every topic, matched or not
+                matches = result["details"].get("keyword_matches") or {}
+                best = max(matches, key=matches.get) if matches else None
+                record["topic"] = best if best is not None and matches[best] > 0 else None
+
+    for record in records:
+        weights = {name: BACKFILL_SCORERS[name][1] for name in record["scores"]}
+        total_weight = sum(weights.values())
+        record["score"] = (
+            sum(record["scores"][name] * weight for name, weight in weights.items()) / total_weight
+            if total_weight else 0.0
+        )
+    return records
+
+
+def _write_atomic(path: str, data: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".backfill-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def build_idf(articles: List[Article]) -> IdfSnapshot:
+    """IDF snapshot fitted on a sample of articles"""
+    from semantic_scorer import HashedTfidfVectorizer
+    vectorizer = HashedTfidfVectorizer()
+    texts = [article.normalized_text for article in articles]
+    vectorizer.partial_fit(vectorizer.term_frequencies(texts), len(texts))
+    return vectorizer.document_frequency, vectorizer.documents
+
+
+def save_idf(path: str, idf: IdfSnapshot):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".backfill-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, document_frequency=idf[0], documents=np.int64(idf[1]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_idf(path: str) -> Optional[IdfSnapshot]:
+    try:
+        with np.load(path) as data:
+            return data["document_frequency"], int(data["documents"])
+    except FileNotFoundError:
+        return None
+
+
+class BackfillProgress:
+    """
+    Sustained and recent articles/sec, and an ETA
+
+    The ETA comes from the article total when there is one (--limit),
+    otherwise from the fraction of the time range walked so far (the
+    reading list is walked newest first down to a known cutoff).
+    """
+
+    def __init__(self, done: int = 0, total: Optional[int] = None, fraction: float = 0.0, window_seconds: float = 60.0):
+        self.started = time.monotonic()
+        self.initial = done
+        self.done = done
+        self.total = total
+        self.initial_fraction = fraction
+        self.fraction: Optional[float] = None
+        self.window_seconds = window_seconds
+        self._samples: Deque[Tuple[float, int]] = deque([(self.started, done)])
+
+    def update(self, articles: int, fraction: Optional[float] = None):
+        self.done += articles
+        if fraction is not None:
+            self.fraction = fraction
+        now = time.monotonic()
+        self._samples.append((now, self.done))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+
+    @property
+    def sustained_rate(self) -> float:
+        """Articles/sec since this run started (work done before a resume is not counted)"""
+        elapsed = time.monotonic() - self.started
+        return (self.done - self.initial) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def recent_rate(self) -> float:
+        """Articles/sec over the last window_seconds"""
+        (first_time, first_done), (last_time, last_done) = self._samples[0], self._samples[-1]
+        return (last_done - first_done) / (last_time - first_time) if last_time > first_time else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.recent_rate or self.sustained_rate
+        if self.total is not None:
+            return max(0, self.total - self.done) / rate if rate > 0 else None
+        if self.fraction is not None and self.fraction > self.initial_fraction:
+            elapsed = time.monotonic() - self.started
+            return elapsed * (1 - self.fraction) / (self.fraction - self.initial_fraction)
+        return None
+
+    def format(self) -> str:
+        line = f"⏩ {self.done:,} articles, {self.sustained_rate:,.0f}/s sustained ({self.recent_rate:,.0f}/s recent)"
+        eta = self.eta_seconds()
+        if eta is not None:
+            minutes, seconds = divmod(int(eta), 60)
+            hours, minutes = divmod(minutes, 60)
+            line += f", ETA {hours}h{minutes:02d}m{seconds:02d}s" if hours else f", ETA {minutes}m{seconds:02d}s"
+        return line
+
+
+class Backfill:
+    """
+    Scores the whole reading list into numbered JSONL chunk files
+
+    Pages are fetched newest first, the next one in the background, and
+    scored by a pool of worker processes with several pages in flight.
+    Results are committed strictly in page order: each page becomes one
+    atomically written chunk-NNNNNN.jsonl, after which checkpoint.json
+    records that chunk and the continuation token of the next page. An
+    interrupted run resumes right after the last committed chunk; a chunk
+    written just before a crash is simply written again. The semantic
+    scorer's IDF is fitted once on the first page and kept in idf.npz, so
+    resumed and rerun chunks score identically.
+    """
+
+    def __init__(
+        self,
+        client,
+        output_dir: Optional[str] = None,
+        scorers: Sequence[str] = BACKFILL_CONFIG["scorers"],
+        processes: Optional[int] = None,
+        page_size: int = BACKFILL_CONFIG["page_size"],
+        since_hours: Optional[int] = None,
+        max_articles: Optional[int] = None,
+        article_store=None,
+        report_seconds: float = BACKFILL_CONFIG["report_seconds"]
+    ):
+        unknown = [name for name in scorers if name not in BACKFILL_SCORERS]
+        if unknown:
+            raise ValueError(f"Unknown backfill scorers {unknown}; choose from {', '.join(BACKFILL_SCORERS)}")
+        self.client = client
+        self.output_dir = output_dir or settings.backfill_dir
+        self.scorers = list(scorers)
+        self.processes = processes or os.cpu_count() or 1
+        self.page_size = page_size
+        self.since_hours = since_hours
+        self.max_articles = max_articles
+        self.article_store = article_store
+        self.report_seconds = report_seconds
+        self.checkpoint_path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        self.idf_path = os.path.join(self.output_dir, IDF_FILE)
+        self._last_report = time.monotonic()
+
+    def chunk_path(self, chunk: int) -> str:
+        return os.path.join(self.output_dir, f"chunk-{chunk:06d}.jsonl")
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable backfill checkpoint: {e}")
+            return None
+
+    def _new_state(self) -> Dict[str, Any]:
+        since_timestamp = int(time.time() - self.since_hours * 3600) if self.since_hours is not None else None
+        return {
+            "scorers": self.scorers,
+            "since_timestamp": since_timestamp,
+            "continuation": None,
+            "chunk": -1,
+            "articles": 0,
+            "newest_timestamp": None,
+            "oldest_timestamp": None,
+            "done": False,
+            "started_at": time.time(),
+            "updated_at": time.time(),
+        }
+
+    def _clear_output(self):
+        for name in os.listdir(self.output_dir):
+            if name in (CHECKPOINT_FILE, IDF_FILE) or (name.startswith("chunk-") and name.endswith(".jsonl")):
+                os.remove(os.path.join(self.output_dir, name))
+
+    @staticmethod
+    def _fraction(state: Dict[str, Any]) -> Optional[float]:
+        """Share of the time range down to since_timestamp walked so far"""
+        newest, oldest, cutoff = state["newest_timestamp"], state["oldest_timestamp"], state["since_timestamp"]
+        if newest is None or oldest is None or cutoff is None or newest <= cutoff:
+            return None
+        return min(1.0, max(0.0, (newest - oldest) / (newest - cutoff)))
+
+    def run(self, restart: bool = False) -> int:
+        """Backfill until the reading list is exhausted; returns the articles scored by this run"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        state = None if restart else self.load_checkpoint()
+        if state is None:
+            self._clear_output()
+            state = self._new_state()
+        elif state["scorers"] != self.scorers:
+            print(f"❌ Checkpoint in {self.output_dir} was made with scorers {state['scorers']}; "
+                  f"use the same scorers or restart the backfill")
+            return 0
+        elif state["done"]:
+            print(f"✅ Backfill already complete: {state['articles']:,} articles in {state['chunk'] + 1} chunks")
+            return 0
+        else:
+            print(f"↩️  Resuming after chunk {state['chunk']} ({state['articles']:,} articles done)")
+
+        pages = self.client.iter_pages(self.page_size, state["since_timestamp"], state["continuation"])
+        idf = None
+        if "semantic" in self.scorers:
+            idf = load_idf(self.idf_path)
+            if idf is None and state["chunk"] >= 0:
+                print(f"❌ Checkpoint in {self.output_dir} has no {IDF_FILE} for the semantic scorer; restart the backfill")
+                return 0
+            if idf is None:
+                first = next(pages, None)
+                idf = build_idf(first[0] if first else [])
+                save_idf(self.idf_path, idf)
+                pages = chain([first] if first else [], pages)
+
+        progress = BackfillProgress(state["articles"], self.max_articles, self._fraction(state) or 0.0)
+        in_flight: Deque[Tuple[int, Optional[str], Future, List[int]]] = deque()
+        max_in_flight = self.processes * BACKFILL_CONFIG["pages_in_flight_per_process"]
+        next_chunk = state["chunk"] + 1
+        queued = state["articles"]
+        finished = False
+        self._last_report = time.monotonic()
+
+        print(f"🚚 Backfilling with {self.processes} processes, scorers: {', '.join(self.scorers)}")
+        pool = ProcessPoolExecutor(self.processes, initializer=_init_worker, initargs=(self.scorers, idf))
+        try:
+            # --limit caps the total across runs, so check it before taking each page
+            while self.max_articles is None or queued < self.max_articles:
+                page = next(pages, None)
+                if page is None:
+                    break
+                articles, continuation = page
+                if self.article_store is not None and articles:
+                    self.article_store.upsert_many(articles)
+                timestamps = [article.timestamp for article in articles]
+                in_flight.append((next_chunk, continuation, pool.submit(score_chunk, articles), timestamps))
+                next_chunk += 1
+                queued += len(articles)
+                finished = continuation is None
+                while in_flight and (len(in_flight) >= max_in_flight or in_flight[0][2].done()):
+                    self._commit(state, *in_flight.popleft(), progress)
+            while in_flight:
+                self._commit(state, *in_flight.popleft(), progress)
+        finally:
+            pool.shutdown(wait=not in_flight, cancel_futures=True)
+
+        print(progress.format())
+        scored = progress.done - progress.initial
+        if finished:
+            print(f"✅ Backfill complete: {state['articles']:,} articles in {state['chunk'] + 1} chunks in {self.output_dir}")
+        elif self.max_articles is not None and queued >= self.max_articles:
+            print(f"⏸️  Reached the limit of {self.max_articles:,} articles in total ({state['articles']:,} done); "
+                  f"run again with a higher --limit to continue")
+        else:
+            print(f"⚠️  Fetching stopped after chunk {state['chunk']}; run again to resume from there")
+        return scored
+
+    def _commit(
+        self,
+        state: Dict[str, Any],
+        chunk: int,
+        continuation: Optional[str],
+        future: Future,
+        timestamps: List[int],
+        progress: BackfillProgress
+    ):
+        """Write one scored page, then advance the checkpoint past it"""
+        records = future.result()
+        _write_atomic(self.chunk_path(chunk), "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+
+        if timestamps:
+            newest, oldest = max(timestamps), min(timestamps)
+            state["newest_timestamp"] = max(state["newest_timestamp"] or newest, newest)
+            state["oldest_timestamp"] = min(state["oldest_timestamp"] or oldest, oldest)
+        state.update(
+            chunk=chunk,
+            continuation=continuation,
+            articles=state["articles"] + len(records),
+            done=continuation is None,
+            updated_at=time.time()
+        )
+        _write_atomic(self.checkpoint_path, json.dumps(state, indent=2))
+
+        METRICS.increment("backfill_chunks_total")
+        METRICS.increment("backfill_articles_total", len(records))
+        progress.update(len(records), self._fraction(state))
+        if time.monotonic() - self._last_report >= self.report_seconds:
+            self._last_report = time.monotonic()
+            print(progress.format())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: retained memory of article representations during a backfill
+
+Compares a list of plain (pre-slots) dataclass articles, a list of the
+current slotted Article objects, and a columnar ArticleBatch built from
+the same stream.
+
+Usage: python3 benchmarks/article_memory_benchmark.py [--sizes 10000 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from article_batch import ArticleBatch
+from keyword_scorer import Article
+
+SOURCES = ["Hacker News", "Ars Technica", "BBC News", "Reuters", "The Register", "Heise", "LWN.net"]
+WORDS = ["the", "report", "said", "new", "market", "government", "data", "people", "security",
+         "year", "company", "week", "ai", "city", "plan", "results", "energy", "research"]
+
+
+@dataclass
+class LegacyArticle:
+    """Article as it was before slots and interning"""
+    id: str
+    title: str
+    content: str
+    url: str
+    source: str
+    timestamp: int
+    categories: List[str] = None
+
+
+def item_stream(count: int, seed: int):
+    """Fresh strings per item, as a JSON parser would produce them"""
+    rng = random.Random(seed)
+    for i in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(30, 150))]
+        yield {
+            "id": f"tag:google.com,2005:reader/item/{i:016x}",
+            "title": " ".join(words[:8]).title(),
+            "content": " ".join(words[8:]),
+            "url": f"https://example.com/{i}",
+            "source": "".join(rng.choice(SOURCES)),
+            "timestamp": 1700000000 + i,
+            "categories": ["user/-/state/com.google/reading-list", "user/-/label/" + rng.choice(SOURCES)],
+        }
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Article memory benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    def legacy(count):
+        return [LegacyArticle(**item) for item in item_stream(count, args.seed)]
+
+    def slotted(count):
+        return [Article(**{**item, "categories": tuple(item["categories"])}) for item in item_stream(count, args.seed)]
+
+    def columnar(count):
+        # Articles are appended and dropped one by one, as during a backfill
+        batch = ArticleBatch()
+        for item in item_stream(count, args.seed):
+            batch.append(Article(**{**item, "categories": tuple(item["categories"])}))
+        return batch.freeze()
+
+    print(f"{'articles':>9} {'representation':<16} {'retained MB':>12} {'peak MB':>9} {'bytes/article':>14} {'seconds':>8}")
+    for count in args.sizes:
+        for name, build in (("legacy dataclass", legacy), ("slotted Article", slotted), ("ArticleBatch", columnar)):
+            retained, peak, seconds = measure(lambda: build(count))
+            print(f"{count:>9} {name:<16} {retained / 1e6:>12.1f} {peak / 1e6:>9.1f} "
+                  f"{retained / count:>14.0f} {seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: delta re-scoring from recorded keyword matches vs a full rescore,
+after a series of topic score and keyword edits
+
+Every edit is checked against scoring all articles afresh under the new
+configuration; any difference is reported as a mismatch.
+
+Usage: python3 benchmarks/delta_rescore_benchmark.py [--articles 10000]
+"""
+import argparse
+import copy
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from synthetic_corpus import SyntheticCorpus
+
+from article_store import ArticleStore
+from config import HIGH_VALUE_KEYWORDS
+from keyword_scorer import KeywordScorer
+from match_store import KeywordMatchStore
+
+
+def edits(keywords, topic_scores):
+    """(name, keywords, topic_scores) after each successive edit"""
+    topics = list(keywords)
+    first, second = topics[0], topics[1]
+
+    topic_scores = dict(topic_scores, **{first: topic_scores[first] + 25})
+    yield "topic score changed", keywords, topic_scores
+
+    keywords = copy.deepcopy(keywords)
+    keywords[first]["positive"] = keywords[first]["positive"][1:]
+    yield "keyword removed", keywords, topic_scores
+
+    keywords = copy.deepcopy(keywords)
+    moved = keywords[second]["positive"].pop(0)
+    keywords[first]["negative"] = keywords[first]["negative"] + [moved]
+    yield "keyword moved", keywords, topic_scores
+
+    keywords = copy.deepcopy(keywords)
+    keywords[second]["positive"] = keywords[second]["positive"] + ["market data", "public policy"]
+    yield "keywords added", keywords, topic_scores
+
+    # A new topic built from phrases other topics already use
+    third, fourth = topics[2], topics[3]
+    new_topic = {"positive": keywords[third]["positive"][:2], "negative": keywords[fourth]["positive"][:1]}
+    keywords = dict(copy.deepcopy(keywords), benchmark_topic=new_topic)
+    topic_scores = dict(topic_scores, benchmark_topic=85)
+    yield "topic added", keywords, topic_scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta re-scoring benchmark")
+    parser.add_argument("--articles", type=int, default=10000, help="Corpus size (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(size=args.articles, seed=args.seed)
+    topic_scores = {topic: 40 + 7 * i for i, topic in enumerate(HIGH_VALUE_KEYWORDS)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        article_store = ArticleStore(os.path.join(directory, "articles.db"))
+        match_store = KeywordMatchStore(os.path.join(directory, "keyword_matches.db"))
+        articles = corpus.articles()
+        article_store.upsert_many(articles)
+
+        start = time.perf_counter()
+        KeywordScorer(HIGH_VALUE_KEYWORDS, topic_scores, match_store=match_store).score_articles_batch(articles)
+        print(f"articles:              {len(articles)}")
+        print(f"initial scoring        {time.perf_counter() - start:.3f}s (with match recording)")
+
+        for name, keywords, scores in edits(HIGH_VALUE_KEYWORDS, topic_scores):
+            scorer = KeywordScorer(keywords, scores)
+
+            start = time.perf_counter()
+            delta = scorer.rescore_recorded(match_store, article_store)
+            delta_seconds = time.perf_counter() - start
+
+            # Fresh Articles, so the full rescore pays for text normalization as a real one would
+            fresh = corpus.articles()
+            start = time.perf_counter()
+            full = scorer.score_articles_batch(fresh)
+            full_seconds = time.perf_counter() - start
+
+            expected = {result["article"].id: (result["keyword_score"], result["details"]) for result in full}
+            mismatches = len(expected) - len(delta.article_ids) + sum(
+                1 for article_id, result in zip(delta.article_ids, delta.results())
+                if expected.get(article_id) != result
+            )
+            print(f"{name:22s} delta {delta_seconds:.3f}s vs full {full_seconds:.3f}s "
+                  f"({full_seconds / delta_seconds:.1f}x), {delta.recomputed} recomputed, mismatches {mismatches}")
+
+        article_store.close()
+        match_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one reading-list stream vs fair per-feed fetching when one feed
+floods the reading list
+
+Reports which sources end up in the limit, how long each strategy takes
+against a server with per-request latency, and that --unread-only style
+fetches never download read items.
+
+Usage: python3 benchmarks/fair_fetch_benchmark.py [--items 4000] [--limit 200] [--latency-ms 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_greader_server import FakeGReaderServer
+from synthetic_corpus import FEEDS, SyntheticCorpus
+
+from freshrss_client import FreshRSSClient
+
+NOISY_FEED = FEEDS[4]  # Hacker News
+
+
+def make_client(server: FakeGReaderServer) -> FreshRSSClient:
+    client = FreshRSSClient("benchmark", "benchmark")
+    client.base_url = server.base_url
+    client.auth_token = None
+    client.authenticate()
+    return client
+
+
+def flood(server: FakeGReaderServer, share: float, seed: int):
+    """Reassign share of all items to the noisy feed"""
+    rng = random.Random(seed)
+    stream_id, source, site = NOISY_FEED
+    for item in server.items:
+        if rng.random() < share:
+            item["origin"] = {"streamId": stream_id, "title": source, "htmlUrl": site}
+
+
+def report(name: str, seconds: float, articles):
+    sources = Counter(article.source for article in articles)
+    spread = ", ".join(f"{source} {count}" for source, count in sources.most_common())
+    print(f"{name:26s} {seconds * 1000:7.0f}ms  {len(articles):4d} articles  {spread}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fair per-feed fetching benchmark")
+    parser.add_argument("--items", type=int, default=4000)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--noisy-share", type=float, default=0.8, help="Share of items from the noisy feed (default: 0.8)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(size=args.items, seed=args.seed)
+    with FakeGReaderServer(corpus, latency_ms=args.latency_ms, jitter_ms=args.latency_ms) as server:
+        flood(server, args.noisy_share, args.seed)
+        client = make_client(server)
+        fetch = dict(max_articles=args.limit, page_size=args.page_size, since_hours=None)
+
+        start = time.perf_counter()
+        articles = list(client.iter_articles(**fetch))
+        report("reading list", time.perf_counter() - start, articles)
+
+        for name, options in (
+            ("per feed, sequential", dict(weighted=False, max_workers=1)),
+            ("per feed, concurrent", dict(weighted=False)),
+            ("per feed, weighted", dict(weighted=True)),
+            ("per label, weighted", dict(group_by="label", weighted=True)),
+        ):
+            start = time.perf_counter()
+            articles = list(client.iter_articles_fair(**fetch, **options))
+            report(name, time.perf_counter() - start, articles)
+
+        # Mark half of the items read; unread fetches must not download any of them
+        read = [item["id"] for item in server.items[::2]]
+        client.mark_as_read(read, max_workers=4)
+        read = set(read)
+        for name, fetch_unread in (
+            ("unread, reading list", lambda: list(client.iter_articles(**fetch, unread_only=True))),
+            ("unread, per feed", lambda: list(client.iter_articles_fair(**fetch, unread_only=True))),
+        ):
+            start = time.perf_counter()
+            articles = fetch_unread()
+            seconds = time.perf_counter() - start
+            print(f"{name:26s} {seconds * 1000:7.0f}ms  {len(articles):4d} articles, "
+                  f"{sum(1 for article in articles if article.id in read)} of them read")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the FreshRSS Google Reader API
+
+Serves accounts/ClientLogin, stream/contents/<stream> (with n, c
+continuation, ot, r=o, xt and feed/label streams), subscription/list,
+tag/list and edit-tag under
+/api/greader.php (optionally below reader/api/0) from a SyntheticCorpus,
+with configurable latency and injected error rates. Point
+FreshRSSClient.base_url at server.base_url.
+
+Usage: python3 benchmarks/fake_greader_server.py [--items 5000] [--latency-ms 20] [--error-rate 0.01]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qs, unquote, urlparse
+
+from synthetic_corpus import SyntheticCorpus
+
+API_PREFIX = "/api/greader.php"
+READING_LIST = "user/-/state/com.google/reading-list"
+READ_TAG = "user/-/state/com.google/read"
+AUTH_TOKEN = "benchmark/0123456789abcdef"
+
+
+class FakeGReaderServer:
+    """Threaded HTTP server over an in-memory item list; use as a context manager"""
+
+    def __init__(
+        self,
+        corpus: Optional[SyntheticCorpus] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        port: int = 0
+    ):
+        self.corpus = corpus or SyntheticCorpus()
+        self.items: List[Dict] = self.corpus.items()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.read_ids: Set[str] = set()
+        self.request_counts: Dict[str, int] = {}
+        self.error_counts: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._encoded: Dict[str, bytes] = {}
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}{API_PREFIX}"
+
+    def start(self) -> "FakeGReaderServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeGReaderServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _delay_and_fail(self, endpoint: str) -> bool:
+        """Apply latency; returns True when this request should fail"""
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+            delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.error_counts[endpoint] = self.error_counts.get(endpoint, 0) + 1
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return fail
+
+    def _matches_stream(self, item: Dict, stream_id: str) -> bool:
+        if stream_id == READING_LIST:
+            return True
+        if stream_id.startswith("feed/"):
+            return item["origin"]["streamId"] == stream_id
+        return stream_id in item["categories"]
+
+    def stream_page(self, stream_id: str, query: Dict[str, List[str]]) -> Dict:
+        """stream/contents response for one request"""
+        count = int(query.get("n", ["20"])[0])
+        offset = int(query.get("c", ["0"])[0] or 0)
+        older_than = int(query.get("ot", ["0"])[0] or 0)
+        exclude = query.get("xt", [None])[0]
+
+        selected = [
+            item for item in self.items
+            if item["published"] >= older_than
+            and self._matches_stream(item, stream_id)
+            and not (exclude == READ_TAG and item["id"] in self.read_ids)
+        ]
+        if query.get("r", [""])[0] == "o":
+            selected.reverse()
+
+        page = selected[offset:offset + count]
+        body = {"id": stream_id, "updated": int(time.time()), "items": page}
+        if offset + count < len(selected):
+            body["continuation"] = str(offset + count)
+        return body
+
+    def subscriptions(self) -> Dict:
+        """subscription/list response: every feed in the items, labelled with the labels its items carry"""
+        feeds: Dict[str, Dict] = {}
+        for item in self.items:
+            origin = item["origin"]
+            feed = feeds.setdefault(origin["streamId"], {
+                "id": origin["streamId"],
+                "title": origin["title"],
+                "url": f"{origin['htmlUrl']}/feed",
+                "htmlUrl": origin["htmlUrl"],
+                "categories": [],
+            })
+            for category in item["categories"]:
+                if "/label/" in category and all(existing["id"] != category for existing in feed["categories"]):
+                    feed["categories"].append({"id": category, "label": category.rsplit("/", 1)[-1]})
+        return {"subscriptions": list(feeds.values())}
+
+    def tags(self) -> Dict:
+        """tag/list response: the starred state and every label in the items"""
+        labels = sorted({category for item in self.items for category in item["categories"] if "/label/" in category})
+        return {"tags": [{"id": "user/-/state/com.google/starred"}] + [{"id": label, "type": "folder"} for label in labels]}
+
+    def _encode_items(self, items: List[Dict]) -> bytes:
+        # Pre-encoded items keep the server out of the client's timings
+        parts = []
+        for item in items:
+            encoded = self._encoded.get(item["id"])
+            if encoded is None:
+                encoded = json.dumps(item).encode("utf-8")
+                self._encoded[item["id"]] = encoded
+            parts.append(encoded)
+        return b",".join(parts)
+
+    @staticmethod
+    def route(raw_path: str) -> str:
+        """Endpoint path relative to the API root"""
+        path = urlparse(raw_path).path
+        if path.startswith(API_PREFIX):
+            path = path[len(API_PREFIX):]
+        if path.startswith("/reader/api/0/"):
+            path = path[len("/reader/api/0"):]
+        return path.lstrip("/")
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str = "text/plain"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _authorized(self) -> bool:
+                if self.headers.get("Authorization") == f"GoogleLogin auth={AUTH_TOKEN}":
+                    return True
+                self._send(401, b"Unauthorized")
+                return False
+
+            def _read_form(self) -> Dict[str, List[str]]:
+                length = int(self.headers.get("Content-Length", 0))
+                return parse_qs(self.rfile.read(length).decode("utf-8"))
+
+            def do_GET(self):
+                route = server.route(self.path)
+                listings = {"subscription/list": server.subscriptions, "tag/list": server.tags}
+                if route in listings:
+                    if server._delay_and_fail(route):
+                        self._send(503, b"Service unavailable")
+                        return
+                    if self._authorized():
+                        self._send(200, json.dumps(listings[route]()).encode("utf-8"), "application/json")
+                    return
+
+                prefix = "stream/contents/"
+                if not route.startswith(prefix):
+                    self._send(404, b"Not found")
+                    return
+                if server._delay_and_fail("stream/contents"):
+                    self._send(503, b"Service unavailable")
+                    return
+                if not self._authorized():
+                    return
+
+                body = server.stream_page(unquote(route[len(prefix):]), parse_qs(urlparse(self.path).query))
+                # Same field order as FreshRSS: continuation follows the items
+                continuation = body.pop("continuation", None)
+                items = body.pop("items")
+                encoded = json.dumps(body)[:-1].encode("utf-8") + b', "items": [' + server._encode_items(items) + b"]"
+                if continuation is not None:
+                    encoded += b', "continuation": ' + json.dumps(continuation).encode("utf-8")
+                self._send(200, encoded + b"}", "application/json")
+
+            def do_POST(self):
+                route = server.route(self.path)
+                if route == "accounts/ClientLogin":
+                    self._read_form()
+                    if server._delay_and_fail("ClientLogin"):
+                        self._send(503, b"Service unavailable")
+                        return
+                    self._send(200, f"SID={AUTH_TOKEN}\nLSID=null\nAuth={AUTH_TOKEN}\n".encode("utf-8"))
+                    return
+
+                if route == "edit-tag":
+                    form = self._read_form()
+                    if server._delay_and_fail("edit-tag"):
+                        self._send(503, b"Service unavailable")
+                        return
+                    if not self._authorized():
+                        return
+                    ids = form.get("i", [])
+                    with server._lock:
+                        if READ_TAG in form.get("a", []):
+                            server.read_ids.update(ids)
+                        if READ_TAG in form.get("r", []):
+                            server.read_ids.difference_update(ids)
+                    self._send(200, b"OK")
+                    return
+
+                self._send(404, b"Not found")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Google Reader API server")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeGReaderServer(
+        SyntheticCorpus(size=args.items, seed=args.seed),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        port=args.port
+    )
+    print(f"Serving {len(server.items)} items at {server.base_url} (token {AUTH_TOKEN})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-keyword substring scans vs the compiled KeywordMatcher
+
+Usage: python3 benchmarks/keyword_matcher_benchmark.py [--articles N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from keyword_scorer import Article, KeywordScorer
+
+TOPIC_COUNT = 8
+
+
+def make_vocabulary(rng: random.Random, size: int = 5000):
+    """Generate pseudo-words with a realistic length spread"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return list({
+        "".join(rng.choice(letters) for _ in range(rng.randint(2, 11)))
+        for _ in range(size)
+    })
+
+
+def make_keyword_table(rng: random.Random, vocabulary, keywords_per_topic: int):
+    """Build a HIGH_VALUE_KEYWORDS-shaped table with 1-3 word phrases"""
+    table = {}
+    for topic_index in range(TOPIC_COUNT):
+        phrases = [
+            " ".join(rng.sample(vocabulary, rng.choice((1, 1, 2, 3))))
+            for _ in range(keywords_per_topic)
+        ]
+        negatives = max(1, keywords_per_topic // 3)
+        table[f"Topic {topic_index}"] = {
+            "positive": phrases[negatives:],
+            "negative": phrases[:negatives],
+        }
+    return table
+
+
+def make_texts(rng: random.Random, vocabulary, count: int):
+    """Articles of 80-600 words, lowercased as the scorer sees them"""
+    return [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(80, 600)))
+        for _ in range(count)
+    ]
+
+
+def legacy_matches(table, full_text):
+    """The original per-topic, per-keyword substring scan"""
+    topic_matches = {}
+    for topic, keywords in table.items():
+        positive = sum(len(k.split()) for k in keywords["positive"] if k.lower() in full_text)
+        negative = sum(len(k.split()) for k in keywords["negative"] if k.lower() in full_text)
+        topic_matches[topic] = max(0, positive - negative * 0.5)
+    return topic_matches
+
+
+def time_it(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KeywordMatcher benchmark")
+    parser.add_argument("--articles", type=int, default=300, help="Articles per run (default: 300)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    texts = make_texts(rng, vocabulary, args.articles)
+    articles = [
+        Article(id=str(i), title="", content=text, url="", source="bench", timestamp=0)
+        for i, text in enumerate(texts)
+    ]
+
+    print(f"{'keywords/topic':>15} {'compile ms':>11} {'legacy s':>10} {'compiled s':>11} {'speedup':>8}")
+    for keywords_per_topic in (10, 100, 1000):
+        table = make_keyword_table(rng, vocabulary, keywords_per_topic)
+
+        start = time.perf_counter()
+        scorer = KeywordScorer(keywords=table, topic_scores={})
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        legacy = time_it(lambda text: legacy_matches(table, f" {text}".lower()), texts)
+        compiled = time_it(scorer.calculate_keyword_matches, articles)
+        print(f"{keywords_per_topic:>15} {compile_ms:>11.1f} {legacy:>10.3f} {compiled:>11.3f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
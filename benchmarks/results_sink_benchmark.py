@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ResultsSink write throughput and peak memory, then loading the
+rows back from the memory-mapped columns vs parsing results.jsonl
+
+Usage: python3 benchmarks/results_sink_benchmark.py [--rows 1000000]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import HIGH_VALUE_KEYWORDS
+from keyword_scorer import Article, KeywordScorer
+from results_sink import JSONL_FILE, ResultsSink, load_columns
+
+SOURCES = ["Reuters", "Ars Technica", "ČT24", "Heise", "Hacker News", "Nature", "Euractiv", "Some Blog"]
+
+
+def rows(count: int, seed: int):
+    """Synthetic (article, final score, topic, keyword result) rows, generated lazily"""
+    rng = random.Random(seed)
+    topics = list(HIGH_VALUE_KEYWORDS)
+    for i in range(count):
+        matches = {topic: float(rng.choice((0, 0, 0, 1, 2, 3.5))) for topic in topics}
+        article = Article(
+            id=f"tag:google.com,2005:reader/item/{i:016x}",
+            title=f"Article {i}",
+            content="",
+            url=f"https://example.com/{i}",
+            source=SOURCES[i % len(SOURCES)],
+            timestamp=1700000000 + i,
+        )
+        keyword_result = {"keyword_score": rng.uniform(20, 90), "details": {"keyword_matches": matches}}
+        yield article, rng.uniform(0, 100), rng.choice(topics), keyword_result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Results sink benchmark")
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows to write (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        with ResultsSink(directory, keyword_scorer=KeywordScorer(HIGH_VALUE_KEYWORDS, {})) as sink:
+            for row in rows(args.rows, args.seed):
+                sink.add(*row)
+        write_seconds = time.perf_counter() - start
+        # Rows are generated lazily, so peak RSS growth is the sink's buffering
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        columns, schema = load_columns(directory)
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        by_source = np.bincount(columns["source"], weights=columns["final_score"]) / np.bincount(columns["source"])
+        best_topic = columns["topic_matches"].sum(axis=0).argmax()
+        query_seconds = time.perf_counter() - start
+        _, load_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        with open(os.path.join(directory, JSONL_FILE), encoding="utf-8") as f:
+            parsed = sum(1 for line in f if json.loads(line))
+        parse_seconds = time.perf_counter() - start
+
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"rows:              {schema['rows']:,} ({size / 2**20:,.0f} MiB on disk)")
+        print(f"write              {write_seconds:.2f}s ({args.rows / write_seconds:,.0f} rows/s), peak RSS +{rss_growth / 1024:.1f} MiB")
+        print(f"memmap load        {load_seconds * 1000:.1f}ms")
+        print(f"per-source mean    {query_seconds * 1000:.1f}ms, peak {load_peak / 2**20:.1f} MiB "
+              f"(best {schema['sources'][by_source.argmax()]}, top topic {schema['topics'][best_topic]})")
+        print(f"JSONL parse        {parse_seconds:.2f}s for {parsed:,} lines")
+
+
+if __name__ == "__main__":
+    main()
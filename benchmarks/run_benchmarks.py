@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark scenarios against the fake Google Reader server
+
+Runs fetch (buffered, streamed JSON and async), parse, score and mark-read
+scenarios over a synthetic corpus and reports articles/sec, p50/p95/p99
+latency and peak memory per scenario. Results are written as JSON so runs
+can be compared with --compare.
+
+Usage:
+  python3 benchmarks/run_benchmarks.py [--items 2000] [--latency-ms 5] [--error-rate 0]
+  python3 benchmarks/run_benchmarks.py --compare benchmarks/results/old.json
+"""
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from fake_greader_server import FakeGReaderServer
+from synthetic_corpus import SyntheticCorpus
+
+from freshrss_client import FreshRSSClient
+from keyword_scorer import KeywordScorer
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class Recorder:
+    """Collects per-operation latencies for one scenario run"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+
+    def timed(self, function: Callable) -> Callable:
+        """Wrap a callable so every call is recorded"""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+        return wrapper
+
+    def timed_async(self, function: Callable) -> Callable:
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                self.latencies.append(time.perf_counter() - start)
+        return wrapper
+
+
+def make_client(server: FakeGReaderServer, recorder: Recorder) -> FreshRSSClient:
+    client = FreshRSSClient("benchmark", "benchmark")
+    client.base_url = server.base_url
+    client.auth_token = None
+    client.authenticate()
+    # Time every HTTP request (time to headers for streamed responses)
+    client.session.request = recorder.timed(client.session.request)
+    return client
+
+
+# Each scenario gets freshly built Articles (no cached normalized text)
+# and returns the number of articles it processed
+
+def scenario_fetch(server, articles, recorder, args) -> int:
+    client = make_client(server, recorder)
+    return sum(1 for _ in client.iter_articles(page_size=args.page_size, since_hours=None))
+
+
+def scenario_fetch_stream(server, articles, recorder, args) -> int:
+    client = make_client(server, recorder)
+    return sum(1 for _ in client.iter_articles(page_size=args.page_size, since_hours=None, stream_json=True))
+
+
+def scenario_fetch_async(server, articles, recorder, args) -> int:
+    from async_freshrss_client import AsyncFreshRSSClient
+
+    async def run() -> int:
+        async with AsyncFreshRSSClient("benchmark", "benchmark") as client:
+            client.base_url = server.base_url
+            client.auth_token = None
+            client._send = recorder.timed_async(client._send)
+            count = 0
+            async for _ in client.iter_articles(page_size=args.page_size, since_hours=None):
+                count += 1
+            return count
+
+    return asyncio.run(run())
+
+
+def scenario_parse(server, articles, recorder, args) -> int:
+    parse = recorder.timed(FreshRSSClient.parse_item)
+    return sum(1 for item in server.items if parse(item) is not None)
+
+
+def scenario_score(server, articles, recorder, args) -> int:
+    scorer = KeywordScorer()
+    score = recorder.timed(scorer.score_article)
+    for article in articles:
+        score(article)
+    return len(articles)
+
+
+def scenario_score_batch(server, articles, recorder, args) -> int:
+    scorer = KeywordScorer()
+    score = recorder.timed(scorer.score_articles_batch)
+    for start in range(0, len(articles), args.batch_size):
+        score(articles[start:start + args.batch_size])
+    return len(articles)
+
+
+def scenario_mark_read(server, articles, recorder, args) -> int:
+    client = make_client(server, recorder)
+    server.read_ids.clear()
+    result = client.mark_as_read([item["id"] for item in server.items], max_workers=args.workers)
+    return len(result.succeeded)
+
+
+SCENARIOS = {
+    "fetch": scenario_fetch,
+    "fetch_stream": scenario_fetch_stream,
+    "fetch_async": scenario_fetch_async,
+    "parse": scenario_parse,
+    "score": scenario_score,
+    "score_batch": scenario_score_batch,
+    "mark_read": scenario_mark_read,
+}
+
+
+def percentiles(latencies: List[float]) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3)}
+
+
+def run_scenario(name: str, server: FakeGReaderServer, articles: List, args) -> Dict:
+    scenario = SCENARIOS[name]
+    errors_before = sum(server.error_counts.values())
+
+    # Timed pass
+    recorder = Recorder()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        fresh = [dataclasses.replace(article) for article in articles]
+        start = time.perf_counter()
+        processed = scenario(server, fresh, recorder, args)
+        seconds = time.perf_counter() - start
+    errors = sum(server.error_counts.values()) - errors_before
+
+    # Separate pass for memory, since tracing slows everything down
+    peak_mb = None
+    if not args.no_memory:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            fresh = [dataclasses.replace(article) for article in articles]
+            tracemalloc.start()
+            scenario(server, fresh, Recorder(), args)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+
+    return {
+        "articles": processed,
+        "expected_articles": len(server.items),
+        "seconds": round(seconds, 4),
+        "articles_per_sec": round(processed / seconds, 1) if seconds > 0 else None,
+        "operations": len(recorder.latencies),
+        "latency_ms": percentiles(recorder.latencies),
+        "peak_memory_mb": round(peak_mb, 2) if peak_mb is not None else None,
+        "server_errors": errors,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict, baseline_path: str):
+    """Print throughput and p95 changes against an earlier result file"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_revision')}):")
+    for name, result in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old or not old.get("articles_per_sec") or not result.get("articles_per_sec"):
+            continue
+        speedup = result["articles_per_sec"] / old["articles_per_sec"]
+        old_p95, new_p95 = old["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        p95 = f"{old_p95:.2f} -> {new_p95:.2f} ms" if old_p95 is not None and new_p95 is not None else "n/a"
+        print(f"  {name:<13} throughput x{speedup:.2f}   p95 {p95}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline FreshRSS/scoring benchmarks")
+    parser.add_argument("--items", type=int, default=2000, help="Synthetic corpus size (default: 2000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=500, help="score_batch batch size")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent edit-tag requests")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(size=args.items, seed=args.seed)
+    articles = corpus.articles()
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "scenarios": {},
+    }
+
+    with FakeGReaderServer(
+        corpus, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed
+    ) as server:
+        print(f"{'scenario':<13} {'articles':>9} {'art/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak MB':>8} {'errors':>6}")
+        for name in args.scenarios:
+            result = run_scenario(name, server, articles, args)
+            report["scenarios"][name] = result
+            latency = result["latency_ms"]
+            fmt = lambda value: f"{value:8.2f}" if value is not None else f"{'-':>8}"
+            print(f"{name:<13} {result['articles']:>9} {result['articles_per_sec'] or 0:>10.1f} "
+                  f"{fmt(latency['p50'])} {fmt(latency['p95'])} {fmt(latency['p99'])} "
+                  f"{fmt(result['peak_memory_mb'])} {result['server_errors']:>6}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
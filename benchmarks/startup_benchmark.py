@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CLI startup cost per mode, from python -X importtime
+
+Each mode is run several times in a fresh interpreter; the table shows the
+best wall time and the cumulative import time of top-level modules, plus
+the slowest imports of the last run.
+
+Usage: python3 benchmarks/startup_benchmark.py [--runs 5] [--top 8]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+MODES = {
+    "import config": ["-c", "import config"],
+    "--help": ["main.py", "--help"],
+    # No credentials in the environment: parses args and exits early
+    "no-op run": ["main.py", "--non-interactive"],
+    "--api": ["main.py", "--api", "--non-interactive"],
+}
+
+_IMPORT_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """Total top-level import microseconds and (cumulative, module) pairs"""
+    total = 0.0
+    modules: Dict[str, float] = {}
+    for match in _IMPORT_LINE_RE.finditer(stderr):
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        if len(indent) <= 1:
+            total += cumulative
+            modules[name] = cumulative
+    return total, sorted(((value, name) for name, value in modules.items()), reverse=True)
+
+
+def run_mode(arguments: List[str]) -> Tuple[float, float, List[Tuple[float, str]]]:
+    env = dict(os.environ)
+    for key in ("FRESHRSS_USERNAME", "FRESHRSS_API_PASSWORD"):
+        env.pop(key, None)
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        cwd=ROOT, env=env, capture_output=True, text=True, stdin=subprocess.DEVNULL
+    )
+    wall = time.perf_counter() - start
+    total, modules = parse_importtime(completed.stderr)
+    return wall, total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per mode")
+    args = parser.parse_args()
+
+    print(f"{'mode':<15} {'best wall ms':>13} {'imports ms':>11}")
+    details = {}
+    for name, arguments in MODES.items():
+        runs = [run_mode(arguments) for _ in range(args.runs)]
+        best = min(runs, key=lambda run: run[0])
+        details[name] = best[2]
+        print(f"{name:<15} {best[0] * 1000:>13.1f} {min(run[1] for run in runs) / 1000:>11.1f}")
+
+    for name, modules in details.items():
+        print(f"\nSlowest top-level imports for {name}:")
+        for cumulative, module in modules[:args.top]:
+            print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
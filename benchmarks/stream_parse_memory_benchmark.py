@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak RSS of buffered vs incrementally parsed stream/contents pages
+
+A local server returns one page of N items with long HTML summaries; each
+measurement runs in a fresh process so ru_maxrss reflects only that fetch.
+
+Usage: python3 benchmarks/stream_parse_memory_benchmark.py [--items 100 1000 10000]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+PARAGRAPH = ("<p>Researchers said the new <b>security</b> report covers artificial intelligence, "
+             "energy markets &amp; open source software maintained by volunteers.</p>\n")
+
+
+def make_item(rng: random.Random, i: int) -> dict:
+    return {
+        "id": f"tag:google.com,2005:reader/item/{i:016x}",
+        "title": f"Benchmark article {i}",
+        "published": 1700000000 + i,
+        "timestampUsec": str((1700000000 + i) * 1_000_000),
+        "canonical": [{"href": f"https://example.com/{i}"}],
+        "summary": {"content": PARAGRAPH * rng.randint(10, 60)},
+        "origin": {"title": "Benchmark Feed"},
+        "categories": ["user/-/state/com.google/reading-list"],
+    }
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        count = int(parse_qs(urlparse(self.path).query)["n"][0])
+        rng = random.Random(count)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        # Written item by item so the server itself stays small
+        self.wfile.write(b'{"id":"user/-/state/com.google/reading-list","items":[')
+        for i in range(count):
+            if i:
+                self.wfile.write(b",")
+            self.wfile.write(json.dumps(make_item(rng, i)).encode())
+        self.wfile.write(b'],"continuation":"next"}')
+
+
+def serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    print(server.server_port, flush=True)
+    server.serve_forever()
+
+
+def measure(port: int, count: int, stream_json: bool):
+    """Child process: fetch one page, report peak RSS growth in MB"""
+    import freshrss_client
+
+    client = freshrss_client.FreshRSSClient("bench", "bench")
+    client.base_url = f"http://127.0.0.1:{port}"
+    client.auth_token = "bench"
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    received = 0
+    for _ in client.iter_articles(page_size=count, max_articles=count, since_hours=None,
+                                  prefetch=False, stream_json=stream_json):
+        received += 1
+    seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"received": received, "peak_mb": (peak - baseline) / 1024, "seconds": seconds}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming JSON memory benchmark")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--measure", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+        return
+    if args.measure:
+        port, count, mode = args.measure
+        measure(int(port), int(count), mode == "stream")
+        return
+
+    server = subprocess.Popen([sys.executable, __file__, "--serve"], stdout=subprocess.PIPE, text=True)
+    try:
+        port = server.stdout.readline().strip()
+        print(f"{'items':>7} {'mode':<9} {'peak RSS growth MB':>19} {'seconds':>8}")
+        for count in args.items:
+            for mode in ("buffered", "stream"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--measure", port, str(count), mode],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                assert result["received"] == count, result
+                print(f"{count:>7} {mode:<9} {result['peak_mb']:>19.1f} {result['seconds']:>8.2f}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Synthetic Google Reader items and Articles for offline benchmarks
+
+Title and body lengths follow log-normal distributions (a few very long
+articles, many short ones), bodies are HTML paragraphs, and a configurable
+share of words are real HIGH_VALUE_KEYWORDS phrases.
+
+Usage: python3 benchmarks/synthetic_corpus.py [--items 1000] > corpus.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import HIGH_VALUE_KEYWORDS
+from keyword_scorer import Article
+
+FILLER = ("the of and to in a is that for on with as was by it from at are an be this have has "
+          "report said new market government data people year company week city plan results "
+          "according officials system project support analysis public policy service growth").split()
+
+FEEDS = [
+    ("feed/1", "Reuters", "https://www.reuters.com"),
+    ("feed/2", "Ars Technica", "https://arstechnica.com"),
+    ("feed/3", "ČT24", "https://ct24.ceskatelevize.cz"),
+    ("feed/4", "Heise", "https://www.heise.de"),
+    ("feed/5", "Hacker News", "https://news.ycombinator.com"),
+    ("feed/6", "Nature", "https://www.nature.com"),
+    ("feed/7", "Euractiv", "https://www.euractiv.com"),
+    ("feed/8", "Some Blog", "https://blog.example.com"),
+]
+
+LABELS = ["Tech", "Science", "Politics", "Security", "Local"]
+
+
+class SyntheticCorpus:
+    """Deterministic generator of stream/contents items"""
+
+    def __init__(
+        self,
+        size: int = 1000,
+        seed: int = 42,
+        keyword_density: float = 0.02,
+        title_words_median: float = 9,
+        body_words_median: float = 350,
+        span_hours: float = 72,
+        now: Optional[float] = None
+    ):
+        self.size = size
+        self.seed = seed
+        self.keyword_density = keyword_density
+        self.title_words_median = title_words_median
+        self.body_words_median = body_words_median
+        self.span_seconds = span_hours * 3600
+        self.now = int(now if now is not None else time.time())
+        self.keywords = [k for kw in HIGH_VALUE_KEYWORDS.values() for k in kw["positive"] + kw["negative"]]
+
+    def _words(self, rng: random.Random, median: float, sigma: float, cap: int) -> List[str]:
+        count = max(1, min(cap, int(rng.lognormvariate(0, sigma) * median)))
+        return [rng.choice(self.keywords) if rng.random() < self.keyword_density else rng.choice(FILLER)
+                for _ in range(count)]
+
+    def item(self, index: int) -> Dict:
+        """The index-th item; the same index always yields the same item"""
+        rng = random.Random(self.seed * 1_000_003 + index)
+        stream_id, source, site = FEEDS[index % len(FEEDS)]
+        title = " ".join(self._words(rng, self.title_words_median, 0.35, 30)).capitalize()
+        body_words = self._words(rng, self.body_words_median, 0.8, 6000)
+        paragraphs = [" ".join(body_words[i:i + 60]) for i in range(0, len(body_words), 60)]
+        content = "".join(f"<p>{paragraph}</p>\n" for paragraph in paragraphs)
+        if rng.random() < 0.3:
+            content = f'<div class="ad"><script>track({index});</script></div>{content}&nbsp;&mdash;'
+
+        # Spread evenly over the span, index 0 is the newest
+        published = self.now - int(self.span_seconds * index / max(1, self.size))
+        labels = [f"user/-/label/{rng.choice(LABELS)}"]
+        return {
+            "id": f"tag:google.com,2005:reader/item/{self.seed:04x}{index:012x}",
+            "crawlTimeMsec": str(published * 1000),
+            "timestampUsec": str(published * 1_000_000 + index % 1_000_000),
+            "published": published,
+            "updated": published,
+            "title": title,
+            "canonical": [{"href": f"{site}/article/{index}"}],
+            "alternate": [{"href": f"{site}/article/{index}", "type": "text/html"}],
+            "summary": {"direction": "ltr", "content": content},
+            "author": "Benchmark",
+            "origin": {"streamId": stream_id, "title": source, "htmlUrl": site},
+            "categories": ["user/-/state/com.google/reading-list"] + labels,
+        }
+
+    def items(self) -> List[Dict]:
+        """All items, newest first"""
+        return [self.item(i) for i in range(self.size)]
+
+    def articles(self) -> List[Article]:
+        """All items as Articles, built the same way the client builds them"""
+        from freshrss_client import FreshRSSClient
+        return [FreshRSSClient.parse_item(item) for item in self.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic stream/contents corpus")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keyword-density", type=float, default=0.02)
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(size=args.items, seed=args.seed, keyword_density=args.keyword_density)
+    json.dump({"items": corpus.items()}, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
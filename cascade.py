@@ -0,0 +1,269 @@
+"""
+Tiered scoring cascade: cheap scorers gate the expensive ones
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import CASCADE_CONFIG, SCORING_CONFIG
+from keyword_scorer import Article
+from metrics import METRICS
+from scoring_pipeline import estimate_tokens
+
+
+@dataclass
+class CascadeStage:
+    """
+    One scorer in the cascade
+
+    score_batch maps a list of articles to one result each (None or an
+    exception for failures) and score_of turns a result into a 0-100 score.
+    An article enters this stage if its blended score so far is at least
+    min_score or lies within uncertainty_band; the first stage takes
+    everything.
+    Entrants are scored best-first until a budget runs out: max_articles,
+    max_tokens (estimated) or max_seconds of stage wall time. Results found
+    by lookup (e.g. the score cache) cost no budget.
+    """
+    name: str
+    score_batch: Callable[[List[Article]], List[Any]]
+    score_of: Callable[[Any], float]
+    weight: float = 1.0
+    min_score: Optional[float] = None
+    uncertainty_band: Optional[Tuple[float, float]] = None
+    max_articles: Optional[int] = None
+    max_tokens: Optional[int] = None
+    max_seconds: Optional[float] = None
+    batch_size: int = 50
+    lookup: Optional[Callable[[Article], Optional[Any]]] = None
+    token_estimator: Callable[[List[Article]], int] = estimate_tokens
+
+    def admits(self, score: float) -> bool:
+        if self.min_score is None and self.uncertainty_band is None:
+            return True
+        if self.min_score is not None and score >= self.min_score:
+            return True
+        if self.uncertainty_band is not None:
+            low, high = self.uncertainty_band
+            return low <= score <= high
+        return False
+
+
+@dataclass
+class CascadeResult:
+    """Scores of one article; pruned_at names the first stage it did not get"""
+    article: Article
+    results: Dict[str, Any] = field(default_factory=dict)
+    scores: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+    final_score: float = 0.0    # Weighted blend of the stage scores so far
+    pruned_at: Optional[str] = None
+    prune_reason: Optional[str] = None  # "gate", "articles", "tokens", "seconds" or "failed"
+
+    @property
+    def latest_score(self) -> Optional[float]:
+        return next(reversed(self.scores.values()), None)
+
+    def reached(self, stage: str) -> bool:
+        return stage in self.results or stage in self.errors
+
+
+@dataclass
+class StageReport:
+    """Per-cycle accounting of one stage"""
+    name: str
+    entered: int = 0
+    gated: int = 0          # Below min_score and outside the uncertainty band
+    over_budget: int = 0    # Admitted, but a budget ran out first
+    scored: int = 0
+    cached: int = 0
+    failed: int = 0
+    tokens: int = 0
+    seconds: float = 0.0
+    budget_exhausted: Optional[str] = None
+
+    @property
+    def pruned(self) -> int:
+        return self.gated + self.over_budget
+
+
+class ScoringCascade:
+    """
+    Runs a batch through increasingly expensive stages
+
+    Stage one scores the whole batch. Each later stage only sees articles
+    the previous one scored and its gate admits, most promising first, so
+    a spent budget cuts off the weakest candidates. Gates and the final
+    score use the average of every stage score an article got so far,
+    weighted by stage weight.
+    """
+
+    def __init__(self, stages: Sequence[CascadeStage]):
+        if not stages:
+            raise ValueError("A cascade needs at least one stage")
+        self.stages = list(stages)
+        self.reports: List[StageReport] = []
+
+    def run(self, articles: Sequence[Article]) -> List[CascadeResult]:
+        """Score a batch; results are in input order"""
+        results = [CascadeResult(article=article) for article in articles]
+        self.reports = []
+        weights = {stage.name: stage.weight for stage in self.stages}
+        candidates = results
+        for stage in self.stages:
+            report = StageReport(stage.name)
+            self.reports.append(report)
+            with METRICS.timer(f"cascade_{stage.name}_seconds"):
+                candidates = self._run_stage(stage, candidates, report, is_first=stage is self.stages[0])
+            for candidate in candidates:
+                self._blend(candidate, weights)
+            METRICS.increment(f"cascade_{stage.name}_scored_total", report.scored)
+            METRICS.increment(f"cascade_{stage.name}_pruned_total", report.pruned)
+        return results
+
+    @staticmethod
+    def _blend(result: CascadeResult, weights: Dict[str, float]):
+        total_weight = sum(weights[name] for name in result.scores)
+        if total_weight > 0:
+            result.final_score = sum(score * weights[name] for name, score in result.scores.items()) / total_weight
+
+    def _run_stage(
+        self,
+        stage: CascadeStage,
+        candidates: List[CascadeResult],
+        report: StageReport,
+        is_first: bool
+    ) -> List[CascadeResult]:
+        """Score admitted candidates within budget; returns those scored"""
+        report.entered = len(candidates)
+        if is_first:
+            admitted = list(candidates)
+        else:
+            admitted = []
+            for candidate in candidates:
+                if stage.admits(candidate.final_score):
+                    admitted.append(candidate)
+                else:
+                    candidate.pruned_at, candidate.prune_reason = stage.name, "gate"
+                    report.gated += 1
+            admitted.sort(key=lambda candidate: candidate.final_score, reverse=True)
+
+        # Free results first, so they never count against the budget
+        pending = []
+        for candidate in admitted:
+            cached = stage.lookup(candidate.article) if stage.lookup is not None else None
+            if cached is not None:
+                report.cached += self._record(stage, candidate, cached, report)
+            else:
+                pending.append(candidate)
+
+        started = time.perf_counter()
+        position = 0
+        while position < len(pending):
+            chunk = pending[position:position + stage.batch_size]
+            reason = None
+            if stage.max_articles is not None:
+                remaining = stage.max_articles - position
+                if remaining <= 0:
+                    reason = "articles"
+                chunk = chunk[:max(0, remaining)]
+            chunk_tokens = 0
+            if reason is None and stage.max_tokens is not None:
+                fits = 0
+                for candidate in chunk:
+                    tokens = stage.token_estimator([candidate.article])
+                    if report.tokens + chunk_tokens + tokens > stage.max_tokens:
+                        break
+                    chunk_tokens += tokens
+                    fits += 1
+                chunk = chunk[:fits]
+                if not chunk:
+                    reason = "tokens"
+            if reason is None and stage.max_seconds is not None and time.perf_counter() - started >= stage.max_seconds:
+                reason = "seconds"
+            if reason is not None:
+                report.budget_exhausted = reason
+                for candidate in pending[position:]:
+                    candidate.pruned_at, candidate.prune_reason = stage.name, reason
+                report.over_budget = len(pending) - position
+                break
+
+            report.tokens += chunk_tokens
+            try:
+                outcomes = stage.score_batch([candidate.article for candidate in chunk])
+                if len(outcomes) != len(chunk):
+                    raise RuntimeError(f"{stage.name} returned {len(outcomes)} results for {len(chunk)} articles")
+            except Exception as e:
+                outcomes = [e] * len(chunk)
+            for candidate, outcome in zip(chunk, outcomes):
+                self._record(stage, candidate, outcome, report)
+            position += len(chunk)
+        report.seconds = time.perf_counter() - started
+
+        return [candidate for candidate in admitted if stage.name in candidate.scores]
+
+    @staticmethod
+    def _record(stage: CascadeStage, candidate: CascadeResult, outcome: Any, report: StageReport) -> bool:
+        """Store one stage outcome; returns False for failures"""
+        try:
+            if outcome is None or isinstance(outcome, Exception):
+                raise outcome or RuntimeError(f"{stage.name} returned no result")
+            score = float(stage.score_of(outcome))
+        except Exception as e:
+            candidate.errors[stage.name] = e
+            candidate.pruned_at, candidate.prune_reason = stage.name, "failed"
+            report.failed += 1
+            return False
+        candidate.results[stage.name] = outcome
+        candidate.scores[stage.name] = score
+        report.scored += 1
+        return True
+
+    def format_report(self) -> str:
+        """Per-stage table of how many articles each stage scored and pruned"""
+        lines = [f"{'stage':<14} {'in':>6} {'scored':>7} {'cached':>7} {'gated':>6} {'budget':>16} {'failed':>7} {'tokens':>8} {'secs':>7}"]
+        for report in self.reports:
+            budget = f"{report.over_budget}" + (f" ({report.budget_exhausted})" if report.budget_exhausted else "")
+            lines.append(
+                f"{report.name:<14} {report.entered:>6} {report.scored - report.cached:>7} {report.cached:>7} "
+                f"{report.gated:>6} {budget:>16} {report.failed:>7} {report.tokens:>8} {report.seconds:>7.2f}"
+            )
+        return "\n".join(lines)
+
+
+def keyword_stage(scorer=None, **overrides) -> CascadeStage:
+    """KeywordScorer as the first, whole-batch stage"""
+    if scorer is None:
+        from keyword_scorer import KeywordScorer
+        scorer = KeywordScorer()
+    options = {
+        "weight": SCORING_CONFIG["weights"]["keyword_score"],
+        "batch_size": 1000,
+        **CASCADE_CONFIG.get("keyword", {}),
+        **overrides,
+    }
+    return CascadeStage(
+        name="keyword",
+        score_batch=scorer.score_articles_batch,
+        score_of=lambda result: result["keyword_score"],
+        **options
+    )
+
+
+def semantic_stage(scorer=None, **overrides) -> CascadeStage:
+    """Local SemanticScorer, between the keyword and AI stages"""
+    if scorer is None:
+        from semantic_scorer import SemanticScorer
+        scorer = SemanticScorer()
+    options = {
+        "weight": SCORING_CONFIG["weights"]["semantic_score"],
+        "batch_size": 1000,
+        **CASCADE_CONFIG.get("semantic", {}),
+        **overrides,
+    }
+    return CascadeStage(
+        name="semantic",
+        score_batch=scorer.score_articles_batch,
+        score_of=lambda result: result["semantic_score"],
+        **options
+    )
@@ -1,14 +1,21 @@
 """
 RSS AI Scorer Configuration
+
+Static tables are plain module constants. Environment-derived settings and
+the topic scores are evaluated lazily on first access (see Settings and
+module __getattr__), so importing config costs no file I/O.
 """
 import os
 import json
-from typing import Dict, Any
+from functools import cached_property
+from typing import Dict, Any, Optional
+
+ENV_FILE = "/home/clindevdep/.env"
 
 # Load environment variables from parent directory .env file
 def load_env_from_file():
     """Load environment variables from /home/clindevdep/.env"""
-    env_path = "/home/clindevdep/.env"
+    env_path = ENV_FILE
     if os.path.exists(env_path):
         try:
             with open(env_path, 'r') as f:
@@ -22,22 +29,116 @@ def load_env_from_file():
         except Exception as e:
             print(f"Warning: Could not load .env file: {e}")
 
-# Load environment variables
-load_env_from_file()
-
-# FreshRSS API Configuration
-FRESHRSS_BASE_URL = os.getenv("FRESHRSS_BASE_URL", "http://localhost:8085")
-FRESHRSS_API_URL = f"{FRESHRSS_BASE_URL}/api/greader.php"
-FRESHRSS_API_TOKEN = os.getenv("FRESHRSS_API_TOKEN")  # Pre-authenticated token
+class Settings:
+    """Environment-derived settings, read on first access and memoized"""
+    
+    def __init__(self):
+        self._env_loaded = False
+    
+    def load_env(self):
+        """Load the .env file once"""
+        if not self._env_loaded:
+            load_env_from_file()
+            self._env_loaded = True
+    
+    def getenv(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        self.load_env()
+        return os.getenv(key, default)
+    
+    # FreshRSS API Configuration
+    @cached_property
+    def freshrss_base_url(self) -> str:
+        return self.getenv("FRESHRSS_BASE_URL", "http://localhost:8085")
+    
+    @cached_property
+    def freshrss_api_url(self) -> str:
+        return f"{self.freshrss_base_url}/api/greader.php"
+    
+    @cached_property
+    def freshrss_api_token(self) -> Optional[str]:
+        return self.getenv("FRESHRSS_API_TOKEN")  # Pre-authenticated token
+    
+    # Local data directory (mounted volume in the container)
+    @cached_property
+    def data_dir(self) -> str:
+        return self.getenv("DATA_DIR", "data")
+    
+    @cached_property
+    def sync_state_file(self) -> str:
+        return self.getenv("SYNC_STATE_FILE", os.path.join(self.data_dir, "sync_state.json"))
+    
+    @cached_property
+    def score_cache_file(self) -> str:
+        return self.getenv("SCORE_CACHE_FILE", os.path.join(self.data_dir, "score_cache.db"))
+    
+    @cached_property
+    def article_store_file(self) -> str:
+        return self.getenv("ARTICLE_STORE_FILE", os.path.join(self.data_dir, "articles.db"))
+    
+    @cached_property
+    def near_duplicate_file(self) -> str:
+        return self.getenv("NEAR_DUPLICATE_FILE", os.path.join(self.data_dir, "near_duplicates.db"))
+    
+    @cached_property
+    def keyword_match_file(self) -> str:
+        return self.getenv("KEYWORD_MATCH_FILE", os.path.join(self.data_dir, "keyword_matches.db"))
+    
+    @cached_property
+    def topic_model_file(self) -> str:
+        return self.getenv("TOPIC_MODEL_FILE", os.path.join(self.data_dir, "topic_model.npz"))
+    
+    @cached_property
+    def backfill_dir(self) -> str:
+        return self.getenv("BACKFILL_DIR", os.path.join(self.data_dir, "backfill"))
+    
+    @cached_property
+    def results_dir(self) -> str:
+        return self.getenv("RESULTS_DIR", os.path.join(self.data_dir, "results"))
+    
+    # Dashboard Configuration
+    @cached_property
+    def dashboard_base_url(self) -> str:
+        return self.getenv("DASHBOARD_BASE_URL", "https://news.clindevdep.com")
+    
+    @cached_property
+    def dashboard_url(self) -> str:
+        return self.dashboard_base_url.rstrip('/')  # Remove trailing slash
+    
+    # API Keys (set via environment variables)
+    @cached_property
+    def google_api_key(self) -> Optional[str]:
+        return self.getenv("GOOGLE_API_KEY")  # For Gemini Flash
+    
+    @cached_property
+    def anthropic_api_key(self) -> Optional[str]:
+        return self.getenv("ANTHROPIC_API_KEY")  # For Claude Sonnet
+    
+    @cached_property
+    def openai_api_key(self) -> Optional[str]:
+        return self.getenv("OPENAI_API_KEY")  # For embeddings
 
-# Dashboard Configuration  
-DASHBOARD_BASE_URL = os.getenv("DASHBOARD_BASE_URL", "https://news.clindevdep.com")
-DASHBOARD_URL = DASHBOARD_BASE_URL.rstrip('/')  # Remove trailing slash
+settings = Settings()
 
-# API Keys (set via environment variables)
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # For Gemini Flash
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")  # For Claude Sonnet
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # For embeddings
+# Former module constants now served lazily by __getattr__ below
+_LAZY_SETTINGS = {
+    "FRESHRSS_BASE_URL": "freshrss_base_url",
+    "FRESHRSS_API_URL": "freshrss_api_url",
+    "FRESHRSS_API_TOKEN": "freshrss_api_token",
+    "DATA_DIR": "data_dir",
+    "SYNC_STATE_FILE": "sync_state_file",
+    "SCORE_CACHE_FILE": "score_cache_file",
+    "ARTICLE_STORE_FILE": "article_store_file",
+    "NEAR_DUPLICATE_FILE": "near_duplicate_file",
+    "KEYWORD_MATCH_FILE": "keyword_match_file",
+    "TOPIC_MODEL_FILE": "topic_model_file",
+    "BACKFILL_DIR": "backfill_dir",
+    "RESULTS_DIR": "results_dir",
+    "DASHBOARD_BASE_URL": "dashboard_base_url",
+    "DASHBOARD_URL": "dashboard_url",
+    "GOOGLE_API_KEY": "google_api_key",
+    "ANTHROPIC_API_KEY": "anthropic_api_key",
+    "OPENAI_API_KEY": "openai_api_key",
+}
 
 # Scoring Configuration
 SCORING_CONFIG = {
@@ -54,34 +155,148 @@ SCORING_CONFIG = {
     "batch_sizes": {
         "embedding": 50,          # Process 50 articles at once for embeddings
         "ai_scoring": 20          # Process 20 articles at once for AI scoring
+    },
+    "rate_limits": {
+        "ai_scoring": {
+            "requests_per_minute": 3,      # Conservative API request budget
+            "tokens_per_minute": 60000     # Estimated prompt tokens budget
+        }
+    }
+}
+
+# Plain-text cap for fetched article content (characters)
+MAX_ARTICLE_TEXT_CHARS = 20000
+
+# Score cache eviction limits
+SCORE_CACHE_CONFIG = {
+    "max_entries": 100000,    # Oldest entries beyond this are evicted
+    "max_age_hours": 168      # Entries older than a week are evicted
+}
+
+# Near-duplicate detection: MinHash over word shingles with banded LSH.
+# bands x rows_per_band = num_perm; pairs with estimated Jaccard similarity
+# above threshold are copies of the same story
+NEAR_DUPLICATE_CONFIG = {
+    "num_perm": 64,
+    "bands": 16,
+    "shingle_size": 3,     # Words per shingle
+    "threshold": 0.7,
+    "max_age_hours": 168,  # Stories older than a week are forgotten
+    "seed": 1
+}
+
+# Scoring cascade: per-stage gate and per-cycle budget (see cascade.py).
+# A stage admits articles whose blended score so far is at least min_score
+# or inside uncertainty_band; None disables a limit
+CASCADE_CONFIG = {
+    "keyword": {},                       # First stage scores every article
+    "semantic": {},                      # Cheap enough to score every article
+    "ai_scoring": {
+        "min_score": 50,                 # Clear keyword hits
+        "uncertainty_band": (40, 50),    # Too close to call on keywords alone
+        "max_articles": 100,             # AI calls per cycle
+        "max_tokens": 150000,            # Estimated prompt tokens per cycle
+        "max_seconds": 900               # Stop starting new batches after 15 minutes
     }
 }
 
+# Local semantic scorer: hashed TF-IDF vectors vs. topic centroids (see semantic_scorer.py)
+SEMANTIC_CONFIG = {
+    "n_features": 2 ** 18,               # Hashed columns; fixed memory per topic centroid
+    "bigrams": True,                     # Word pairs in addition to single words
+    "sublinear_tf": True,                # 1 + log(count) instead of raw counts
+    "full_confidence_similarity": 0.15,  # Best-topic cosine at which the topic preference counts fully
+    "example_weight": 1.0,               # Rated-article centroid vs. keyword centroid
+    "min_example_score": 75              # Articles rated at least this refine their topic centroid
+}
+
+# Watch mode (main.py --watch): polling interval adapts to the arrival rate (see watch.py)
+WATCH_CONFIG = {
+    "initial_seconds": 300,    # First wait, as the monitoring daemon's 5 minutes
+    "min_seconds": 60,
+    "max_seconds": 1800,
+    "target_articles": 50,     # New articles per cycle to aim for
+    "smoothing": 0.3,          # Weight of the latest cycle in the arrival rate average
+    "backoff_factor": 1.5      # Interval growth after a cycle without new articles
+}
+
+# Full reading-list backfill (main.py --backfill, see backfill.py)
+BACKFILL_CONFIG = {
+    "scorers": ("keyword",),            # Any of "keyword", "semantic"
+    "page_size": 500,                   # Articles per FreshRSS request, and per chunk file
+    "pages_in_flight_per_process": 2,   # Pages handed to the pool ahead of the next commit
+    "report_seconds": 10                # Progress line interval
+}
+
+# Per-feed or per-label fetching (--fetch-by)
+FAIR_FETCH_CONFIG = {
+    "max_workers": 8,       # Streams fetched concurrently
+    "weighted": True        # Share the article limit by source x regional weight instead of equally
+}
+
+RESULTS_CONFIG = {
+    "batch_size": 500,      # Rows buffered before one append to results.jsonl and the column files
+    "id_bytes": 64          # Fixed width of the id column; Google Reader item ids are 48 bytes
+}
+
+# Seconds between checks for a changed topic score file or model artifact
+TOPIC_MODEL_CHECK_SECONDS = 5
+
 # Topic Scores Configuration
+# Look for the file in current directory or parent directory
+TOPIC_SCORE_FILE_PATHS = [
+    "topic_scores_100_personalized.json",
+    "../topic_scores_100_personalized.json",
+    os.path.join(os.path.dirname(__file__), "..", "topic_scores_100_personalized.json")
+]
+
+# Last parsed topic score file: path, mtime and scores
+_topic_scores_cache: Dict[str, Any] = {"path": None, "mtime_ns": None, "scores": {}}
+
 def load_topic_scores():
     """Load personalized topic scores from JSON file"""
+    return get_topic_scores()
+
+def get_topic_scores() -> Dict[str, float]:
+    """
+    Topic scores, parsed on first access and cached
+    The file is re-read only when its mtime changes (or it moves/disappears).
+    """
+    cache = _topic_scores_cache
+    path = cache["path"]
     try:
-        import os
-        # Look for the file in current directory or parent directory
-        file_paths = [
-            "topic_scores_100_personalized.json",
-            "../topic_scores_100_personalized.json",
-            os.path.join(os.path.dirname(__file__), "..", "topic_scores_100_personalized.json")
-        ]
-        
-        for file_path in file_paths:
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    return {
-                        topic["topic"]: topic["score"] 
-                        for topic in data["complete_topic_list"]
-                    }
-    except Exception as e:
-        print(f"Error loading topic scores: {e}")
-        return {}
-
-TOPIC_SCORES = load_topic_scores()
+        mtime_ns = os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        mtime_ns = None
+    
+    if mtime_ns is None:
+        # Not found yet (or gone): probe the candidate locations again
+        path = next((file_path for file_path in TOPIC_SCORE_FILE_PATHS if os.path.exists(file_path)), None)
+        if path is None:
+            cache.update(path=None, mtime_ns=None, scores={})
+            return cache["scores"]
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return cache["scores"]
+    
+    if path != cache["path"] or mtime_ns != cache["mtime_ns"]:
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            scores = {topic["topic"]: topic["score"] for topic in data["complete_topic_list"]}
+            cache.update(path=path, mtime_ns=mtime_ns, scores=scores)
+        except Exception as e:
+            print(f"Error loading topic scores: {e}")
+    return cache["scores"]
+
+def __getattr__(name: str) -> Any:
+    """Lazy module attributes: environment settings and TOPIC_SCORES"""
+    if name in _LAZY_SETTINGS:
+        return getattr(settings, _LAZY_SETTINGS[name])
+    if name == "TOPIC_SCORES":
+        return get_topic_scores()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Keywords for each high-scoring topic
 HIGH_VALUE_KEYWORDS = {
@@ -126,6 +341,13 @@ SOURCE_WEIGHTS = {
     "low_reliability": 0.8     # Questionable sources
 }
 
+# Source name or domain fragments per reliability tier; unlisted sources
+# are medium_reliability
+SOURCE_RELIABILITY = {
+    "high_reliability": ["nature.com", "science.org", "bellingcat", "reuters"],
+    "low_reliability": []
+}
+
 # Regional preferences
 REGIONAL_WEIGHTS = {
     "czech": 1.5,     # 1.5x for Czech content
@@ -133,6 +355,13 @@ REGIONAL_WEIGHTS = {
     "global": 1.0     # 1.0x for global content
 }
 
+# Domain suffixes or source name fragments per region; anything else is global
+REGIONAL_SOURCES = {
+    "czech": [".cz", "čt24", "irozhlas", "seznam zprávy", "denník n"],
+    "european": [".eu", ".de", ".fr", ".at", ".sk", ".pl", ".nl", ".be", ".it", ".es", ".uk",
+                 "euractiv", "politico europe", "euronews", "dw.com"]
+}
+
 # Freshness decay configuration
 FRESHNESS_CONFIG = {
     "max_age_hours": 168,     # 1 week maximum
@@ -4,22 +4,84 @@ FreshRSS API client for retrieving articles
 import requests
 import json
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from keyword_scorer import Article
-from config import FRESHRSS_API_URL, FRESHRSS_API_TOKEN
+from config import FAIR_FETCH_CONFIG, settings
+from metrics import METRICS
+from sync_state import SyncStateStore
+from article_store import ArticleStore
+from stream_json import iter_json_array_items
+from text_normalizer import decode_title, html_to_text
+
+READ_TAG = "user/-/state/com.google/read"
+STARRED_TAG = "user/-/state/com.google/starred"
+
+# Ids per edit-tag request
+EDIT_TAG_CHUNK_SIZE = 100
+
+# Bytes read per chunk when parsing stream/contents incrementally
+STREAM_READ_CHUNK_SIZE = 64 * 1024
+
+# Fetched articles written to the local store per transaction
+ARTICLE_STORE_BATCH_SIZE = 200
+
+READING_LIST = "user/-/state/com.google/reading-list"
+
+def fair_shares(total: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """
+    Split total slots in proportion to weights (largest remainder method)
+    Ties go to the earlier stream, so with fewer slots than streams the
+    first ones in subscription order get them. If no stream has a positive
+    weight the slots are split equally.
+    """
+    weight_sum = sum(weights.values())
+    if weight_sum <= 0:
+        weights = {stream_id: 1.0 for stream_id in weights}
+        weight_sum = len(weights)
+    if total <= 0 or weight_sum <= 0:
+        return {stream_id: 0 for stream_id in weights}
+    exact = {stream_id: total * weight / weight_sum for stream_id, weight in weights.items()}
+    shares = {stream_id: int(value) for stream_id, value in exact.items()}
+    by_remainder = sorted(weights, key=lambda stream_id: shares[stream_id] - exact[stream_id])
+    for stream_id in by_remainder[:total - sum(shares.values())]:
+        shares[stream_id] += 1
+    return shares
+
+@dataclass
+class EditTagResult:
+    """Outcome of a bulk edit-tag call; truthy when every id succeeded"""
+    succeeded: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)  # id -> error
+    
+    def __bool__(self) -> bool:
+        return not self.failed
 
 class FreshRSSClient:
     """Client for interacting with FreshRSS Google Reader API"""
     
-    def __init__(self, username: str, password: str):
-        self.base_url = FRESHRSS_API_URL
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        sync_state: Optional[SyncStateStore] = None,
+        article_store: Optional[ArticleStore] = None
+    ):
+        self.base_url = settings.freshrss_api_url
         self.username = username
         self.password = password
         # Use pre-configured token if available
-        self.auth_token = FRESHRSS_API_TOKEN
+        self.auth_token = settings.freshrss_api_token
         self.session = requests.Session()
+        # Watermarks for incremental fetches; only advanced by commit_sync()
+        self.sync_state = sync_state
+        self.pending_sync: Dict[str, Dict] = {}
+        # Local copy of every fetched article, for re-scoring and search
+        self.article_store = article_store
         
+    @METRICS.timed("freshrss_auth_seconds")
     def authenticate(self) -> bool:
         """Authenticate with FreshRSS Google Reader API"""
         # Skip authentication if we already have a token
@@ -62,144 +124,732 @@ class FreshRSSClient:
             print(f"Authentication error: {e}")
             return False
     
+    def _send(self, method: str, url: str, headers: Optional[Dict] = None, **kwargs) -> requests.Response:
+        """Authorized request; a rejected login token is renewed once and the request retried"""
+        for attempt in range(2):
+            request_headers = {**(headers or {}), 'Authorization': f'GoogleLogin auth={self.auth_token}'}
+            response = self.session.request(method, url, headers=request_headers, **kwargs)
+            if response.status_code != 401 or attempt or not self._renew_token():
+                return response
+            response.close()
+    
+    def _renew_token(self) -> bool:
+        """Log in again after the server rejected our token (long-running --watch sessions)"""
+        if settings.freshrss_api_token and self.auth_token == settings.freshrss_api_token:
+            return False  # A pre-configured token cannot be renewed here
+        print("🔑 Auth token rejected, logging in again")
+        METRICS.increment("freshrss_reauth_total")
+        self.auth_token = None
+        return self.authenticate()
+    
+    @METRICS.timed("freshrss_get_articles_seconds")
     def get_articles(
         self, 
         limit: int = 100,
-        since_hours: int = 24,
-        unread_only: bool = False
+        since_hours: Optional[int] = 24,
+        unread_only: bool = False,
+        stream_json: bool = False
     ) -> List[Article]:
         """
         Fetch articles from FreshRSS
         """
+        articles = list(self.iter_articles(
+            page_size=limit,
+            max_articles=limit,
+            since_hours=since_hours,
+            unread_only=unread_only,
+            stream_json=stream_json
+        ))
+        print(f"✓ Retrieved {len(articles)} articles from FreshRSS")
+        return articles
+    
+    def iter_articles(
+        self,
+        page_size: int = 100,
+        max_articles: Optional[int] = None,
+        since_hours: Optional[int] = 24,
+        unread_only: bool = False,
+        prefetch: bool = True,
+        incremental: bool = False,
+        stream_json: bool = False
+    ) -> Iterator[Article]:
+        """
+        Stream articles from FreshRSS page by page, following continuation tokens
+        
+        Articles are yielded as soon as their page is parsed. With prefetch
+        enabled the next page is downloaded in the background while the
+        caller works through the current one.
+        
+        With incremental=True (requires a sync_state store) only items newer
+        than the stream's watermark are requested, oldest first, and the new
+        watermark is staged until commit_sync() is called. since_hours is
+        only used when the stream has no watermark yet.
+        
+        With stream_json=True each response body is read in chunks and its
+        items are parsed one at a time, so memory stays flat regardless of
+        page size. The continuation token only arrives after the items, so
+        pages are then fetched one after another without prefetch.
+        
+        With an article_store every yielded article is also upserted into
+        it, in batches of ARTICLE_STORE_BATCH_SIZE.
+        """
+        articles = self._iter_fetched_articles(
+            page_size, max_articles, since_hours, unread_only, prefetch, incremental, stream_json
+        )
+        if self.article_store is not None:
+            articles = self._store_articles(articles)
+        yield from articles
+    
+    def iter_pages(
+        self,
+        page_size: int = 100,
+        since_timestamp: Optional[int] = None,
+        continuation: Optional[str] = None,
+        prefetch: bool = True
+    ) -> Iterator[Tuple[List[Article], Optional[str]]]:
+        """
+        Walk the whole reading list page by page, newest first
+        Yields: (articles of one page, continuation token of the next page)
+        
+        The stream is finished once a page comes with a None continuation;
+        if the iterator stops before that, a request failed and the walk can
+        be resumed later from the last continuation token seen. Unlike
+        iter_articles this neither stages sync watermarks nor writes to the
+        article store.
+        """
+        if not self.auth_token and not self.authenticate():
+            print("Authentication required")
+            return
+        
+        stream_id = READING_LIST
+        params = {'output': 'json'}
+        if since_timestamp is not None:
+            params['ot'] = since_timestamp
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._fetch_page, stream_id, params, page_size, continuation)
+            while future is not None:
+                data = future.result()
+                future = None
+                if data is None:
+                    return
+                
+                items = data['items']
+                next_continuation = data.get('continuation') if items else None
+                if next_continuation and prefetch:
+                    future = executor.submit(self._fetch_page, stream_id, params, page_size, next_continuation)
+                
+                articles = [article for article in map(self.parse_item, items) if article is not None]
+                yield articles, next_continuation
+                
+                if next_continuation and not prefetch:
+                    future = executor.submit(self._fetch_page, stream_id, params, page_size, next_continuation)
+    
+    def list_subscriptions(self) -> List[Dict]:
+        """Subscribed feeds: [{'id': 'feed/...', 'title', 'url', 'htmlUrl', 'categories': [{'id', 'label'}]}]"""
+        data = self._get_json("subscription/list")
+        return data.get('subscriptions', []) if data else []
+    
+    def list_labels(self) -> List[str]:
+        """Label stream ids (user/-/label/...)"""
+        data = self._get_json("tag/list")
+        return [tag['id'] for tag in data.get('tags', []) if '/label/' in tag.get('id', '')] if data else []
+    
+    def _get_json(self, endpoint: str) -> Optional[Dict]:
+        try:
+            response = self._send("GET", f"{self.base_url}/{endpoint}", params={'output': 'json'})
+            if response.status_code != 200:
+                METRICS.increment("freshrss_fetch_errors_total")
+                print(f"API request failed: {response.status_code}")
+                return None
+            return response.json()
+        except Exception as e:
+            METRICS.increment("freshrss_fetch_errors_total")
+            print(f"Error fetching {endpoint}: {e}")
+            return None
+    
+    def stream_weights(self, group_by: str = "feed", weighted: bool = FAIR_FETCH_CONFIG["weighted"]) -> Dict[str, float]:
+        """
+        Stream id -> share weight for fair fetching, in subscription order
+        
+        A feed weighs what the ranker gives its articles (source reliability
+        x region, from SOURCE_WEIGHTS and REGIONAL_WEIGHTS); a label weighs
+        the mean of its feeds. Unweighted, every stream counts the same.
+        """
+        from ranking import Ranker
+        
+        subscriptions = self.list_subscriptions()
+        ranker = Ranker()
+        feed_weights = {
+            subscription['id']: ranker.article_weight(
+                subscription.get('title', ''), subscription.get('htmlUrl') or subscription.get('url', '')
+            ) if weighted else 1.0
+            for subscription in subscriptions
+        }
+        if group_by == "feed":
+            return feed_weights
+        if group_by != "label":
+            raise ValueError(f"Unknown stream grouping {group_by!r}; use 'feed' or 'label'")
+        
+        label_feeds: Dict[str, List[float]] = {label: [] for label in self.list_labels()}
+        for subscription in subscriptions:
+            for category in subscription.get('categories', []):
+                label_feeds.setdefault(category.get('id', ''), []).append(feed_weights[subscription['id']])
+        return {
+            label: sum(weights) / len(weights) if weights else 1.0
+            for label, weights in label_feeds.items() if '/label/' in label
+        }
+    
+    def iter_articles_fair(
+        self,
+        group_by: str = "feed",
+        max_articles: Optional[int] = None,
+        page_size: int = 100,
+        since_hours: Optional[int] = 24,
+        unread_only: bool = False,
+        incremental: bool = False,
+        weighted: bool = FAIR_FETCH_CONFIG["weighted"],
+        max_workers: int = FAIR_FETCH_CONFIG["max_workers"]
+    ) -> Iterator[Article]:
+        """
+        Fetch each feed (or label) stream separately so no single busy feed
+        can use up max_articles
+        
+        Streams are fetched concurrently, up to max_workers at a time, in
+        rounds. Each round splits the articles still wanted across the
+        streams that have more, in proportion to stream_weights, and every
+        stream fetches its share in one request. Shares left over by streams
+        that ran dry go to the others in the next round. A run therefore
+        takes about as long as the slowest feed per round, usually one or
+        two rounds. Watermarks (incremental) are kept per stream. Articles
+        are yielded newest first (oldest first when incremental) and also
+        written to the article store.
+        """
+        articles = iter(self._fetch_fair(
+            group_by, max_articles, page_size, since_hours, unread_only, incremental, weighted, max_workers
+        ))
+        if self.article_store is not None:
+            articles = self._store_articles(articles)
+        yield from articles
+    
+    @METRICS.timed("freshrss_fair_fetch_seconds")
+    def _fetch_fair(
+        self,
+        group_by: str,
+        max_articles: Optional[int],
+        page_size: int,
+        since_hours: Optional[int],
+        unread_only: bool,
+        incremental: bool,
+        weighted: bool,
+        max_workers: int
+    ) -> List[Article]:
+        """Fetch rounds of iter_articles_fair"""
         if not self.auth_token and not self.authenticate():
             print("Authentication required")
             return []
         
+        weights = self.stream_weights(group_by, weighted)
+        if not weights:
+            print(f"⚠️  No {group_by} streams found, reading the whole reading list instead")
+            return list(self._iter_fetched_articles(
+                page_size, max_articles, since_hours, unread_only, True, incremental, False
+            ))
+        
+        streams = {
+            stream_id: dict(zip(("params", "seen_ids"), self._stream_params(stream_id, since_hours, unread_only, incremental)))
+            for stream_id in weights
+        }
+        fetched: Dict[str, List[Article]] = {stream_id: [] for stream_id in weights}
+        delivered = set()  # An item can carry several labels
+        active = list(weights)
+        continuations: Dict[str, Optional[str]] = {}
+        total = 0
+        rounds = 0
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(active)))) as executor:
+            while active and (max_articles is None or total < max_articles):
+                if max_articles is None:
+                    shares = {stream_id: page_size for stream_id in active}
+                else:
+                    shares = fair_shares(max_articles - total, {stream_id: weights[stream_id] for stream_id in active})
+                futures = {
+                    stream_id: executor.submit(
+                        self._fetch_page, stream_id, streams[stream_id]["params"],
+                        min(share, page_size), continuations.get(stream_id)
+                    )
+                    for stream_id, share in shares.items() if share > 0
+                }
+                if not futures:
+                    break
+                rounds += 1
+                
+                # In stream order, so which items fill the last slots does not depend on timing
+                for stream_id, future in futures.items():
+                    data = future.result()
+                    items = data['items'] if data else []
+                    continuations[stream_id] = data.get('continuation') if data else None
+                    if not items or not continuations[stream_id]:
+                        active.remove(stream_id)
+                    
+                    for item in items:
+                        item_id = item.get('id')
+                        if item_id in streams[stream_id]["seen_ids"]:
+                            continue
+                        if max_articles is not None and total >= max_articles:
+                            break
+                        if item_id not in delivered:
+                            article = self.parse_item(item)
+                            if article is None:
+                                continue
+                            delivered.add(item_id)
+                            fetched[stream_id].append(article)
+                            total += 1
+                        if incremental:
+                            self._stage_sync(stream_id, item)
+        
+        METRICS.increment("freshrss_fair_rounds_total", rounds)
+        METRICS.set_gauge("freshrss_fair_streams", len(weights))
+        contributing = sum(1 for articles in fetched.values() if articles)
+        print(f"📡 {total} articles from {contributing} of {len(weights)} {group_by} streams in {rounds} rounds")
+        
+        merged = [article for articles in fetched.values() for article in articles]
+        merged.sort(key=lambda article: article.timestamp, reverse=not incremental)
+        return merged
+    
+    def _store_articles(self, articles: Iterator[Article]) -> Iterator[Article]:
+        """Pass articles through while upserting them into the article store"""
+        pending: List[Article] = []
         try:
-            # Use proper Google Reader API stream endpoint
-            stream_id = "user/-/state/com.google/reading-list"  # All articles
-            if unread_only:
-                stream_id = "user/-/state/com.google/reading-list"
-            
-            # Calculate timestamp for since parameter
-            since_timestamp = int((datetime.now() - timedelta(hours=since_hours)).timestamp())
-            
-            # Prepare request parameters
-            params = {
-                'output': 'json',
-                'n': limit,
-                'ot': since_timestamp,  # Older than timestamp (FreshRSS uses this format)
-                'ck': int(time.time())  # Cache killer
-            }
+            for article in articles:
+                pending.append(article)
+                if len(pending) >= ARTICLE_STORE_BATCH_SIZE:
+                    self._flush_to_store(pending)
+                    pending = []
+                yield article
+        finally:
+            # Also runs when the caller stops early
+            self._flush_to_store(pending)
+    
+    def _flush_to_store(self, articles: List[Article]):
+        if not articles:
+            return
+        try:
+            self.article_store.upsert_many(articles)
+        except Exception as e:
+            print(f"⚠️  Could not store {len(articles)} articles locally: {e}")
+    
+    def _iter_fetched_articles(
+        self,
+        page_size: int,
+        max_articles: Optional[int],
+        since_hours: Optional[int],
+        unread_only: bool,
+        prefetch: bool,
+        incremental: bool,
+        stream_json: bool
+    ) -> Iterator[Article]:
+        """Fetch loop of iter_articles"""
+        if not self.auth_token and not self.authenticate():
+            print("Authentication required")
+            return
+        
+        stream_id = READING_LIST
+        params, seen_ids = self._stream_params(stream_id, since_hours, unread_only, incremental)
+        
+        if stream_json:
+            yield from self._iter_streamed_pages(stream_id, params, page_size, max_articles, seen_ids, incremental)
+            return
+        
+        yielded = 0
+        first_size = page_size if max_articles is None else min(page_size, max_articles)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._fetch_page, stream_id, params, first_size, None)
             
-            # Add authorization header
-            headers = {
-                'Authorization': f'GoogleLogin auth={self.auth_token}'
-            }
+            while future is not None:
+                data = future.result()
+                future = None
+                if data is None:
+                    return
+                
+                continuation = data.get('continuation')
+                items = data['items']
+                has_next = bool(continuation and items)
+                
+                # Prefetched as if every item of this page gets yielded
+                if has_next and prefetch:
+                    next_size = page_size if max_articles is None else min(page_size, max_articles - yielded - len(items))
+                    if next_size > 0:
+                        future = executor.submit(self._fetch_page, stream_id, params, next_size, continuation)
+                
+                for item in items:
+                    if item.get('id') in seen_ids:
+                        continue
+                    article = self.parse_item(item)
+                    if article is None:
+                        continue
+                    if incremental:
+                        self._stage_sync(stream_id, item)
+                    yield article
+                    yielded += 1
+                    if max_articles is not None and yielded >= max_articles:
+                        if future is not None:
+                            future.cancel()
+                        return
+                
+                # Items skipped as already seen or unparseable still leave room
+                if has_next and future is None:
+                    next_size = page_size if max_articles is None else min(page_size, max_articles - yielded)
+                    future = executor.submit(self._fetch_page, stream_id, params, next_size, continuation)
+    
+    def _stream_params(
+        self,
+        stream_id: str,
+        since_hours: Optional[int],
+        unread_only: bool,
+        incremental: bool
+    ) -> Tuple[Dict, set]:
+        """stream/contents parameters for one stream, and the item ids already seen at its watermark"""
+        params = {'output': 'json'}
+        if unread_only:
+            # Filtered by the server, so read items are never downloaded
+            params['xt'] = READ_TAG
+        
+        seen_ids = set()
+        watermark = None
+        if incremental and self.sync_state is not None:
+            watermark = self.sync_state.get_watermark(stream_id)
+            seen_ids = set(self.sync_state.get_seen_ids(stream_id))
+            # Oldest first, so a capped run never skips over unfetched items
+            params['r'] = 'o'
+        
+        if watermark is not None:
+            params['ot'] = watermark // 1_000_000
+        elif since_hours is not None:
+            # Only items newer than this timestamp
+            params['ot'] = int((datetime.now() - timedelta(hours=since_hours)).timestamp())
+        return params, seen_ids
+    
+    def _iter_streamed_pages(
+        self,
+        stream_id: str,
+        params: Dict,
+        page_size: int,
+        max_articles: Optional[int],
+        seen_ids: set,
+        incremental: bool
+    ) -> Iterator[Article]:
+        """Page loop of iter_articles for incrementally parsed responses"""
+        yielded = 0
+        continuation = None
+        while True:
+            size = page_size if max_articles is None else min(page_size, max_articles - yielded)
+            meta: Dict = {}
+            items = self._stream_page(stream_id, params, size, continuation, meta)
+            if items is None:
+                return
+            
+            received = 0
+            try:
+                for item in items:
+                    received += 1
+                    if item.get('id') in seen_ids:
+                        continue
+                    article = self.parse_item(item)
+                    if article is None:
+                        continue
+                    if incremental:
+                        self._stage_sync(stream_id, item)
+                    yield article
+                    yielded += 1
+                    if max_articles is not None and yielded >= max_articles:
+                        return
+            finally:
+                # Releases the connection if the caller stopped early
+                items.close()
+            
+            if meta.get('error'):
+                return
+            if 'items' not in meta:
+                print(f"No items in response. Keys: {list(meta.keys())}")
+                return
+            continuation = meta.get('continuation')
+            if not continuation or not received:
+                return
+    
+    @staticmethod
+    def _crawl_time_usec(item: Dict) -> int:
+        """Crawl timestamp of a stream item in microseconds"""
+        if 'timestampUsec' in item:
+            return int(item['timestampUsec'])
+        if 'crawlTimeMsec' in item:
+            return int(item['crawlTimeMsec']) * 1000
+        return int(item.get('published', time.time())) * 1_000_000
+    
+    def _stage_sync(self, stream_id: str, item: Dict):
+        """Track the newest item handed to the caller for a later commit_sync()"""
+        crawl_usec = self._crawl_time_usec(item)
+        pending = self.pending_sync.get(stream_id)
+        if pending is None or crawl_usec // 1_000_000 > pending["newest_crawl_usec"] // 1_000_000:
+            self.pending_sync[stream_id] = {"newest_crawl_usec": crawl_usec, "item_ids": [item.get('id', '')]}
+        elif crawl_usec // 1_000_000 == pending["newest_crawl_usec"] // 1_000_000:
+            pending["newest_crawl_usec"] = max(pending["newest_crawl_usec"], crawl_usec)
+            pending["item_ids"].append(item.get('id', ''))
+    
+    def commit_sync(self) -> bool:
+        """Persist watermarks for everything yielded by incremental fetches so far"""
+        if self.sync_state is None or not self.pending_sync:
+            return False
+        
+        try:
+            for stream_id, pending in self.pending_sync.items():
+                self.sync_state.advance(stream_id, pending["newest_crawl_usec"], pending["item_ids"])
+            self.pending_sync = {}
+            return True
+        except Exception as e:
+            print(f"Error saving sync state: {e}")
+            return False
+    
+    def _fetch_page(
+        self,
+        stream_id: str,
+        params: Dict,
+        page_size: int,
+        continuation: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Fetch one page of stream/contents, returning the parsed JSON or None"""
+        try:
+            params = dict(params)
+            params['n'] = page_size
+            params['ck'] = int(time.time())  # Cache killer
+            if continuation:
+                params['c'] = continuation
             
             # Make request to stream/contents endpoint
             stream_url = f"{self.base_url}/stream/contents/{stream_id}"
-            response = self.session.get(stream_url, params=params, headers=headers)
+            with METRICS.timer("freshrss_fetch_seconds"):
+                response = self._send("GET", stream_url, params=params)
             
             if response.status_code != 200:
+                METRICS.increment("freshrss_fetch_errors_total")
                 print(f"API request failed: {response.status_code}")
                 print(f"Response: {response.text[:500]}")
-                return []
+                return None
             
             # Parse JSON response
-            data = response.json()
+            with METRICS.timer("freshrss_json_parse_seconds"):
+                data = response.json()
             
             if 'items' not in data:
                 print(f"No items in response. Keys: {data.keys()}")
-                return []
-            
-            articles = []
-            for item in data['items']:
-                try:
-                    # Extract article data
-                    article_id = item.get('id', '')
-                    title = item.get('title', 'Untitled')
-                    
-                    # Get content from summary or content
-                    content = ''
-                    if 'summary' in item:
-                        content = item['summary'].get('content', '')
-                    elif 'content' in item:
-                        content = item['content'].get('content', '')
-                    
-                    # Clean HTML from content
-                    import re
-                    content = re.sub(r'<[^>]+>', '', content)
-                    
-                    # Get URL and source
-                    url = ''
-                    if 'canonical' in item:
-                        url = item['canonical'][0].get('href', '') if item['canonical'] else ''
-                    elif 'alternate' in item:
-                        url = item['alternate'][0].get('href', '') if item['alternate'] else ''
-                    
-                    source = item.get('origin', {}).get('title', 'Unknown')
-                    
-                    # Get timestamp
-                    timestamp = item.get('published', int(time.time()))
-                    
-                    # Get categories
-                    categories = []
-                    if 'categories' in item:
-                        categories = [cat.split('/')[-1] for cat in item['categories'] if 'label' in cat]
-                    
-                    article = Article(
-                        id=article_id,
-                        title=title,
-                        content=content,
-                        url=url,
-                        source=source,
-                        timestamp=timestamp,
-                        categories=categories
-                    )
-                    
-                    articles.append(article)
-                    
-                except Exception as e:
-                    print(f"Error parsing article: {e}")
-                    continue
+                return None
             
-            print(f"✓ Retrieved {len(articles)} articles from FreshRSS")
-            return articles
+            return data
             
         except Exception as e:
+            METRICS.increment("freshrss_fetch_errors_total")
             print(f"Error fetching articles: {e}")
-            return []
+            return None
     
-    def mark_as_read(self, article_ids: List[str]) -> bool:
+    def _stream_page(
+        self,
+        stream_id: str,
+        params: Dict,
+        page_size: int,
+        continuation: Optional[str],
+        meta: Dict
+    ) -> Optional[Iterator[Dict]]:
+        """
+        Request one page of stream/contents without reading the body
+        Returns: a generator of items (None on HTTP errors); the other
+        top-level fields such as 'continuation' land in meta once it is
+        exhausted, and meta['error'] is set if parsing failed midway
+        """
+        try:
+            params = dict(params)
+            params['n'] = page_size
+            params['ck'] = int(time.time())  # Cache killer
+            if continuation:
+                params['c'] = continuation
+            
+            stream_url = f"{self.base_url}/stream/contents/{stream_id}"
+            # Time to response headers; the body is parsed as it is consumed
+            with METRICS.timer("freshrss_fetch_seconds"):
+                response = self._send("GET", stream_url, params=params, stream=True)
+            
+            if response.status_code != 200:
+                METRICS.increment("freshrss_fetch_errors_total")
+                print(f"API request failed: {response.status_code}")
+                print(f"Response: {response.text[:500]}")
+                response.close()
+                return None
+        
+        except Exception as e:
+            METRICS.increment("freshrss_fetch_errors_total")
+            print(f"Error fetching articles: {e}")
+            return None
+        
+        def items() -> Iterator[Dict]:
+            try:
+                yield from iter_json_array_items(response.iter_content(STREAM_READ_CHUNK_SIZE), "items", meta)
+            except Exception as e:
+                METRICS.increment("freshrss_fetch_errors_total")
+                print(f"Error parsing streamed articles: {e}")
+                meta['error'] = str(e)
+            finally:
+                response.close()
+        
+        return items()
+    
+    @staticmethod
+    @METRICS.timed("article_parse_seconds")
+    def parse_item(item: Dict) -> Optional[Article]:
+        """Build an Article from one Google Reader stream item"""
+        try:
+            # Extract article data
+            article_id = item.get('id', '')
+            title = decode_title(item.get('title', 'Untitled'))
+            
+            # Get content from summary or content
+            content = ''
+            if 'summary' in item:
+                content = item['summary'].get('content', '')
+            elif 'content' in item:
+                content = item['content'].get('content', '')
+            
+            # Clean HTML from content
+            with METRICS.timer("html_strip_seconds"):
+                content = html_to_text(content)
+            
+            # Get URL and source
+            url = ''
+            if 'canonical' in item:
+                url = item['canonical'][0].get('href', '') if item['canonical'] else ''
+            elif 'alternate' in item:
+                url = item['alternate'][0].get('href', '') if item['alternate'] else ''
+            
+            source = item.get('origin', {}).get('title', 'Unknown')
+            
+            # Get timestamp
+            timestamp = item.get('published', int(time.time()))
+            
+            # Get categories
+            categories = []
+            if 'categories' in item:
+                categories = [cat.split('/')[-1] for cat in item['categories'] if 'label' in cat]
+            
+            METRICS.increment("articles_parsed_total")
+            return Article(
+                id=article_id,
+                title=title,
+                content=content,
+                url=url,
+                source=source,
+                timestamp=timestamp,
+                categories=categories
+            )
+            
+        except Exception as e:
+            METRICS.increment("article_parse_errors_total")
+            print(f"Error parsing article: {e}")
+            return None
+    
+    @METRICS.timed("freshrss_mark_read_seconds")
+    def mark_as_read(
+        self,
+        article_ids: List[str],
+        chunk_size: int = EDIT_TAG_CHUNK_SIZE,
+        max_workers: int = 1
+    ) -> EditTagResult:
         """Mark articles as read in FreshRSS"""
+        return self._edit_tags(article_ids, add=READ_TAG, chunk_size=chunk_size, max_workers=max_workers)
+    
+    def add_tag(
+        self,
+        article_ids: List[str],
+        tag: str,
+        chunk_size: int = EDIT_TAG_CHUNK_SIZE,
+        max_workers: int = 1
+    ) -> EditTagResult:
+        """Add a tag or state (e.g. STARRED_TAG) to articles"""
+        return self._edit_tags(article_ids, add=tag, chunk_size=chunk_size, max_workers=max_workers)
+    
+    def remove_tag(
+        self,
+        article_ids: List[str],
+        tag: str,
+        chunk_size: int = EDIT_TAG_CHUNK_SIZE,
+        max_workers: int = 1
+    ) -> EditTagResult:
+        """Remove a tag or state from articles"""
+        return self._edit_tags(article_ids, remove=tag, chunk_size=chunk_size, max_workers=max_workers)
+    
+    def _edit_tags(
+        self,
+        article_ids: List[str],
+        add: Optional[str] = None,
+        remove: Optional[str] = None,
+        chunk_size: int = EDIT_TAG_CHUNK_SIZE,
+        max_workers: int = 1
+    ) -> EditTagResult:
+        """
+        Apply one edit-tag change to many articles
+        
+        Ids are sent in multi-id (i=...) requests of chunk_size, with up to
+        max_workers chunks in flight at once. Failures are reported per id.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        result = EditTagResult()
         if not self.auth_token:
-            return False
-            
+            result.failed = {article_id: "not authenticated" for article_id in article_ids}
+            return result
+        
+        chunks = [article_ids[i:i + chunk_size] for i in range(0, len(article_ids), chunk_size)]
+        if max_workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                outcomes = list(executor.map(lambda chunk: self._post_edit_tag(chunk, add, remove), chunks))
+        else:
+            outcomes = [self._post_edit_tag(chunk, add, remove) for chunk in chunks]
+        
+        for chunk, error in zip(chunks, outcomes):
+            if error is None:
+                result.succeeded.extend(chunk)
+            else:
+                result.failed.update({article_id: error for article_id in chunk})
+        
+        METRICS.increment("edit_tag_ids_total", len(article_ids))
+        if result.failed:
+            METRICS.increment("edit_tag_failed_ids_total", len(result.failed))
+            print(f"Failed to edit tags for {len(result.failed)} of {len(article_ids)} articles")
+        return result
+    
+    def _post_edit_tag(
+        self,
+        article_ids: List[str],
+        add: Optional[str],
+        remove: Optional[str]
+    ) -> Optional[str]:
+        """Send one edit-tag request; returns None on success or the error"""
         try:
             # Use Google Reader API edit-tag endpoint
             edit_url = f"{self.base_url}/edit-tag"
             
-            headers = {
-                'Authorization': f'GoogleLogin auth={self.auth_token}',
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
+            headers = {'Content-Type': 'application/x-www-form-urlencoded'}
             
-            for article_id in article_ids:
-                data = {
-                    'i': article_id,
-                    'a': 'user/-/state/com.google/read',  # Add read state
-                    'ac': 'edit-tags'
-                }
-                
-                response = self.session.post(edit_url, data=data, headers=headers)
-                
-                if response.status_code != 200:
-                    print(f"Failed to mark article {article_id} as read: {response.status_code}")
-                    return False
+            data = [('i', article_id) for article_id in article_ids]
+            if add:
+                data.append(('a', add))
+            if remove:
+                data.append(('r', remove))
+            data.append(('ac', 'edit-tags'))
             
-            return True
+            with METRICS.timer("freshrss_edit_tag_request_seconds"):
+                response = self._send("POST", edit_url, data=data, headers=headers)
+            
+            if response.status_code != 200:
+                return f"HTTP {response.status_code}"
+            return None
             
         except Exception as e:
-            print(f"Error marking articles as read: {e}")
-            return False
+            return str(e)
@@ -0,0 +1,177 @@
+"""
+Single-pass multi-phrase matcher for keyword scoring
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Texts joined into one buffer per find_pairs scan; bounds the extra memory
+PACKED_CHUNK_SIZE = 4096
+
+
+class KeywordMatcher:
+    """
+    Finds every phrase of a keyword table in one pass over a text.
+
+    All phrases are merged into a trie and emitted as one regular expression,
+    so the C regex engine walks the trie once per word start instead of
+    running a separate substring scan per keyword. Matches respect word
+    boundaries ("ai" does not match inside "maintain").
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = []
+        self.phrase_ids: Dict[str, int] = {}
+        for phrase in phrases:
+            phrase = phrase.lower()
+            if phrase and phrase not in self.phrase_ids:
+                self.phrase_ids[phrase] = len(self.phrases)
+                self.phrases.append(phrase)
+
+        # The regex reports the longest phrase at each start position; shorter
+        # phrases that are a word-bounded prefix of it matched there as well
+        self.implied: List[List[int]] = [
+            [
+                self.phrase_ids[phrase[:end]]
+                for end in range(1, len(phrase))
+                if phrase[:end] in self.phrase_ids and not self._is_word_char(phrase[end])
+            ]
+            for phrase in self.phrases
+        ]
+
+        self.pattern = None
+        if self.phrases:
+            trie_pattern = self._trie_to_pattern(self._build_trie(self.phrases))
+            # Anchoring on the preceding non-word character lets the regex
+            # engine skip quickly to word starts; texts are scanned with a
+            # leading newline so a phrase at position 0 is still found
+            self.pattern = re.compile(rf"\W(?=({trie_pattern})(?!\w))")
+
+    @classmethod
+    def from_state(cls, phrases: List[str], implied: List[List[int]], pattern_source: Optional[str]) -> "KeywordMatcher":
+        """Rebuild a matcher from precomputed state (see state()) without rebuilding the trie"""
+        matcher = cls.__new__(cls)
+        matcher.phrases = list(phrases)
+        matcher.phrase_ids = {phrase: i for i, phrase in enumerate(matcher.phrases)}
+        matcher.implied = [list(ids) for ids in implied]
+        matcher.pattern = re.compile(pattern_source) if pattern_source is not None else None
+        return matcher
+
+    def state(self) -> Tuple[List[str], List[List[int]], Optional[str]]:
+        """JSON-serialisable (phrases, implied, pattern source) for from_state()"""
+        return self.phrases, self.implied, self.pattern.pattern if self.pattern is not None else None
+
+    @staticmethod
+    def _is_word_char(char: str) -> bool:
+        return char.isalnum() or char == '_'
+
+    @staticmethod
+    def _build_trie(phrases: List[str]) -> Dict:
+        trie: Dict = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[''] = True  # End-of-phrase marker
+        return trie
+
+    @classmethod
+    def _trie_to_pattern(cls, node: Dict) -> str:
+        """Convert a trie node into a regex, longest branches tried first"""
+        terminal = '' in node
+        branches = [
+            re.escape(char) + cls._trie_to_pattern(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ''
+
+        if len(branches) == 1:
+            body = branches[0]
+            if terminal:
+                return f"(?:{body})?"
+            return body
+
+        body = f"(?:{'|'.join(branches)})"
+        if terminal:
+            return f"{body}?"
+        return body
+
+    def find_ids(self, text: str) -> Set[int]:
+        """Return ids of all phrases occurring in already-lowercased text"""
+        matched: Set[int] = set()
+        if self.pattern is None:
+            return matched
+
+        seen: Set[str] = set()
+        for match in self.pattern.finditer("\n" + text):
+            phrase = match.group(1)
+            if phrase in seen:
+                continue
+            seen.add(phrase)
+            phrase_id = self.phrase_ids[phrase]
+            matched.add(phrase_id)
+            matched.update(self.implied[phrase_id])
+
+        return matched
+
+    def find_pairs(self, texts: List[str], chunk_size: int = PACKED_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Match a batch of already-lowercased texts, packed chunk_size at a
+        time into one buffer for find_pairs_in_buffer
+        Returns: (text_indices, phrase_ids), one entry per distinct match,
+        i.e. the coordinates of a sparse text x phrase match matrix
+        """
+        all_rows: List[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+        all_ids: List[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+        for first_row in range(0, len(texts), max(1, chunk_size)):
+            chunk = texts[first_row:first_row + max(1, chunk_size)]
+            offsets = np.zeros(len(chunk) + 1, dtype=np.int64)
+            np.cumsum(np.fromiter((len(text) + 1 for text in chunk), dtype=np.int64, count=len(chunk)), out=offsets[1:])
+            rows, ids = self.find_pairs_in_buffer("\n" + "\n".join(chunk), offsets)
+            all_rows.append(rows + first_row)
+            all_ids.append(ids)
+        return np.concatenate(all_rows), np.concatenate(all_ids)
+
+    def find_pairs_in_buffer(self, buffer: str, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Match many texts packed into one buffer, scanning it in a single pass
+
+        Each text in the buffer must be preceded by a newline, with offsets[i]
+        the position of the newline before text i (see ArticleBatch).
+        Returns: (text_indices, phrase_ids) like find_pairs.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        if self.pattern is None or not buffer:
+            return empty, empty
+
+        phrase_ids = self.phrase_ids
+        hits = [(match.start(), phrase_ids[match.group(1)]) for match in self.pattern.finditer(buffer)]
+        if not hits:
+            return empty, empty
+
+        hits = np.array(hits, dtype=np.int64)
+        rows = np.searchsorted(offsets, hits[:, 0], side="right") - 1
+
+        # Expand each longest match into itself plus its implied prefixes
+        rows_expanded = [rows]
+        ids_expanded = [hits[:, 1]]
+        for phrase_id, implied in enumerate(self.implied):
+            if not implied:
+                continue
+            matched_rows = rows[hits[:, 1] == phrase_id]
+            for implied_id in implied:
+                rows_expanded.append(matched_rows)
+                ids_expanded.append(np.full(len(matched_rows), implied_id, dtype=np.int64))
+
+        # One entry per distinct (text, phrase) pair
+        keys = np.concatenate(rows_expanded) * len(self.phrases) + np.concatenate(ids_expanded)
+        keys.sort()
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        return keys // len(self.phrases), keys % len(self.phrases)
+
+    def find(self, text: str) -> Set[str]:
+        """Return all phrases occurring in the text"""
+        return {self.phrases[phrase_id] for phrase_id in self.find_ids(text.lower())}
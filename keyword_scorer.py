@@ -2,83 +2,186 @@
 Keyword-based scoring component for RSS articles
 """
 import re
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
-from config import HIGH_VALUE_KEYWORDS, TOPIC_SCORES
+import sys
+from itertools import filterfalse
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
 
-@dataclass
+import numpy as np
+
+from keyword_matcher import KeywordMatcher
+from metrics import METRICS
+from score_cache import ScoreCache
+from text_normalizer import normalize_for_matching
+from topic_model import CompiledTopicModel, TopicModelStore, default_topic_model_store
+
+# Words of three or more characters; shorter ones are never keywords
+_WORD_RE = re.compile(r'\w{3,}')
+
+# Common words dropped by extract_keywords
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
+})
+
+# Shared category tuples, so identical label sets are stored once
+_category_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+def intern_categories(categories: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """Return a shared tuple of interned category strings"""
+    if not categories:
+        return ()
+    key = tuple(sys.intern(category) if isinstance(category, str) else category for category in categories)
+    return _category_tuples.setdefault(key, key)
+
+@dataclass(frozen=True, slots=True)
 class Article:
-    """Article data structure"""
+    """Article data structure (immutable; source and categories are interned)"""
     id: str
     title: str
     content: str
     url: str
     source: str
     timestamp: int
-    categories: List[str] = None
+    categories: Tuple[str, ...] = ()
+    _normalized_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if isinstance(self.source, str):
+            object.__setattr__(self, "source", sys.intern(self.source))
+        object.__setattr__(self, "categories", intern_categories(self.categories))
+    
+    @property
+    def normalized_text(self) -> str:
+        """Lowercase, whitespace-collapsed title + content, computed once"""
+        if self._normalized_text is None:
+            object.__setattr__(self, "_normalized_text", normalize_for_matching(f"{self.title} {self.content}"))
+        return self._normalized_text
+
+def keyword_details(topics: List[str], matches: List[float]) -> Dict[str, any]:
+    """Result details for one row of topic matches"""
+    keyword_matches = dict(zip(topics, matches))
+    return {
+        "keyword_matches": keyword_matches,
+        "total_matches": sum(keyword_matches.values()),
+        "contributing_topics": [topic for topic, count in keyword_matches.items() if count > 0]
+    }
 
 class KeywordScorer:
-    """Keyword-based scoring system"""
+    """
+    Keyword-based scoring system
+
+    All tables come from a CompiledTopicModel. Without explicit keywords,
+    topic scores or model, the scorer follows the process-wide
+    TopicModelStore and picks up topic score changes without a restart;
+    each scoring call takes one model reference and uses it throughout.
+    With a KeywordMatchStore, batch scoring records each article's matched
+    phrases so rescore_recorded can follow later keyword edits.
+    """
+    
+    def __init__(
+        self,
+        keywords: Optional[Dict] = None,
+        topic_scores: Optional[Dict[str, float]] = None,
+        cache: Optional[ScoreCache] = None,
+        model: Optional[CompiledTopicModel] = None,
+        store: Optional[TopicModelStore] = None,
+        match_store=None
+    ):
+        self.cache = cache
+        self.match_store = match_store
+        self.store: Optional[TopicModelStore] = None
+        self._model: Optional[CompiledTopicModel] = model
+        if model is None:
+            if store is not None or (keywords is None and topic_scores is None):
+                self.store = store or default_topic_model_store()
+            else:
+                self._model = CompiledTopicModel.compile(keywords, topic_scores)
+    
+    @property
+    def model(self) -> CompiledTopicModel:
+        """The compiled model to use for the next scoring call"""
+        return self.store.current() if self.store is not None else self._model
+    
+    # Read-only views of the current model, kept for existing callers
+    
+    @property
+    def keywords(self) -> Dict:
+        return self.model.keywords
+    
+    @property
+    def topic_scores(self) -> Dict[str, float]:
+        return self.model.topic_scores
+    
+    @property
+    def topics(self) -> List[str]:
+        return self.model.topics
+    
+    @property
+    def matcher(self) -> KeywordMatcher:
+        return self.model.matcher
     
-    def __init__(self):
-        self.topic_scores = TOPIC_SCORES
-        self.keywords = HIGH_VALUE_KEYWORDS
+    @property
+    def phrase_targets(self) -> List[List[Tuple[str, str, int]]]:
+        return self.model.phrase_targets
+    
+    @property
+    def phrase_topic_weights(self) -> np.ndarray:
+        return self.model.phrase_topic_weights
+    
+    @property
+    def cache_fingerprint(self) -> str:
+        return self.model.fingerprint
         
-    def extract_keywords(self, text: str) -> List[str]:
+    @staticmethod
+    def extract_keywords(text: str) -> List[str]:
         """Extract keywords from text"""
-        # Convert to lowercase and split into words
-        words = re.findall(r'\b\w+\b', text.lower())
-        # Remove common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-            'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
-        }
-        return [word for word in words if word not in stop_words and len(word) > 2]
+        # Lowercase words without stop words and very short words
+        return list(filterfalse(STOP_WORDS.__contains__, _WORD_RE.findall(text.lower())))
     
-    def calculate_keyword_matches(self, article: Article) -> Dict[str, float]:
+    def calculate_keyword_matches(
+        self,
+        article: Article,
+        model: Optional[CompiledTopicModel] = None
+    ) -> Dict[str, float]:
         """Calculate keyword matches for each topic"""
-        full_text = f"{article.title} {article.content}".lower()
-        topic_matches = {}
+        model = model or self.model
+        positive_matches = [0] * len(model.topics)
+        negative_matches = [0] * len(model.topics)
         
-        for topic, keywords in self.keywords.items():
-            positive_matches = 0
-            negative_matches = 0
-            
-            # Count positive keyword matches
-            for keyword in keywords.get("positive", []):
-                if keyword.lower() in full_text:
-                    # Weight longer phrases more heavily
-                    weight = len(keyword.split())
-                    positive_matches += weight
-            
-            # Count negative keyword matches
-            for keyword in keywords.get("negative", []):
-                if keyword.lower() in full_text:
-                    weight = len(keyword.split())
-                    negative_matches += weight
-            
-            # Calculate net match score
-            net_matches = positive_matches - (negative_matches * 0.5)
-            topic_matches[topic] = max(0, net_matches)
+        for phrase_id in model.matcher.find_ids(article.normalized_text):
+            for column, positive, negative in model.phrase_topic_entries[phrase_id]:
+                positive_matches[column] += positive
+                negative_matches[column] += negative
         
-        return topic_matches
+        # Net match score per topic
+        return {
+            topic: max(0, positive - (negative * 0.5))
+            for topic, positive, negative in zip(model.topics, positive_matches, negative_matches)
+        }
     
+    @METRICS.timed("keyword_score_seconds")
     def score_article(self, article: Article) -> Tuple[float, Dict[str, any]]:
         """
         Score article based on keyword matching
         Returns: (score, details)
         """
-        keyword_matches = self.calculate_keyword_matches(article)
+        model = self.model
+        if self.cache is not None:
+            cached = self.cache.get("keyword", article, model.fingerprint)
+            if cached is not None:
+                return cached
+        
+        keyword_matches = self.calculate_keyword_matches(article, model)
         
         # Calculate weighted score based on topic preferences
         total_score = 0
         total_weight = 0
         
-        for topic, match_count in keyword_matches.items():
+        for topic_score, match_count in zip(model.topic_score_list, keyword_matches.values()):
             if match_count > 0:
-                topic_score = self.topic_scores.get(topic, 50)  # Default to 50 if topic not found
                 weighted_contribution = topic_score * match_count
                 total_score += weighted_contribution
                 total_weight += match_count
@@ -95,24 +198,248 @@ class KeywordScorer:
             "contributing_topics": [topic for topic, count in keyword_matches.items() if count > 0]
         }
         
+        if self.cache is not None:
+            self.cache.put("keyword", article, model.fingerprint, (keyword_score, details))
+        
         return keyword_score, details
 
-    def score_articles_batch(self, articles: List[Article]) -> List[Dict[str, any]]:
+    def calculate_batch_matches(
+        self,
+        articles: List[Article],
+        model: Optional[CompiledTopicModel] = None
+    ) -> np.ndarray:
+        """
+        Calculate keyword matches for a whole batch
+        Returns: array of shape (articles, topics), columns ordered as model.topics
+        """
+        model = model or self.model
+        full_texts = [article.normalized_text for article in articles]
+        rows, phrase_ids = model.matcher.find_pairs(full_texts)
+        return self._topic_matches(model, rows, phrase_ids, len(articles))
+    
+    @staticmethod
+    def _topic_matches(model: CompiledTopicModel, rows: np.ndarray, phrase_ids: np.ndarray, count: int) -> np.ndarray:
+        """Sparse article x keyword matrix times keyword -> topic weights, clipped"""
+        topic_matches = np.zeros((count, len(model.topics)))
+        for column in range(len(model.topics)):
+            weights = model.phrase_topic_weights[phrase_ids, column]
+            topic_matches[:, column] = np.bincount(rows, weights=weights, minlength=count)
+        
+        return np.maximum(topic_matches, 0)
+    
+    @staticmethod
+    def _normalize_scores(model: CompiledTopicModel, topic_matches: np.ndarray) -> np.ndarray:
+        """Weighted normalization against topic preferences, as in score_article"""
+        total_score = topic_matches @ model.topic_score_vector
+        total_weight = topic_matches.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total_weight > 0, np.minimum(100, total_score / total_weight), 30)
+    
+    def score_batch_columns(self, batch) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score an ArticleBatch straight from its packed text buffers
+        Returns: (keyword_scores, topic_matches), rows in batch order and
+        topic_matches columns ordered as model.topics
+        """
+        model = self.model
+        all_rows: List[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+        all_ids: List[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+        for first_row, text, offsets in batch.iter_chunks():
+            rows, phrase_ids = model.matcher.find_pairs_in_buffer(text, offsets)
+            all_rows.append(rows + first_row)
+            all_ids.append(phrase_ids)
+        topic_matches = self._topic_matches(model, np.concatenate(all_rows), np.concatenate(all_ids), len(batch))
+        return self._normalize_scores(model, topic_matches), topic_matches
+    
+    @METRICS.timed("keyword_batch_seconds")
+    def score_articles_batch(
+        self,
+        articles: List[Article],
+        model: Optional[CompiledTopicModel] = None
+    ) -> List[Dict[str, any]]:
         """
         Score multiple articles efficiently
         """
-        results = []
+        if not articles:
+            return []
         
-        for article in articles:
-            score, details = self.score_article(article)
-            
-            result = {
+        model = model or self.model
+        cached = [None] * len(articles)
+        if self.cache is not None:
+            cached = self.cache.get_many("keyword", articles, model.fingerprint)
+        
+        misses = [article for article, hit in zip(articles, cached) if hit is None]
+        METRICS.increment("keyword_articles_scored_total", len(misses))
+        METRICS.increment("keyword_cache_hits_total", len(articles) - len(misses))
+        scored = iter(self._score_uncached_batch(misses, model))
+        
+        results = []
+        for article, hit in zip(articles, cached):
+            score, details = hit if hit is not None else next(scored)
+            results.append({
                 "article": article,
                 "keyword_score": score,
                 "details": details,
                 "scoring_method": "keyword"
-            }
-            
-            results.append(result)
+            })
         
         return results
+    
+    def _score_uncached_batch(
+        self,
+        articles: List[Article],
+        model: CompiledTopicModel
+    ) -> List[Tuple[float, Dict[str, any]]]:
+        """Vectorized scoring of articles; stores results in the cache"""
+        if not articles:
+            return []
+        
+        full_texts = [article.normalized_text for article in articles]
+        rows, phrase_ids = model.matcher.find_pairs(full_texts)
+        topic_matches = self._topic_matches(model, rows, phrase_ids, len(articles))
+        keyword_scores = self._normalize_scores(model, topic_matches)
+        
+        scored = [
+            (score, keyword_details(model.topics, matches))
+            for score, matches in zip(keyword_scores.tolist(), topic_matches.tolist())
+        ]
+        
+        if self.cache is not None:
+            self.cache.put_many("keyword", articles, model.fingerprint, scored)
+        
+        if self.match_store is not None:
+            phrase_sets: List[List[str]] = [[] for _ in articles]
+            for row, phrase_id in zip(rows.tolist(), phrase_ids.tolist()):
+                phrase_sets[row].append(model.matcher.phrases[phrase_id])
+            self.match_store.record(articles, phrase_sets, topic_matches, model.keywords)
+        
+        return scored
+    
+    def stored_keyword_hits(self, store, topic: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Ids of stored articles containing each keyword, looked up in the
+        ArticleStore's full-text index instead of scanning every article
+        Only the given topic's keywords when topic is set.
+        """
+        model = self.model
+        if topic is None:
+            phrases = model.matcher.phrases
+        else:
+            keywords = model.keywords.get(topic, {})
+            phrases = [keyword for polarity in ("positive", "negative") for keyword in keywords.get(polarity, [])]
+        return store.match_phrases(phrases)
+    
+    @METRICS.timed("keyword_rescore_stored_seconds")
+    def score_stored(self, store, since_timestamp: Optional[int] = None) -> List[Dict[str, any]]:
+        """
+        Re-score stored articles without refetching them
+        Only articles containing at least one keyword are loaded and scored;
+        every other stored article has the no-match score of 30.
+        """
+        model = self.model
+        hits = store.match_phrases(model.matcher.phrases, since_timestamp=since_timestamp)
+        article_ids = list(dict.fromkeys(article_id for ids in hits.values() for article_id in ids))
+        articles = [article for article in store.get_many(article_ids) if article is not None]
+        return self.score_articles_batch(articles, model)
+    
+    @METRICS.timed("keyword_delta_rescore_seconds")
+    def rescore_recorded(self, match_store=None, article_store=None, score_cache: Optional[ScoreCache] = None):
+        """
+        Re-score every recorded article under the current model, touching
+        only what the keyword edits since its record affect
+        
+        A topic score change needs no text at all: the recorded topic
+        matches are renormalized. Removed or re-targeted phrases recompute
+        the matches of the articles that contained them from their recorded
+        phrase sets. Only newly added phrases are looked up in the
+        ArticleStore's full-text index; records whose article is no longer
+        stored unchanged are then dropped. Refreshed scores go to score_cache
+        under the new fingerprint when given.
+        Returns: a DeltaRescore, identical to scoring the articles afresh
+        """
+        from match_store import DeltaRescore, keyword_changes
+        
+        model = self.model
+        match_store = match_store or self.match_store
+        records = match_store.load()
+        version = match_store.table_version(model.keywords)
+        columns = {topic: column for column, topic in enumerate(model.topics)}
+        topic_matches = np.zeros((len(records), len(model.topics)))
+        keep = np.ones(len(records), dtype=bool)
+        rewritten = []
+        
+        by_version: Dict[int, List[int]] = {}
+        for index, record in enumerate(records):
+            by_version.setdefault(record.version, []).append(index)
+        
+        changes: Dict[int, Tuple[Dict, set, set]] = {}
+        for old_version, indices in by_version.items():
+            old_keywords = model.keywords if old_version == version else match_store.keyword_table(old_version)
+            if old_keywords is None:
+                keep[indices] = False
+            else:
+                changes[old_version] = (old_keywords, *keyword_changes(old_keywords, model.keywords))
+        
+        # Phrases new to any record's table: one index lookup for all of them
+        added_phrases = set().union(*(added for _, added, _ in changes.values()))
+        added_hits: Dict[str, List[str]] = {}
+        if added_phrases:
+            if article_store is None:
+                raise ValueError("New keywords were added; rescoring needs the article store to look them up")
+            checked = [index for old_version, (_, added, _) in changes.items() if added for index in by_version[old_version]]
+            hashes = article_store.content_hashes([records[index].article_id for index in checked])
+            for index in checked:
+                if hashes.get(records[index].article_id) != records[index].content_hash:
+                    keep[index] = False
+            for phrase, article_ids in article_store.match_phrases(added_phrases).items():
+                for article_id in article_ids:
+                    added_hits.setdefault(article_id, []).append(phrase)
+        
+        for old_version, (old_keywords, added, changed) in changes.items():
+            indices = by_version[old_version]
+            old_columns = [column for column, topic in enumerate(old_keywords) if topic in columns]
+            new_columns = [columns[topic] for topic in old_keywords if topic in columns]
+            
+            for index in indices:
+                if not keep[index]:
+                    continue
+                record = records[index]
+                extra = [phrase for phrase in added_hits.get(record.article_id, ()) if phrase in added]
+                if extra or not changed.isdisjoint(record.phrases):
+                    phrases = [phrase for phrase in record.phrases if phrase in model.matcher.phrase_ids] + extra
+                    phrase_ids = [model.matcher.phrase_ids[phrase] for phrase in phrases]
+                    topic_matches[index] = np.maximum(model.phrase_topic_weights[phrase_ids].sum(axis=0), 0)
+                    record.version, record.phrases, record.topic_matches = version, phrases, topic_matches[index]
+                    rewritten.append(record)
+                elif old_version == version:
+                    topic_matches[index] = record.topic_matches
+                else:
+                    # Still valid against its own table, so the record is left as it is
+                    topic_matches[index, new_columns] = record.topic_matches[old_columns]
+        
+        dropped = [record.article_id for record, kept in zip(records, keep) if not kept]
+        if dropped:
+            match_store.delete(dropped)
+        if rewritten:
+            match_store.write(rewritten)
+        
+        kept_records = [record for record, kept in zip(records, keep) if kept]
+        topic_matches = topic_matches[keep]
+        result = DeltaRescore(
+            topics=model.topics,
+            article_ids=[record.article_id for record in kept_records],
+            keyword_scores=self._normalize_scores(model, topic_matches),
+            topic_matches=topic_matches,
+            recomputed=len(rewritten),
+            dropped=len(dropped)
+        )
+        METRICS.increment("keyword_delta_recomputed_total", len(rewritten))
+        METRICS.increment("keyword_delta_renormalized_total", len(kept_records) - len(rewritten))
+        
+        if score_cache is not None and kept_records:
+            score_cache.put_hashed(
+                "keyword", model.fingerprint,
+                [(record.article_id, record.content_hash) for record in kept_records],
+                result.results()
+            )
+        return result
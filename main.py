@@ -5,13 +5,12 @@ RSS AI Scorer - Main application entry point and CLI
 import argparse
 import json
 import os
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
-from simple_scorer import SimpleScorer
-from freshrss_client import FreshRSSClient
-from keyword_scorer import Article
-from newsletter_generator import NewsletterGenerator
+from config import settings
+from metrics import METRICS
 
 def print_banner():
     """Print application banner"""
@@ -25,6 +24,7 @@ def print_banner():
 def setup_environment(interactive=True):
     """Setup environment and check API keys"""
     missing_keys = []
+    settings.load_env()
     
     # Check API keys
     if not os.getenv("GOOGLE_API_KEY"):
@@ -47,114 +47,240 @@ def setup_environment(interactive=True):
         else:
             print("⚠️  Running in non-interactive mode, continuing with limited features...")
 
-def main():
-    """Main function"""
-    parser = argparse.ArgumentParser(description="RSS AI Scorer - AI-Powered Article Scoring")
-    parser.add_argument("--username", "-u", help="FreshRSS username")
-    parser.add_argument("--password", "-p", help="FreshRSS password")
-    parser.add_argument("--limit", "-l", type=int, default=10, help="Number of articles to process (default: 10)")
-    parser.add_argument("--api", action="store_true", help="Start API server mode")
-    parser.add_argument("--simple", action="store_true", help="Use simple AI scoring (recommended)")
-    parser.add_argument("--newsletter", action="store_true", help="Generate and send newsletter")
-    parser.add_argument("--since-hours", type=int, help="Only process articles from last N hours")
-    parser.add_argument("--non-interactive", action="store_true", help="Run in non-interactive mode")
-    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+class ScoringSession:
+    """
+    Everything a scoring cycle needs, built once: scorer, FreshRSS client
+    (HTTP connection pool and auth token), score cache, article store,
+    near-duplicate index, pipeline and cascade
     
-    args = parser.parse_args()
+    run_cycle() fetches, scores and reports one batch. --watch calls it
+    repeatedly on the same session, so later cycles only pay for the
+    articles that arrived in between.
+    """
     
-    if not args.non_interactive:
-        print_banner()
-        setup_environment(interactive=True)
-    else:
-        setup_environment(interactive=False)
-    
-    if args.api:
-        # Start API server
-        import uvicorn
-        from web_app import app
+    def __init__(self, args):
+        # Deferred so --help, --api and early exits skip the scorer, HTTP and numpy imports
+        from simple_scorer import SimpleScorer
+        from freshrss_client import FreshRSSClient
+        from config import SCORING_CONFIG
+        from rate_limiter import RateLimiter
+        from scoring_pipeline import ScoringPipeline
         
-        print("🚀 Starting RSS AI Scorer API server...")
-        print("📊 Dashboard available at: http://localhost:8000")
-        print("📖 API docs at: http://localhost:8000/docs")
+        self.args = args
+        self.cycles = 0
         
-        uvicorn.run(app, host="0.0.0.0", port=8000)
-        return
-    
-    # Validate required arguments
-    if not args.username or not args.password:
-        if not args.non_interactive:
-            print("❌ Username and password are required")
-            print("Use --username and --password or --api for server mode")
-            return
-        else:
-            # In non-interactive mode, try to get credentials from environment
-            args.username = os.getenv("FRESHRSS_USERNAME")
-            args.password = os.getenv("FRESHRSS_API_PASSWORD")
-            
-            if not args.username or not args.password:
-                print("❌ FreshRSS credentials not configured")
-                return
-    
-    # Process articles
-    try:
         if args.simple:
             scorer = SimpleScorer()
         else:
             print("⚠️  Defaulting to simple scoring (recommended)")
             scorer = SimpleScorer()
         
-        client = FreshRSSClient(args.username, args.password)
+        sync_state = None
+        if args.incremental or args.reset_sync:
+            from sync_state import SyncStateStore
+            sync_state = SyncStateStore()
+            if args.reset_sync:
+                sync_state.reset()
+                print("🔄 Sync state reset")
         
-        if not client.authenticate():
-            print("❌ Failed to authenticate with FreshRSS")
-            return
+        article_store = None
+        if not args.no_store:
+            from article_store import ArticleStore
+            article_store = ArticleStore()
+        
+        self.client = FreshRSSClient(args.username, args.password, sync_state=sync_state, article_store=article_store)
+        
+        self.score_cache = None
+        self.cache_fingerprint = None
+        if not args.no_cache:
+            from score_cache import ScoreCache, config_fingerprint
+            self.score_cache = ScoreCache()
+            self.cache_fingerprint = config_fingerprint()
+        
+        # Near-duplicate copies skip scoring and inherit their story's score
+        self.dedup_index = None
+        if not args.no_dedup:
+            from near_duplicates import NearDuplicateIndex
+            self.dedup_index = NearDuplicateIndex()
         
-        print(f"📚 Getting articles (limit: {args.limit})...")
-        articles = client.get_articles(
-            limit=args.limit,
-            since_hours=args.since_hours,
-            unread_only=False
+        # Batch requests when the scorer supports it, otherwise one request per article
+        if hasattr(scorer, "score_articles_batch"):
+            score_batch = scorer.score_articles_batch
+            batch_size = SCORING_CONFIG["batch_sizes"]["ai_scoring"]
+        else:
+            score_batch = lambda batch: [scorer.score_article(article) for article in batch]
+            batch_size = 1
+        score_batch = METRICS.timed("ai_score_batch_seconds")(score_batch)
+        
+        ai_limits = SCORING_CONFIG["rate_limits"]["ai_scoring"]
+        score_cache = self.score_cache
+        self.pipeline = pipeline = ScoringPipeline(
+            score_batch,
+            workers=args.workers,
+            batch_size=batch_size,
+            limiter=RateLimiter(
+                requests_per_minute=None if args.no_rate_limit else ai_limits["requests_per_minute"],
+                tokens_per_minute=None if args.no_rate_limit else ai_limits["tokens_per_minute"]
+            ),
+            lookup=(lambda article: score_cache.get("simple", article, self.cache_fingerprint)) if score_cache else None
         )
         
-        if not articles:
-            print("📭 No articles found")
-            return
+        self.cascade = None
+        keyword_scorer = None
+        if args.cascade:
+            from cascade import CascadeStage, ScoringCascade, keyword_stage, semantic_stage
+            from config import CASCADE_CONFIG
+            
+            def score_ai(batch):
+                return [error or result for _, result, error in pipeline.run(batch)]
+            
+            ai_options = dict(CASCADE_CONFIG["ai_scoring"])
+            if args.ai_budget is not None:
+                ai_options["max_articles"] = args.ai_budget
+            # Recorded keyword matches let --rescore-recorded follow later keyword edits
+            if not args.no_store:
+                from keyword_scorer import KeywordScorer
+                from match_store import KeywordMatchStore
+                keyword_scorer = KeywordScorer(match_store=KeywordMatchStore())
+            self.cascade = ScoringCascade([
+                keyword_stage(keyword_scorer),
+                semantic_stage(),
+                CascadeStage(
+                    "ai_scoring", score_ai, lambda result: result.assigned_score,
+                    weight=SCORING_CONFIG["weights"]["ai_score"],
+                    batch_size=batch_size * pipeline.max_in_flight,
+                    lookup=pipeline.lookup,
+                    **ai_options
+                )
+            ])
+            # Cached results are resolved by the cascade, outside the AI budget
+            pipeline.lookup = None
+        
+        # Best articles across --watch cycles, updated with each cycle's scores
+        from ranking import Leaderboard, Ranker
+        self.ranker = Ranker()
+        self.leaderboard = Leaderboard(self.ranker)
+        
+        self.results_sink = None
+        if args.export_results:
+            from results_sink import ResultsSink
+            self.results_sink = ResultsSink(keyword_scorer=keyword_scorer)
+    
+    def run_cycle(self) -> int:
+        """Fetch, score and report one batch; returns the number of articles fetched"""
+        args = self.args
+        client, score_cache, pipeline, cascade = self.client, self.score_cache, self.pipeline, self.cascade
+        self.cycles += 1
+        cache_hits, cache_misses = (score_cache.hits, score_cache.misses) if score_cache is not None else (0, 0)
+        if score_cache is not None:
+            # Topic scores are re-read from disk when edited, so cached scores follow them
+            from score_cache import config_fingerprint
+            self.cache_fingerprint = config_fingerprint()
+        
+        print(f"📚 Getting articles (limit: {args.limit}, page size: {args.page_size})...")
+        if args.fetch_by:
+            # Every feed or label gets its share of the limit, fetched concurrently
+            articles = client.iter_articles_fair(
+                group_by=args.fetch_by,
+                max_articles=args.limit,
+                page_size=args.page_size,
+                since_hours=args.since_hours,
+                unread_only=args.unread_only,
+                incremental=args.incremental
+            )
+        else:
+            # Pages are fetched in the background while earlier ones are scored
+            articles = client.iter_articles(
+                page_size=args.page_size,
+                max_articles=args.limit,
+                since_hours=args.since_hours,
+                unread_only=args.unread_only,
+                incremental=args.incremental,
+                stream_json=args.stream_json
+            )
         
-        print(f"📊 Processing {len(articles)} articles...")
+        deduplicator = None
+        if self.dedup_index is not None:
+            from near_duplicates import Deduplicator
+            if self.cycles > 1:
+                self.dedup_index.prune()
+            deduplicator = Deduplicator(self.dedup_index)
+            articles = deduplicator.filter(articles)
+        
+        if cascade is not None:
+            # The whole cycle is needed up front to spend the AI budget on the best candidates
+            cascade_results = cascade.run(list(articles))
+            scoring_stream = (
+                (result.article, result.results.get("ai_scoring"), result.errors.get("ai_scoring"))
+                for result in cascade_results if result.reached("ai_scoring")
+            )
+        else:
+            scoring_stream = pipeline.run(articles)
+        
+        # The cascade already keyword-scored every article; the sink scores the rest itself
+        keyword_results = {}
+        if cascade is not None and self.results_sink is not None:
+            keyword_results = {result.article.id: result.results.get("keyword") for result in cascade_results}
         
         scored_articles = []
-        for i, article in enumerate(articles, 1):
-            if args.verbose:
-                print(f"\n[{i}/{len(articles)}] Processing: {article.title[:60]}...")
-            
-            try:
-                scored_result = scorer.score_article(article)
-                scored_articles.append({
-                    "article": article,
-                    "result": scored_result
-                })
-                
-                if args.verbose:
-                    print(f"   Score: {scored_result.assigned_score}")
-                    print(f"   Topic: {scored_result.primary_topic}")
-                    if scored_result.ai_reasoning:
-                        print(f"   Reasoning: {scored_result.ai_reasoning[:100]}...")
-                
-            except Exception as e:
-                print(f"❌ Error scoring article: {e}")
-                continue
+        pipeline_started = time.perf_counter()
+        fetched_count = self._collect(scoring_stream, scored_articles, deduplicator)
+        
+        # Copies held back for a story that got no score are scored themselves;
+        # copies of stories the cascade pruned stay pruned
+        rescored = 0
+        if deduplicator is not None:
+            pruned = set()
+            if cascade is not None:
+                pruned = {
+                    deduplicator.cluster_of[result.article.id]
+                    for result in cascade_results if not result.reached("ai_scoring")
+                }
+            unscored = deduplicator.unscored(exclude=pruned)
+            if unscored:
+                print(f"🧬 Scoring {len(unscored)} near-duplicates whose story got no score")
+                rescored = self._collect(pipeline.run(unscored), scored_articles, deduplicator, fetched_count)
+                fetched_count += rescored
         
-        # Sort by score
-        scored_articles.sort(key=lambda x: x["result"].assigned_score, reverse=True)
+        METRICS.observe("pipeline_seconds", time.perf_counter() - pipeline_started)
+        METRICS.increment("articles_scored_total", len(scored_articles))
+        
+        if cascade is not None:
+            fetched_count = len(cascade_results) + rescored
+            print("\n🪜 Scoring cascade:")
+            print(cascade.format_report())
+        
+        held_back = len(deduplicator.held_back) if deduplicator is not None else 0
+        if not fetched_count and not held_back:
+            print("📭 No articles found")
+            return 0
+        
+        print(f"📊 Processed {fetched_count + held_back} articles")
+        if deduplicator is not None:
+            scored_count = len(scored_articles)
+            scored_articles = deduplicator.resolve(scored_articles)
+            print(f"🧬 Near-duplicates: {held_back} copies not rescored, "
+                  f"{scored_count + held_back - len(scored_articles)} dropped in favour of the best source")
+        if score_cache is not None:
+            print(f"🗄️  Score cache: {score_cache.hits - cache_hits} hits, {score_cache.misses - cache_misses} misses")
+        
+        # Weight by freshness, source and region; the leaderboard only keeps the best
+        with METRICS.timer("ranking_seconds"):
+            self.leaderboard.update_many(
+                [item["article"] for item in scored_articles],
+                [item["result"].assigned_score for item in scored_articles],
+                scored_articles
+            )
+            ranked = self.leaderboard.top(20)
         
         if not args.non_interactive:
-            print(f"\n📊 Scoring Results ({len(scored_articles)} articles):")
+            print(f"\n📊 Scoring Results ({len(scored_articles)} articles, best of {len(self.leaderboard)} tracked):")
             print("=" * 80)
             
-            for item in scored_articles[:20]:  # Show top 20
+            for final_score, item in ranked:  # Show top 20
                 article = item["article"]
                 result = item["result"]
-                print(f"[{result.assigned_score:3.0f}] {result.primary_topic:<20} {article.title[:50]}")
+                print(f"[{final_score:3.0f}] {result.primary_topic:<20} {article.title[:50]}")
         
         # Generate newsletter if requested
         if args.newsletter:
@@ -162,7 +288,7 @@ def main():
             
             # Create newsletter data
             newsletter_articles = []
-            for item in scored_articles:
+            for _, item in ranked[:15]:
                 article = item["article"]
                 result = item["result"]
                 
@@ -180,17 +306,217 @@ def main():
             from email_notifications import EmailNotificationSystem
             email_system = EmailNotificationSystem()
             
-            success = email_system.send_newsletter(
-                articles=newsletter_articles[:15],  # Top 15 articles
-                subject=f"📰 RSS AI Newsletter - {datetime.now().strftime('%B %d, %Y')}"
-            )
+            with METRICS.timer("newsletter_send_seconds"):
+                success = email_system.send_newsletter(
+                    articles=newsletter_articles,  # Top 15 articles
+                    subject=f"📰 RSS AI Newsletter - {datetime.now().strftime('%B %d, %Y')}"
+                )
             
             if success:
                 print("✅ Newsletter sent successfully!")
             else:
                 print("❌ Newsletter sending failed")
         
+        if self.results_sink is not None:
+            final_scores = self.ranker.score_articles(
+                [item["article"] for item in scored_articles],
+                [item["result"].assigned_score for item in scored_articles]
+            )
+            for item, final_score in zip(scored_articles, final_scores.tolist()):
+                article, result = item["article"], item["result"]
+                self.results_sink.add(article, final_score, result.primary_topic, keyword_results.get(article.id))
+            self.results_sink.flush()
+            print(f"💾 {self.results_sink.rows:,} result rows in {self.results_sink.directory}")
+        
+        # Only advance the watermark once the whole run went through
+        if args.incremental and client.commit_sync():
+            print("🔖 Sync watermark updated")
+        
         print(f"\n✅ Processing complete. {len(scored_articles)} articles scored.")
+        return fetched_count + held_back
+    
+    def _collect(self, scoring_stream, scored_articles: List[Dict], deduplicator, offset: int = 0) -> int:
+        """Record each (article, result, error) of a scoring stream; returns how many it yielded"""
+        args, score_cache = self.args, self.score_cache
+        count = 0
+        for i, (article, scored_result, error) in enumerate(scoring_stream, offset + 1):
+            count += 1
+            if args.verbose:
+                print(f"\n[{i}/{args.limit}] Processing: {article.title[:60]}...")
+            
+            if error is not None:
+                METRICS.increment("score_errors_total")
+                print(f"❌ Error scoring article: {error}")
+                continue
+            
+            try:
+                if score_cache is not None:
+                    score_cache.put("simple", article, self.cache_fingerprint, scored_result)
+                if deduplicator is not None:
+                    deduplicator.record(article, scored_result)
+                
+                scored_articles.append({
+                    "article": article,
+                    "result": scored_result
+                })
+                
+                if args.verbose:
+                    print(f"   Score: {scored_result.assigned_score}")
+                    print(f"   Topic: {scored_result.primary_topic}")
+                    if scored_result.ai_reasoning:
+                        print(f"   Reasoning: {scored_result.ai_reasoning[:100]}...")
+            
+            except Exception as e:
+                print(f"❌ Error scoring article: {e}")
+                continue
+        return count
+
+    def close(self):
+        """Write out anything still buffered"""
+        if self.results_sink is not None:
+            self.results_sink.close()
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="RSS AI Scorer - AI-Powered Article Scoring")
+    parser.add_argument("--username", "-u", help="FreshRSS username")
+    parser.add_argument("--password", "-p", help="FreshRSS password")
+    parser.add_argument("--limit", "-l", type=int, help="Number of articles to process (default: 10; no limit with --backfill)")
+    parser.add_argument("--page-size", type=int, help="Articles per FreshRSS request page (default: 50; 500 with --backfill)")
+    parser.add_argument("--api", action="store_true", help="Start API server mode")
+    parser.add_argument("--simple", action="store_true", help="Use simple AI scoring (recommended)")
+    parser.add_argument("--newsletter", action="store_true", help="Generate and send newsletter")
+    parser.add_argument("--since-hours", type=int, help="Only process articles from last N hours")
+    parser.add_argument("--incremental", action="store_true", help="Only fetch articles newer than the last committed sync watermark")
+    parser.add_argument("--unread-only", action="store_true", help="Only fetch unread articles (filtered by FreshRSS, read items are never downloaded)")
+    parser.add_argument("--fetch-by", choices=("feed", "label"), help="Fetch each feed or label stream concurrently and split --limit between them by source weight, so one busy feed cannot crowd out the rest (see FAIR_FETCH_CONFIG)")
+    parser.add_argument("--stream-json", action="store_true", help="Parse FreshRSS responses incrementally to keep memory flat on large pages")
+    parser.add_argument("--reset-sync", action="store_true", help="Forget sync watermarks so the next run backfills from --since-hours")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent scoring workers (default: 1)")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Disable the AI requests/tokens per minute budget")
+    parser.add_argument("--no-cache", action="store_true", help="Rescore every article instead of using the score cache")
+    parser.add_argument("--no-store", action="store_true", help="Do not keep fetched articles in the local full-text store")
+    parser.add_argument("--no-dedup", action="store_true", help="Score syndicated near-duplicate copies separately")
+    parser.add_argument("--cascade", action="store_true", help="Keyword- and semantic-score every article locally and only send promising ones to the AI scorer (see CASCADE_CONFIG)")
+    parser.add_argument("--ai-budget", type=int, help="With --cascade: maximum AI-scored articles this run")
+    parser.add_argument("--watch", action="store_true", help="Stay running and score new articles as they arrive, polling at an interval that adapts to the arrival rate (implies --incremental)")
+    parser.add_argument("--backfill", action="store_true", help="Score the whole reading list with a process pool into resumable JSONL chunks (see BACKFILL_CONFIG), then exit")
+    parser.add_argument("--backfill-restart", action="store_true", help="With --backfill: discard the checkpoint and earlier chunks and start over")
+    parser.add_argument("--backfill-scorers", default=None, help="With --backfill: comma-separated scorers, from keyword, semantic (default: keyword)")
+    parser.add_argument("--processes", type=int, help="With --backfill: scoring processes (default: CPU count)")
+    parser.add_argument("--export-results", action="store_true", help="Append every scored article to results.jsonl and memory-mappable NumPy columns in RESULTS_DIR (see RESULTS_CONFIG)")
+    parser.add_argument("--rescore-recorded", action="store_true", help="Re-score locally recorded keyword matches under the current keywords and topic scores, scanning text only for new keywords, then exit")
+    parser.add_argument("--search", metavar="QUERY", help="Search locally stored articles (SQLite FTS5 syntax, e.g. '\"machine learning\" OR robotics') and exit")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown and profile the run with cProfile")
+    parser.add_argument("--profile-output", help="Write cProfile stats to this file (implies --profile)")
+    parser.add_argument("--metrics-file", help="Write a metrics snapshot here at the end of the run, and after every --watch cycle (.prom for Prometheus text, otherwise JSON)")
+    parser.add_argument("--compile-topic-model", action="store_true", help="Rebuild the topic model artifact from the keyword table and topic scores, then exit")
+    parser.add_argument("--non-interactive", action="store_true", help="Run in non-interactive mode")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    
+    args = parser.parse_args()
+    if not args.backfill:
+        args.limit = 10 if args.limit is None else args.limit
+        args.page_size = 50 if args.page_size is None else args.page_size
+    if args.watch:
+        if args.newsletter:
+            parser.error("--newsletter cannot be combined with --watch; send newsletters from a scheduled run")
+        args.incremental = True
+    
+    if not args.non_interactive:
+        print_banner()
+        setup_environment(interactive=True)
+    else:
+        setup_environment(interactive=False)
+    
+    if args.compile_topic_model:
+        from topic_model import CompiledTopicModel
+        
+        model = CompiledTopicModel.compile()
+        model.save(settings.topic_model_file)
+        print(f"✅ Topic model written to {settings.topic_model_file}")
+        print(f"   {len(model.topics)} topics, {len(model.matcher.phrases)} phrases, fingerprint {model.fingerprint}")
+        return
+    
+    if args.search:
+        from article_store import ArticleStore
+        
+        store = ArticleStore()
+        results = store.search(args.search, limit=args.limit)
+        print(f"🔎 {len(results)} of {store.count()} stored articles match {args.search!r}")
+        for i, (article, snippet) in enumerate(results, 1):
+            published = datetime.fromtimestamp(article.timestamp).strftime('%Y-%m-%d')
+            print(f"{i:2d}. {article.title[:70]} ({article.source}, {published})")
+            print(f"    {snippet}")
+            print(f"    {article.url}")
+        store.close()
+        return
+    
+    if args.rescore_recorded:
+        rescore_recorded(args)
+        return
+    
+    if args.api:
+        # Start API server
+        import uvicorn
+        from web_app import app
+        
+        print("🚀 Starting RSS AI Scorer API server...")
+        print("📊 Dashboard available at: http://localhost:8000")
+        print("📖 API docs at: http://localhost:8000/docs")
+        
+        uvicorn.run(app, host="0.0.0.0", port=8000)
+        return
+    
+    # Validate required arguments
+    if not args.username or not args.password:
+        if not args.non_interactive:
+            print("❌ Username and password are required")
+            print("Use --username and --password or --api for server mode")
+            return
+        else:
+            # In non-interactive mode, try to get credentials from environment
+            args.username = os.getenv("FRESHRSS_USERNAME")
+            args.password = os.getenv("FRESHRSS_API_PASSWORD")
+            
+            if not args.username or not args.password:
+                print("❌ FreshRSS credentials not configured")
+                return
+    
+    profiler = None
+    if args.profile or args.profile_output:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    run_started = time.perf_counter()
+    
+    # Process articles
+    session = None
+    try:
+        if args.backfill:
+            run_backfill(args)
+            return
+        
+        session = ScoringSession(args)
+        if not session.client.authenticate():
+            print("❌ Failed to authenticate with FreshRSS")
+            return
+        
+        if args.watch:
+            from watch import Watcher
+            
+            # Warm state carries over; each cycle only fetches what arrived since the last one
+            watcher = Watcher(
+                session.run_cycle,
+                limit=args.limit,
+                after_cycle=lambda: write_metrics_file(args),
+                verbose=args.verbose
+            )
+            watcher.install_signal_handlers()
+            print("👀 Watching for new articles (SIGTERM or Ctrl+C to stop)")
+            watcher.run()
+        else:
+            session.run_cycle()
         
     except KeyboardInterrupt:
         print("\n⏹️  Processing interrupted by user")
@@ -199,6 +525,96 @@ def main():
         if args.verbose:
             import traceback
             traceback.print_exc()
+    finally:
+        if session is not None:
+            session.close()
+        METRICS.observe("run_seconds", time.perf_counter() - run_started)
+        report_metrics(args, profiler)
+
+def run_backfill(args):
+    """--backfill: score the whole reading list, resuming from the last checkpoint"""
+    from backfill import Backfill
+    from config import BACKFILL_CONFIG
+    from freshrss_client import FreshRSSClient
+    
+    article_store = None
+    if not args.no_store:
+        from article_store import ArticleStore
+        article_store = ArticleStore()
+    
+    client = FreshRSSClient(args.username, args.password)
+    if not client.authenticate():
+        print("❌ Failed to authenticate with FreshRSS")
+        return
+    
+    scorers = args.backfill_scorers.split(",") if args.backfill_scorers else BACKFILL_CONFIG["scorers"]
+    backfill = Backfill(
+        client,
+        scorers=[name.strip() for name in scorers],
+        processes=args.processes,
+        page_size=args.page_size or BACKFILL_CONFIG["page_size"],
+        since_hours=args.since_hours,
+        max_articles=args.limit,
+        article_store=article_store
+    )
+    backfill.run(restart=args.backfill_restart)
+
+def report_metrics(args, profiler=None):
+    """Print the --profile breakdown and write metrics/profile files"""
+    if profiler is not None:
+        profiler.disable()
+        print("\n⏱️  Stage breakdown:")
+        print(METRICS.format_breakdown())
+        
+        import pstats
+        print("\n🔬 Top functions by cumulative time:")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+        if args.profile_output:
+            profiler.dump_stats(args.profile_output)
+            print(f"💾 cProfile stats written to {args.profile_output}")
+    
+    write_metrics_file(args)
+
+def rescore_recorded(args):
+    """Delta re-score of the recorded keyword matches; prints the top articles"""
+    from article_store import ArticleStore
+    from keyword_scorer import KeywordScorer
+    from match_store import KeywordMatchStore
+    
+    match_store = KeywordMatchStore()
+    article_store = ArticleStore()
+    score_cache = None
+    if not args.no_cache:
+        from score_cache import ScoreCache
+        score_cache = ScoreCache()
+    try:
+        started = time.perf_counter()
+        result = KeywordScorer().rescore_recorded(match_store, article_store, score_cache)
+        print(f"♻️  Re-scored {len(result.article_ids):,} recorded articles in {time.perf_counter() - started:.2f}s: "
+              f"{result.recomputed:,} recomputed, {len(result.article_ids) - result.recomputed:,} renormalized, "
+              f"{result.dropped:,} dropped")
+        
+        top = sorted(zip(result.keyword_scores.tolist(), result.article_ids), reverse=True)[:args.limit]
+        articles = article_store.get_many([article_id for _, article_id in top])
+        for i, ((score, article_id), article) in enumerate(zip(top, articles), 1):
+            title = article.title[:70] if article is not None else article_id
+            print(f"{i:2d}. [{score:5.1f}] {title}")
+    except ValueError as e:
+        print(f"❌ {e}")
+    finally:
+        match_store.close()
+        article_store.close()
+        if score_cache is not None:
+            score_cache.close()
+
+
+def write_metrics_file(args):
+    """Write the --metrics-file snapshot, if requested"""
+    if args.metrics_file:
+        try:
+            METRICS.write_snapshot(args.metrics_file)
+        except Exception as e:
+            print(f"❌ Error writing metrics snapshot: {e}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,195 @@
+"""
+Per-article keyword match records, for re-scoring after keyword or topic
+score edits without rescanning article text
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config import settings
+from keyword_scorer import Article, keyword_details
+from score_cache import content_hash
+
+# Stay well below SQLite's bound-parameter limit
+_SQL_CHUNK_SIZE = 500
+
+
+def phrase_targets(keywords: Dict) -> Dict[str, Tuple[Tuple[str, str, int], ...]]:
+    """Lowercased phrase -> the (topic, polarity, weight) entries it counts towards"""
+    targets: Dict[str, List[Tuple[str, str, int]]] = {}
+    for topic, topic_keywords in keywords.items():
+        for polarity in ("positive", "negative"):
+            for keyword in topic_keywords.get(polarity, []):
+                if keyword:
+                    targets.setdefault(keyword.lower(), []).append((topic, polarity, len(keyword.split())))
+    return {phrase: tuple(sorted(entries)) for phrase, entries in targets.items()}
+
+
+def keyword_changes(old_keywords: Dict, new_keywords: Dict) -> Tuple[Set[str], Set[str]]:
+    """
+    Phrases whose matches must be looked up again, and phrases that count
+    differently now
+    Returns: (added, changed); changed covers removed phrases and phrases
+    moved to another topic, polarity or weight
+    """
+    old, new = phrase_targets(old_keywords), phrase_targets(new_keywords)
+    added = {phrase for phrase in new if phrase not in old}
+    changed = {phrase for phrase, entries in old.items() if new.get(phrase) != entries}
+    return added, changed
+
+
+@dataclass
+class MatchRecord:
+    """Matched phrases and per-topic match weights of one article, as of one keyword table"""
+    article_id: str
+    content_hash: str
+    version: int
+    phrases: List[str]
+    topic_matches: np.ndarray
+
+
+@dataclass
+class DeltaRescore:
+    """Outcome of KeywordScorer.rescore_recorded, rows in article id order"""
+    topics: List[str]
+    article_ids: List[str]
+    keyword_scores: np.ndarray
+    topic_matches: np.ndarray
+    recomputed: int  # Articles whose topic matches changed with the keywords
+    dropped: int  # Records whose article is no longer stored unchanged
+
+    def results(self) -> List[Tuple[float, Dict]]:
+        """(score, details) per article, as KeywordScorer.score_article returns them"""
+        return [
+            (score, keyword_details(self.topics, matches))
+            for score, matches in zip(self.keyword_scores.tolist(), self.topic_matches.tolist())
+        ]
+
+
+class KeywordMatchStore:
+    """
+    SQLite table of KeywordScorer match records
+
+    Per article: its content hash, the keyword phrases it contains (newline
+    separated) and the per-topic match weights derived from them, tagged
+    with the version of the keyword table they were computed under (kept
+    in keyword_tables).
+    Phrase presence does not depend on the rest of the table, so these
+    records are enough to recompute an article's topic matches under an
+    edited table; only newly added phrases need the article text.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or settings.keyword_match_file
+        self.path = path
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS keyword_tables (
+                version INTEGER PRIMARY KEY,
+                fingerprint TEXT NOT NULL UNIQUE,
+                keywords TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS matches (
+                article_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                phrases TEXT NOT NULL,
+                topic_matches BLOB NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def table_version(self, keywords: Dict) -> int:
+        """Version number of a keyword table, registering it on first use"""
+        # Order-sensitive: topic order is the column order of topic_matches
+        encoded = json.dumps(keywords)
+        fingerprint = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+        version = self._versions.get(fingerprint)
+        if version is not None:
+            return version
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO keyword_tables (fingerprint, keywords, created_at) VALUES (?, ?, ?)",
+                (fingerprint, encoded, time.time())
+            )
+            self.conn.commit()
+            version = self.conn.execute(
+                "SELECT version FROM keyword_tables WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()[0]
+        self._versions[fingerprint] = version
+        return version
+
+    def keyword_table(self, version: int) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute("SELECT keywords FROM keyword_tables WHERE version = ?", (version,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record(self, articles: List[Article], phrase_sets: List[List[str]], topic_matches: np.ndarray, keywords: Dict):
+        """Store the matches of freshly scored articles"""
+        if not articles:
+            return
+        version = self.table_version(keywords)
+        self.write([
+            MatchRecord(article.id, content_hash(article), version, phrases, row)
+            for article, phrases, row in zip(articles, phrase_sets, topic_matches)
+        ])
+
+    def write(self, records: Iterable[MatchRecord]):
+        now = time.time()
+        rows = [
+            (
+                record.article_id, record.content_hash, record.version, "\n".join(sorted(record.phrases)),
+                np.ascontiguousarray(record.topic_matches, dtype=np.float64).tobytes(), now
+            )
+            for record in records
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO matches (article_id, content_hash, version, phrases, topic_matches, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+    def load(self) -> List[MatchRecord]:
+        """Every record, in article id order"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT article_id, content_hash, version, phrases, topic_matches FROM matches ORDER BY article_id"
+            ).fetchall()
+        return [
+            MatchRecord(article_id, digest, version, phrases.split("\n") if phrases else [], np.frombuffer(blob, dtype=np.float64))
+            for article_id, digest, version, phrases, blob in rows
+        ]
+
+    def delete(self, article_ids: List[str]):
+        with self._lock:
+            for start in range(0, len(article_ids), _SQL_CHUNK_SIZE):
+                chunk = article_ids[start:start + _SQL_CHUNK_SIZE]
+                self.conn.execute(f"DELETE FROM matches WHERE article_id IN ({','.join('?' * len(chunk))})", chunk)
+            self.conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
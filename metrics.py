@@ -0,0 +1,192 @@
+"""
+Lightweight in-process metrics: counters, gauges and timing histograms
+"""
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds (Prometheus-style, cumulative on export)
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Fixed-bucket distribution of observed values"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts: List[int] = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile: upper bound of the bucket holding it"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self.bucket_counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named metrics
+
+    Timers are histograms of seconds. Names follow Prometheus conventions
+    (snake_case, _seconds / _total suffixes); export adds a common prefix.
+    """
+
+    def __init__(self, prefix: str = "rss_scorer"):
+        self.prefix = prefix
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block into histogram name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name: str) -> Callable:
+        """Decorator form of timer()"""
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Point-in-time copy of every metric as plain data"""
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "uptime_seconds": time.time() - self.started_at,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{self.prefix}_{name}"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, value in sorted(snapshot["gauges"].items()):
+            metric = f"{self.prefix}_{name}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        for name, histogram in sorted(snapshot["histograms"].items()):
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket_count in histogram["buckets"].items():
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines += [f"{metric}_sum {histogram['sum']}", f"{metric}_count {histogram['count']}"]
+        lines.append(f"# TYPE {self.prefix}_uptime_seconds gauge")
+        lines.append(f"{self.prefix}_uptime_seconds {snapshot['uptime_seconds']:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: str):
+        """
+        Atomically write a snapshot for an external scraper
+        Prometheus text format for .prom files, JSON otherwise
+        """
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def format_breakdown(self) -> str:
+        """Human-readable per-stage timing table, slowest total first"""
+        snapshot = self.snapshot()
+        rows = sorted(snapshot["histograms"].items(), key=lambda item: item[1]["sum"], reverse=True)
+        lines = [f"{'stage':<34} {'calls':>7} {'total s':>9} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for name, histogram in rows:
+            lines.append(
+                f"{name:<34} {histogram['count']:>7} {histogram['sum']:>9.3f} "
+                f"{histogram['mean'] * 1000:>9.2f} {histogram['p95'] * 1000:>9.2f} {histogram['max'] * 1000:>9.2f}"
+            )
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{name:<34} {value:>7g}")
+        return "\n".join(lines)
+
+
+# Process-wide registry used by the client, scorers and main
+METRICS = MetricsRegistry()
@@ -0,0 +1,354 @@
+"""
+Near-duplicate detection for syndicated copies of the same story
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from config import NEAR_DUPLICATE_CONFIG, settings
+from keyword_scorer import Article
+from metrics import METRICS
+
+# Odd multipliers for combining word hashes into shingle and bucket hashes
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_BAND_MULTIPLIER = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+def word_hashes(text: str) -> np.ndarray:
+    """Stable 32-bit hash per word (crc32, so independent of PYTHONHASHSEED)"""
+    # Each distinct word is hashed once
+    vocabulary: Dict[str, int] = {}
+    positions = [vocabulary.setdefault(word, len(vocabulary)) for word in text.split()]
+    hashes = np.fromiter(
+        (zlib.crc32(word.encode("utf-8")) for word in vocabulary), dtype=np.uint64, count=len(vocabulary)
+    )
+    return hashes[np.array(positions, dtype=np.intp)]
+
+
+def shingle_hashes(text: str, size: int) -> np.ndarray:
+    """Distinct 64-bit hashes of all runs of size consecutive words"""
+    words = word_hashes(text)
+    if len(words) < size:
+        return np.zeros(0, dtype=np.uint64)
+    count = len(words) - size + 1
+    hashes = words[:count].copy()
+    for offset in range(1, size):
+        hashes = hashes * _SHINGLE_MULTIPLIER + words[offset:offset + count]
+    return np.unique(hashes)
+
+
+class MinHasher:
+    """
+    MinHash signatures from multiply-shift hash permutations
+
+    Signature i is the minimum over all shingles of the high 32 bits of
+    (a_i * shingle + b_i) mod 2^64. The fraction of equal positions in two
+    signatures estimates the Jaccard similarity of their shingle sets.
+    """
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """uint32 signature, or None for texts shorter than one shingle"""
+        shingles = shingle_hashes(text, self.shingle_size)
+        if not len(shingles):
+            return None
+        hashed = self.a[:, None] * shingles[None, :] + self.b[:, None]
+        return (hashed >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+
+def estimated_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index of story clusters
+
+    Every story cluster is represented by the signature of its first
+    article. Signatures are cut into bands; two articles become lookup
+    candidates when any band matches exactly, so a lookup reads a few
+    buckets instead of comparing against every stored story. Candidates
+    are confirmed by estimated Jaccard similarity. The index lives in
+    SQLite, so copies fetched in a later monitoring cycle still match
+    earlier originals, and each cluster can carry the score of the copy
+    that was scored.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        num_perm: int = NEAR_DUPLICATE_CONFIG["num_perm"],
+        bands: int = NEAR_DUPLICATE_CONFIG["bands"],
+        shingle_size: int = NEAR_DUPLICATE_CONFIG["shingle_size"],
+        threshold: float = NEAR_DUPLICATE_CONFIG["threshold"],
+        max_age_hours: float = NEAR_DUPLICATE_CONFIG["max_age_hours"],
+        seed: int = NEAR_DUPLICATE_CONFIG["seed"]
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        path = path or settings.near_duplicate_file
+        self.path = path
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+        self.max_age_seconds = max_age_hours * 3600
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS clusters (
+                cluster_id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                score BLOB
+            );
+            CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, cluster_id TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_buckets_bucket ON buckets(bucket);
+            CREATE INDEX IF NOT EXISTS idx_buckets_cluster ON buckets(cluster_id);
+            CREATE TABLE IF NOT EXISTS members (article_id TEXT PRIMARY KEY, cluster_id TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_members_cluster ON members(cluster_id);
+        """)
+        self._check_parameters({"num_perm": num_perm, "bands": bands, "shingle_size": shingle_size, "seed": seed})
+        self.prune()
+
+    def _check_parameters(self, parameters: Dict[str, int]):
+        """Signatures are only comparable under the same parameters; start over otherwise"""
+        encoded = json.dumps(parameters, sort_keys=True)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'parameters'").fetchone()
+        if row is not None and row[0] != encoded:
+            print("⚠️  Near-duplicate parameters changed, clearing the index")
+            self.clear()
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('parameters', ?)", (encoded,))
+        self.conn.commit()
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """One bucket key per band, mixing in the band number"""
+        rows = signature.astype(np.uint64).reshape(self.bands, self.rows_per_band)
+        keys = np.arange(self.bands, dtype=np.uint64)
+        for column in range(self.rows_per_band):
+            keys = keys * _BAND_MULTIPLIER + rows[:, column]
+        # SQLite integers are signed
+        return keys.view(np.int64).tolist()
+
+    def _find_cluster(self, signature: np.ndarray) -> Optional[str]:
+        """Most similar cluster above the threshold among the LSH candidates"""
+        keys = self.band_keys(signature)
+        placeholders = ",".join("?" * len(keys))
+        rows = self.conn.execute(
+            f"SELECT cluster_id, signature FROM clusters WHERE cluster_id IN "
+            f"(SELECT DISTINCT cluster_id FROM buckets WHERE bucket IN ({placeholders}))",
+            keys
+        ).fetchall()
+        best, best_similarity = None, self.threshold
+        for cluster_id, stored in rows:
+            similarity = estimated_similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if similarity >= best_similarity:
+                best, best_similarity = cluster_id, similarity
+        return best
+
+    def find(self, article: Article) -> Optional[str]:
+        """Cluster of an indexed near-duplicate of article, without adding it"""
+        with self._lock:
+            row = self.conn.execute("SELECT cluster_id FROM members WHERE article_id = ?", (article.id,)).fetchone()
+            if row is not None:
+                return row[0]
+            signature = self.hasher.signature(article.normalized_text)
+            return self._find_cluster(signature) if signature is not None else None
+
+    @METRICS.timed("near_duplicate_assign_seconds")
+    def assign(self, article: Article) -> Tuple[str, bool]:
+        """
+        Put article into its story cluster
+        Returns: (cluster_id, True if article started a new cluster)
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT cluster_id FROM members WHERE article_id = ?", (article.id,)).fetchone()
+            if row is not None:
+                return row[0], False
+
+            signature = self.hasher.signature(article.normalized_text)
+            if signature is None:
+                # Too short to compare: its own cluster, not indexed
+                return article.id, True
+
+            cluster_id = self._find_cluster(signature)
+            is_new = cluster_id is None
+            if is_new:
+                cluster_id = article.id
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO clusters (cluster_id, signature, created_at) VALUES (?, ?, ?)",
+                    (cluster_id, signature.tobytes(), time.time())
+                )
+                self.conn.executemany(
+                    "INSERT INTO buckets (bucket, cluster_id) VALUES (?, ?)",
+                    [(key, cluster_id) for key in self.band_keys(signature)]
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO members (article_id, cluster_id) VALUES (?, ?)", (article.id, cluster_id)
+            )
+            return cluster_id, is_new
+
+    def set_score(self, cluster_id: str, result: Any):
+        """Remember the score of a cluster's scored copy"""
+        with self._lock:
+            self.conn.execute("UPDATE clusters SET score = ? WHERE cluster_id = ?", (pickle.dumps(result), cluster_id))
+
+    def get_score(self, cluster_id: str) -> Optional[Any]:
+        with self._lock:
+            row = self.conn.execute("SELECT score FROM clusters WHERE cluster_id = ?", (cluster_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return None
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+
+    def prune(self):
+        """Forget clusters older than max_age_hours"""
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            stale = "SELECT cluster_id FROM clusters WHERE created_at < ?"
+            self.conn.execute(f"DELETE FROM buckets WHERE cluster_id IN ({stale})", (cutoff,))
+            self.conn.execute(f"DELETE FROM members WHERE cluster_id IN ({stale})", (cutoff,))
+            self.conn.execute("DELETE FROM clusters WHERE created_at < ?", (cutoff,))
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.executescript("DELETE FROM buckets; DELETE FROM members; DELETE FROM clusters;")
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            clusters = self.conn.execute("SELECT COUNT(*) FROM clusters").fetchone()[0]
+            members = self.conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+        return {"clusters": clusters, "articles": members}
+
+    def close(self):
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+class Deduplicator:
+    """
+    Dedup stage of one run, between fetching and scoring
+
+    filter() passes on the first copy of each story seen in this run
+    unless another copy was already scored, and holds back the rest.
+    After scoring, record() stores each score on its cluster and
+    resolve() gives held-back copies their cluster's score, then keeps
+    one copy per story: the one from the highest-weighted source
+    (SOURCE_WEIGHTS), earliest fetched on ties.
+    """
+
+    def __init__(self, index: NearDuplicateIndex, source_weight: Optional[Callable[[Article], float]] = None):
+        self.index = index
+        if source_weight is None:
+            from ranking import Ranker
+            ranker = Ranker()
+            source_weight = lambda article: ranker.source_weight(
+                (article.source or "").lower(), (urlparse(article.url).hostname or "") if article.url else ""
+            )
+        self.source_weight = source_weight
+        self.cluster_of: Dict[str, str] = {}
+        self.held_back: List[Article] = []
+        self._scoring: Set[str] = set()
+        self._scores: Dict[str, Any] = {}
+
+    def filter(self, articles: Iterable[Article]) -> Iterator[Article]:
+        """Articles that need scoring; near-duplicates are held back"""
+        try:
+            for article in articles:
+                cluster_id, is_new = self.index.assign(article)
+                self.cluster_of[article.id] = cluster_id
+                # The cluster's own first article is always scored (the score cache covers refetches)
+                first_copy = cluster_id not in self._scoring
+                if is_new or (first_copy and (cluster_id == article.id or self.index.get_score(cluster_id) is None)):
+                    self._scoring.add(cluster_id)
+                    yield article
+                else:
+                    METRICS.increment("near_duplicates_total")
+                    self.held_back.append(article)
+        finally:
+            self.index.commit()
+
+    def record(self, article: Article, result: Any):
+        """Attach the score of a scored article to its cluster"""
+        cluster_id = self.cluster_of.get(article.id, article.id)
+        self._scores[cluster_id] = result
+        self.index.set_score(cluster_id, result)
+
+    def _cluster_score(self, article: Article) -> Any:
+        cluster_id = self.cluster_of[article.id]
+        result = self._scores.get(cluster_id)
+        return result if result is not None else self.index.get_score(cluster_id)
+
+    def unscored(self, exclude: Iterable[str] = ()) -> List[Article]:
+        """
+        Take back one held-back copy of each cluster that got no score,
+        e.g. because scoring the copy that was passed on failed: the one
+        from the highest-weighted source, earliest fetched on ties. Once
+        it is scored and recorded, resolve() gives the other copies its
+        score. Copies in the exclude clusters stay held back.
+        """
+        exclude = set(exclude)
+        best: Dict[str, Tuple[float, Article]] = {}
+        for article in self.held_back:
+            cluster_id = self.cluster_of[article.id]
+            if cluster_id in exclude or self._cluster_score(article) is not None:
+                continue
+            weight = self.source_weight(article)
+            if cluster_id not in best or weight > best[cluster_id][0]:
+                best[cluster_id] = (weight, article)
+        unscored = [article for _, article in best.values()]
+        if unscored:
+            taken = {article.id for article in unscored}
+            self.held_back = [article for article in self.held_back if article.id not in taken]
+        return unscored
+
+    def resolve(self, scored: List[Dict]) -> List[Dict]:
+        """
+        Add held-back copies with their cluster's score and keep the best
+        copy of each story
+        Takes and returns [{"article": ..., "result": ...}] entries. Call
+        unscored() first: copies still without a cluster score are left out.
+        """
+        entries = list(scored)
+        for article in self.held_back:
+            result = self._cluster_score(article)
+            if result is not None:
+                entries.append({"article": article, "result": result})
+        self.index.commit()
+
+        best: Dict[str, Tuple[float, int]] = {}
+        for position, entry in enumerate(entries):
+            article = entry["article"]
+            cluster_id = self.cluster_of.get(article.id, article.id)
+            weight = self.source_weight(article)
+            if cluster_id not in best or weight > best[cluster_id][0]:
+                best[cluster_id] = (weight, position)
+        return [entries[position] for position in sorted(position for _, position in best.values())]
@@ -0,0 +1,244 @@
+"""
+Final ranking of scored articles: freshness, source and regional weighting
+"""
+import heapq
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from config import FRESHNESS_CONFIG, REGIONAL_SOURCES, REGIONAL_WEIGHTS, SOURCE_RELIABILITY, SOURCE_WEIGHTS
+
+
+def _matches(fragments: List[str], source: str, host: str) -> bool:
+    """'.tld' fragments match the URL host suffix, others any part of source or host"""
+    for fragment in fragments:
+        if fragment.startswith("."):
+            if host.endswith(fragment):
+                return True
+        elif fragment in source or fragment in host:
+            return True
+    return False
+
+
+class Ranker:
+    """
+    Computes final scores as
+
+        base score x freshness decay x source weight x regional weight
+
+    Freshness halves every half_life_hours from the article timestamp and
+    is floored at min_multiplier; articles older than max_age_hours get
+    min_multiplier. Source and regional weights are resolved once per
+    distinct (source, host) pair.
+    """
+
+    def __init__(
+        self,
+        freshness: Optional[Dict[str, float]] = None,
+        source_weights: Optional[Dict[str, float]] = None,
+        regional_weights: Optional[Dict[str, float]] = None,
+        source_reliability: Optional[Dict[str, List[str]]] = None,
+        regional_sources: Optional[Dict[str, List[str]]] = None
+    ):
+        self.freshness = freshness if freshness is not None else FRESHNESS_CONFIG
+        self.source_weights = source_weights if source_weights is not None else SOURCE_WEIGHTS
+        self.regional_weights = regional_weights if regional_weights is not None else REGIONAL_WEIGHTS
+        self.source_reliability = source_reliability if source_reliability is not None else SOURCE_RELIABILITY
+        self.regional_sources = regional_sources if regional_sources is not None else REGIONAL_SOURCES
+        self.half_life_seconds = self.freshness["half_life_hours"] * 3600
+        self.max_age_seconds = self.freshness["max_age_hours"] * 3600
+        self.min_multiplier = self.freshness["min_multiplier"]
+        self._weight_cache: Dict[Tuple[str, str], float] = {}
+
+    def source_weight(self, source: str, host: str) -> float:
+        """Reliability tier weight of a source"""
+        for tier, fragments in self.source_reliability.items():
+            if _matches(fragments, source, host):
+                return self.source_weights.get(tier, 1.0)
+        return self.source_weights.get("medium_reliability", 1.0)
+
+    def regional_weight(self, source: str, host: str) -> float:
+        """Regional preference weight of a source"""
+        for region, fragments in self.regional_sources.items():
+            if _matches(fragments, source, host):
+                return self.regional_weights.get(region, 1.0)
+        return self.regional_weights.get("global", 1.0)
+
+    def article_weight(self, source: str, url: str) -> float:
+        """Combined source x regional weight, memoized per (source, host)"""
+        host = (urlparse(url).hostname or "") if url else ""
+        key = (source, host)
+        weight = self._weight_cache.get(key)
+        if weight is None:
+            name = (source or "").lower()
+            weight = self.source_weight(name, host) * self.regional_weight(name, host)
+            self._weight_cache[key] = weight
+        return weight
+
+    def freshness_multipliers(self, timestamps: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """Exponential decay factor per article timestamp (seconds)"""
+        now = time.time() if now is None else now
+        ages = np.maximum(now - np.asarray(timestamps, dtype=float), 0)
+        multipliers = np.maximum(np.exp2(-ages / self.half_life_seconds), self.min_multiplier)
+        return np.where(ages > self.max_age_seconds, self.min_multiplier, multipliers)
+
+    def final_scores(
+        self,
+        base_scores: Sequence[float],
+        timestamps: Sequence[float],
+        sources: Sequence[str],
+        urls: Sequence[str],
+        now: Optional[float] = None
+    ) -> np.ndarray:
+        """Vectorized final scores for parallel sequences of article fields"""
+        weights = np.fromiter(
+            (self.article_weight(source, url) for source, url in zip(sources, urls)),
+            dtype=float,
+            count=len(sources)
+        )
+        return np.asarray(base_scores, dtype=float) * self.freshness_multipliers(timestamps, now) * weights
+
+    def score_articles(self, articles: Sequence, base_scores: Sequence[float], now: Optional[float] = None) -> np.ndarray:
+        """Final scores for Article objects"""
+        return self.final_scores(
+            base_scores,
+            [article.timestamp for article in articles],
+            [article.source for article in articles],
+            [article.url for article in articles],
+            now
+        )
+
+    def score_batch(self, batch, base_scores: Sequence[float], now: Optional[float] = None) -> np.ndarray:
+        """Final scores for an ArticleBatch"""
+        return self.final_scores(base_scores, batch.timestamps, [batch.source_at(i) for i in range(len(batch))], batch.urls, now)
+
+    @staticmethod
+    def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first, via partial selection"""
+        scores = np.asarray(scores, dtype=float)
+        if k <= 0 or not len(scores):
+            return np.zeros(0, dtype=np.int64)
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        # Stable on ties: earlier articles first
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order]
+
+    def top_k(
+        self,
+        articles: Sequence,
+        base_scores: Sequence[float],
+        k: int,
+        now: Optional[float] = None
+    ) -> List[Tuple[float, int]]:
+        """
+        Rank articles and return the best k as (final_score, index) pairs
+        O(n) scoring plus O(n + k log k) selection instead of a full sort
+        """
+        scores = self.score_articles(articles, base_scores, now)
+        return [(float(scores[i]), int(i)) for i in self.top_k_indices(scores, k)]
+
+    def decay_key(self, base_score: float, timestamp: float, weight: float, now: Optional[float] = None) -> float:
+        """
+        Ranking key: log(final score as of now) plus now / half-life
+        Above the min_multiplier floor this is log(base x weight) plus
+        timestamp / half-life, which does not change as time passes;
+        floored articles are keyed by their floored score. Future
+        timestamps count as now, as in freshness_multipliers.
+        """
+        now = time.time() if now is None else now
+        final_score = base_score * weight * float(self.freshness_multipliers(np.array([timestamp]), now)[0])
+        if final_score <= 0:
+            return float("-inf")
+        return math.log2(final_score) + now / self.half_life_seconds
+
+
+class Leaderboard:
+    """
+    Best articles seen across monitoring cycles, maintained incrementally
+
+    Because decay is exponential, the order of un-floored final scores
+    never changes as time passes, so entries are kept in a min-heap of
+    capacity items keyed by Ranker.decay_key: each update costs O(log
+    capacity) and items that fall off can never overtake the kept ones
+    (except within the min_multiplier floor, where everything is
+    already old). top(k) recomputes exact final scores for the kept
+    entries, floor included, as Ranker does. Entries added more than
+    max_age_hours ago are dropped, however old the article itself is.
+    """
+
+    def __init__(self, ranker: Optional[Ranker] = None, capacity: int = 200):
+        self.ranker = ranker or Ranker()
+        self.capacity = max(1, capacity)
+        # (decay_key, article_id), with the payload kept alongside
+        self._heap: List[Tuple[float, str]] = []
+        # article_id -> (decay_key, base_score, timestamp, weight, payload, added_at)
+        self._entries: Dict[str, Tuple[float, float, float, float, Any, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, article, base_score: float, payload: Any = None, now: Optional[float] = None):
+        """Add or rescore one article"""
+        now = time.time() if now is None else now
+        weight = self.ranker.article_weight(article.source, article.url)
+        key = self.ranker.decay_key(base_score, article.timestamp, weight, now)
+        previous = self._entries.get(article.id)
+        entry = (key, base_score, float(article.timestamp), weight, payload if payload is not None else article, now)
+
+        if previous is not None:
+            # Rescored article: replace in place and restore the heap order
+            self._entries[article.id] = entry
+            self._heap = [(key if article_id == article.id else heap_key, article_id) for heap_key, article_id in self._heap]
+            heapq.heapify(self._heap)
+            return
+
+        if len(self._heap) < self.capacity:
+            self._entries[article.id] = entry
+            heapq.heappush(self._heap, (key, article.id))
+        elif key > self._heap[0][0]:
+            _, evicted_id = heapq.heapreplace(self._heap, (key, article.id))
+            del self._entries[evicted_id]
+            self._entries[article.id] = entry
+
+    def update_many(
+        self,
+        articles: Sequence,
+        base_scores: Sequence[float],
+        payloads: Optional[Sequence[Any]] = None,
+        now: Optional[float] = None
+    ):
+        """Merge one cycle of scored articles"""
+        now = time.time() if now is None else now
+        for i, (article, base_score) in enumerate(zip(articles, base_scores)):
+            self.update(article, float(base_score), payloads[i] if payloads is not None else None, now)
+
+    def expire(self, now: Optional[float] = None):
+        """Drop entries added more than the freshness max age ago"""
+        now = time.time() if now is None else now
+        cutoff = now - self.ranker.max_age_seconds
+        expired = {article_id for article_id, entry in self._entries.items() if entry[5] < cutoff}
+        if expired:
+            for article_id in expired:
+                del self._entries[article_id]
+            self._heap = [item for item in self._heap if item[1] not in expired]
+            heapq.heapify(self._heap)
+
+    def top(self, k: int, now: Optional[float] = None) -> List[Tuple[float, Any]]:
+        """Best k entries as (final_score, payload), best first"""
+        self.expire(now)
+        if not self._entries:
+            return []
+        entries = list(self._entries.values())
+        timestamps = np.array([entry[2] for entry in entries])
+        scores = (
+            np.array([entry[1] for entry in entries])
+            * self.ranker.freshness_multipliers(timestamps, now)
+            * np.array([entry[3] for entry in entries])
+        )
+        return [(float(scores[i]), entries[i][4]) for i in Ranker.top_k_indices(scores, k)]
@@ -0,0 +1,67 @@
+"""
+Token-bucket rate limiting for scoring API calls
+"""
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """
+        Take amount tokens if available
+        Returns: 0 on success, otherwise the seconds to wait before retrying
+        """
+        # Requests larger than the bucket would never fit; let them through on a full bucket
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.available >= amount:
+                self.available -= amount
+                return 0.0
+            return (amount - self.available) / self.rate_per_second
+
+    def acquire(self, amount: float = 1):
+        """Block until amount tokens have been taken"""
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Combined requests/minute and tokens/minute budget"""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        request_burst: float = 1
+    ):
+        self.requests = TokenBucket(requests_per_minute, capacity=request_burst) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 0):
+        """Block until one request and the given token estimate fit both budgets"""
+        # Serialize waiters so a large token request is not starved by small ones
+        with self._lock:
+            if self.requests is not None:
+                self.requests.acquire(1)
+            if self.tokens is not None and tokens > 0:
+                self.tokens.acquire(tokens)
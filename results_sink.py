@@ -0,0 +1,294 @@
+"""
+Streaming export of scored results: JSONL for appending, memory-mappable
+NumPy columns for bulk analysis
+"""
+import json
+import os
+import struct
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import RESULTS_CONFIG, settings
+from keyword_scorer import Article
+from metrics import METRICS
+
+SCHEMA_FILE = "schema.json"
+JSONL_FILE = "results.jsonl"
+SCHEMA_VERSION = 1
+
+# Every column file starts with a fixed-size .npy header, rewritten in place
+# with the new row count after each append
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_HEADER_BYTES = 128
+
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+def _npy_header(dtype: str, shape: Tuple[int, ...]) -> bytes:
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (dtype, shape)
+    header = header.ljust(_HEADER_BYTES - len(_NPY_MAGIC) - 3) + "\n"
+    return _NPY_MAGIC + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def _write_atomic(path: str, data: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".results-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _column_layout(topic_count: int, id_bytes: int) -> Dict[str, Tuple[str, Tuple[int, ...]]]:
+    """Column name -> (dtype, shape of one row)"""
+    return {
+        "id": (f"|S{id_bytes}", ()),
+        "source": ("<i4", ()),                  # Index into schema["sources"]
+        "timestamp": ("<i8", ()),
+        "keyword_score": ("<f4", ()),
+        "topic_matches": ("<f4", (topic_count,)),  # Columns ordered as schema["topics"]
+        "primary_topic": ("<i4", ()),           # Index into schema["primary_topics"], -1 for none
+        "final_score": ("<f4", ()),
+    }
+
+
+class ResultsSink:
+    """
+    Appends scored articles to results.jsonl and to one .npy file per column
+
+    Rows are buffered and written batch_size at a time, so memory stays
+    bounded however long the run. Articles added without a keyword result
+    are keyword-scored in one batch at flush time. schema.json records the
+    committed row count and results.jsonl size last; a sink reopened after
+    a crash cuts the column files and results.jsonl back to them, so both
+    always hold the same rows. Strings are stored as indices into the
+    source and primary topic lists in schema.json.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        keyword_scorer=None,
+        batch_size: int = RESULTS_CONFIG["batch_size"],
+        id_bytes: int = RESULTS_CONFIG["id_bytes"]
+    ):
+        self.directory = directory or settings.results_dir
+        self.batch_size = batch_size
+        if keyword_scorer is None:
+            from keyword_scorer import KeywordScorer
+            keyword_scorer = KeywordScorer()
+        self.keyword_scorer = keyword_scorer
+        self._pending: List[Tuple[Article, float, Optional[str], Optional[Dict[str, Any]]]] = []
+        self._warned: set = set()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.schema_path = os.path.join(self.directory, SCHEMA_FILE)
+        schema = load_schema(self.directory)
+        if schema is None:
+            topics = list(keyword_scorer.topics)
+            schema = {
+                "version": SCHEMA_VERSION,
+                "rows": 0,
+                "jsonl_bytes": 0,
+                "id_bytes": id_bytes,
+                "topics": topics,
+                "sources": [],
+                "primary_topics": [],
+                "columns": {
+                    name: {"dtype": dtype, "shape": list(shape)}
+                    for name, (dtype, shape) in _column_layout(len(topics), id_bytes).items()
+                },
+            }
+        self.schema = schema
+        self._topic_columns = {topic: column for column, topic in enumerate(schema["topics"])}
+        self._source_codes = {source: code for code, source in enumerate(schema["sources"])}
+        self._primary_topic_codes = {topic: code for code, topic in enumerate(schema["primary_topics"])}
+
+        # Drop anything appended after the last committed row count
+        jsonl_path = os.path.join(self.directory, JSONL_FILE)
+        if os.path.exists(jsonl_path):
+            jsonl_bytes = schema.setdefault("jsonl_bytes", os.path.getsize(jsonl_path))
+            if os.path.getsize(jsonl_path) > jsonl_bytes:
+                os.truncate(jsonl_path, jsonl_bytes)
+        for name in schema["columns"]:
+            path = self.column_path(name)
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(self._header(name, 0))
+            else:
+                os.truncate(path, _HEADER_BYTES + schema["rows"] * self._row_bytes(name))
+                with open(path, "r+b") as f:
+                    f.write(self._header(name, schema["rows"]))
+        _write_atomic(self.schema_path, json.dumps(schema, indent=2))
+        self._jsonl = open(jsonl_path, "ab")
+
+    @property
+    def rows(self) -> int:
+        return self.schema["rows"]
+
+    def column_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def _row_bytes(self, name: str) -> int:
+        column = self.schema["columns"][name]
+        return np.dtype(column["dtype"]).itemsize * int(np.prod(column["shape"], dtype=np.int64))
+
+    def _header(self, name: str, rows: int) -> bytes:
+        column = self.schema["columns"][name]
+        return _npy_header(column["dtype"], (rows, *column["shape"]))
+
+    def _warn_once(self, key: str, message: str):
+        if key not in self._warned:
+            self._warned.add(key)
+            print(f"⚠️  {message}")
+
+    def add(
+        self,
+        article: Article,
+        final_score: float,
+        primary_topic: Optional[str] = None,
+        keyword_result: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Queue one scored article; writes a batch once batch_size are queued
+        final_score is the ranked score (base score x freshness x source and
+        regional weights)
+        """
+        self._pending.append((article, final_score, primary_topic, keyword_result))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def _code(self, codes: Dict[str, int], values: List[str], value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    @METRICS.timed("results_flush_seconds")
+    def flush(self):
+        """Write the queued rows to results.jsonl and the column files"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        count = len(pending)
+
+        keyword_results = [keyword_result for _, _, _, keyword_result in pending]
+        unscored = [index for index, keyword_result in enumerate(keyword_results) if keyword_result is None]
+        if unscored:
+            batch = self.keyword_scorer.score_articles_batch([pending[index][0] for index in unscored])
+            for index, result in zip(unscored, batch):
+                keyword_results[index] = result
+
+        schema = self.schema
+        topic_matches = np.zeros((count, len(schema["topics"])), dtype=np.float32)
+        for row, keyword_result in enumerate(keyword_results):
+            for topic, matches in keyword_result["details"]["keyword_matches"].items():
+                column = self._topic_columns.get(topic)
+                if column is not None:
+                    topic_matches[row, column] = matches
+                elif matches:
+                    self._warn_once(f"topic:{topic}", f"Topic {topic!r} is not a column of {self.directory}; its matches are only in the JSONL")
+
+        ids = [article.id.encode("utf-8") for article, _, _, _ in pending]
+        if max(map(len, ids)) > schema["id_bytes"]:
+            self._warn_once("id", f"Article ids longer than {schema['id_bytes']} bytes are truncated in the id column")
+        columns = {
+            "id": np.array(ids, dtype=schema["columns"]["id"]["dtype"]),
+            "source": np.array(
+                [self._code(self._source_codes, schema["sources"], article.source) for article, _, _, _ in pending],
+                dtype="<i4"
+            ),
+            "timestamp": np.array([int(article.timestamp or 0) for article, _, _, _ in pending], dtype="<i8"),
+            "keyword_score": np.array([result["keyword_score"] for result in keyword_results], dtype="<f4"),
+            "topic_matches": topic_matches,
+            "primary_topic": np.array(
+                [self._code(self._primary_topic_codes, schema["primary_topics"], topic) for _, _, topic, _ in pending],
+                dtype="<i4"
+            ),
+            "final_score": np.array([final_score for _, final_score, _, _ in pending], dtype="<f4"),
+        }
+
+        scored_at = time.time()
+        for (article, final_score, topic, _), keyword_result in zip(pending, keyword_results):
+            self._jsonl.write((_JSON_ENCODER.encode({
+                "id": article.id,
+                "title": article.title,
+                "url": article.url,
+                "source": article.source,
+                "timestamp": article.timestamp,
+                "keyword_score": keyword_result["keyword_score"],
+                "topic_matches": {
+                    topic_name: value for topic_name, value in keyword_result["details"]["keyword_matches"].items() if value
+                },
+                "primary_topic": topic,
+                "final_score": final_score,
+                "scored_at": scored_at,
+            }) + "\n").encode("utf-8"))
+        self._jsonl.flush()
+        os.fsync(self._jsonl.fileno())
+
+        # Append the data, then raise each header's row count, then commit the
+        # schema; until then a reopened sink cuts both outputs back
+        rows = schema["rows"] + count
+        for name, values in columns.items():
+            with open(self.column_path(name), "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                f.write(values.tobytes())
+                f.seek(0)
+                f.write(self._header(name, rows))
+                f.flush()
+                os.fsync(f.fileno())
+        schema["rows"] = rows
+        schema["jsonl_bytes"] = self._jsonl.tell()
+        _write_atomic(self.schema_path, json.dumps(schema, indent=2))
+        METRICS.increment("results_rows_written_total", count)
+
+    def close(self):
+        self.flush()
+        self._jsonl.close()
+
+    def __enter__(self) -> "ResultsSink":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_schema(directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    path = os.path.join(directory or settings.results_dir, SCHEMA_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+    except FileNotFoundError:
+        return None
+    if schema.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"Results schema version {schema.get('version')} != {SCHEMA_VERSION} in {path}")
+    return schema
+
+
+def load_columns(directory: Optional[str] = None) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Memory-map the result columns without reading them
+    Returns: ({column: read-only array of schema["rows"] rows}, schema)
+    """
+    directory = directory or settings.results_dir
+    schema = load_schema(directory)
+    if schema is None:
+        raise FileNotFoundError(f"No results in {directory}")
+    columns = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")[:schema["rows"]]
+        for name in schema["columns"]
+    }
+    return columns, schema
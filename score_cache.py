@@ -0,0 +1,186 @@
+"""
+Persistent content-addressed cache of article scores
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import HIGH_VALUE_KEYWORDS, SCORE_CACHE_CONFIG, SCORING_CONFIG, get_topic_scores, settings
+
+
+def config_fingerprint(
+    keywords: Optional[Dict] = None,
+    topic_scores: Optional[Dict[str, float]] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> str:
+    """Version fingerprint of the scoring configuration"""
+    payload = {
+        "keywords": keywords if keywords is not None else HIGH_VALUE_KEYWORDS,
+        "topic_scores": topic_scores if topic_scores is not None else get_topic_scores(),
+        "weights": weights if weights is not None else SCORING_CONFIG["weights"]
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def content_hash(article) -> str:
+    """Hash of the scored text of an article"""
+    digest = hashlib.sha256()
+    digest.update((article.title or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((article.content or "").encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class ScoreCache:
+    """
+    SQLite-backed score cache keyed by scorer, article id, content hash and
+    configuration fingerprint
+
+    A changed article body or a changed scoring configuration simply misses;
+    stale entries age out through size/age eviction.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = SCORE_CACHE_CONFIG["max_entries"],
+        max_age_hours: float = SCORE_CACHE_CONFIG["max_age_hours"]
+    ):
+        path = path or settings.score_cache_file
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_hours * 3600
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_evict = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS score_cache (
+                cache_key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_score_cache_created ON score_cache(created_at)")
+        self.conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(namespace: str, article, fingerprint: str) -> str:
+        return ScoreCache.hashed_key(namespace, fingerprint, article.id, content_hash(article))
+
+    @staticmethod
+    def hashed_key(namespace: str, fingerprint: str, article_id: str, digest: str) -> str:
+        """Key for an article known only by id and content hash"""
+        return f"{namespace}|{fingerprint}|{article_id}|{digest}"
+
+    def get(self, namespace: str, article, fingerprint: str) -> Optional[Any]:
+        """Return the cached value or None"""
+        return self.get_many(namespace, [article], fingerprint)[0]
+
+    def get_many(self, namespace: str, articles: List, fingerprint: str) -> List[Optional[Any]]:
+        """Look up several articles at once; None marks a miss"""
+        keys = [self.make_key(namespace, article, fingerprint) for article in articles]
+        found: Dict[str, Any] = {}
+        min_created = time.time() - self.max_age_seconds
+
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT cache_key, value FROM score_cache "
+                    f"WHERE cache_key IN ({placeholders}) AND created_at >= ?",
+                    (*chunk, min_created)
+                ).fetchall()
+                for cache_key, value in rows:
+                    try:
+                        found[cache_key] = pickle.loads(value)
+                    except Exception:
+                        continue
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        return [found.get(key) for key in keys]
+
+    def put(self, namespace: str, article, fingerprint: str, value: Any):
+        """Store a score"""
+        self.put_many(namespace, [article], fingerprint, [value])
+
+    def put_many(self, namespace: str, articles: List, fingerprint: str, values: List[Any]):
+        """Store several scores in one transaction"""
+        self._put_keys([self.make_key(namespace, article, fingerprint) for article in articles], values)
+
+    def put_hashed(self, namespace: str, fingerprint: str, articles: List[Tuple[str, str]], values: List[Any]):
+        """Store scores of (article id, content hash) pairs, without the article text"""
+        self._put_keys([self.hashed_key(namespace, fingerprint, *article) for article in articles], values)
+
+    def _put_keys(self, keys: List[str], values: List[Any]):
+        now = time.time()
+        rows = [(key, pickle.dumps(value), now) for key, value in zip(keys, values)]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO score_cache (cache_key, value, created_at) VALUES (?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+            self._puts_since_evict += len(rows)
+            evict_due = self._puts_since_evict >= max(100, self.max_entries // 10)
+
+        if evict_due:
+            self.evict()
+
+    def evict(self):
+        """Drop entries older than max age, then the oldest beyond max_entries"""
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM score_cache WHERE created_at < ?",
+                (time.time() - self.max_age_seconds,)
+            )
+            self.conn.execute(
+                """
+                DELETE FROM score_cache WHERE cache_key IN (
+                    SELECT cache_key FROM score_cache
+                    ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+            self.conn.commit()
+            self._puts_since_evict = 0
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self.conn.execute("DELETE FROM score_cache")
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM score_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": size
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,128 @@
+"""
+Concurrent, rate-limited scoring pipeline
+"""
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from keyword_scorer import Article, KeywordScorer
+from rate_limiter import RateLimiter
+
+
+def estimate_tokens(articles: List[Article], prompt_overhead: int = 150) -> int:
+    """Rough LLM token estimate: ~4 characters per token plus prompt overhead"""
+    return sum(prompt_overhead + (len(article.title) + len(article.content)) // 4 for article in articles)
+
+
+# Per-process scorer for CPU-bound keyword scoring in process mode
+_process_scorer: Optional[KeywordScorer] = None
+
+
+def keyword_score_batch(articles: List[Article]) -> List[Tuple[float, dict]]:
+    """Process-pool worker: keyword-score a batch with the worker's own scorer"""
+    global _process_scorer
+    if _process_scorer is None:
+        _process_scorer = KeywordScorer()
+    return [(result["keyword_score"], result["details"]) for result in _process_scorer.score_articles_batch(articles)]
+
+
+class ScoringPipeline:
+    """
+    Scores a stream of articles on a worker pool
+
+    Articles are grouped into batches of batch_size; each batch is one unit
+    of work and one rate-limited request. At most max_in_flight batches are
+    queued or running, and results come back in input order regardless of
+    completion order. Use mode="thread" for I/O-bound scorers (AI APIs) and
+    mode="process" for CPU-bound keyword scoring (score_batch must then be a
+    picklable module-level function such as keyword_score_batch).
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[Article]], List[Any]],
+        workers: int = 1,
+        mode: str = "thread",
+        batch_size: int = 1,
+        limiter: Optional[RateLimiter] = None,
+        max_in_flight: Optional[int] = None,
+        token_estimator: Callable[[List[Article]], int] = estimate_tokens,
+        lookup: Optional[Callable[[Article], Optional[Any]]] = None
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+        self.score_batch = score_batch
+        self.workers = max(1, workers)
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.limiter = limiter
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.token_estimator = token_estimator
+        self.lookup = lookup
+
+    def _executor(self):
+        if self.mode == "process":
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def _batches(self, articles: Iterable[Article]) -> Iterator[Tuple[List[Article], List[Any]]]:
+        """Group articles into batches; pre-resolved (cached) results ride along"""
+        batch: List[Article] = []
+        for article in articles:
+            result = self.lookup(article) if self.lookup is not None else None
+            if result is not None:
+                # Flush so cached items keep their place in the output order
+                if batch:
+                    yield batch, [None] * len(batch)
+                    batch = []
+                yield [article], [result]
+                continue
+            batch.append(article)
+            if len(batch) >= self.batch_size:
+                yield batch, [None] * len(batch)
+                batch = []
+        if batch:
+            yield batch, [None] * len(batch)
+
+    def run(self, articles: Iterable[Article]) -> Iterator[Tuple[Article, Any, Optional[Exception]]]:
+        """
+        Score articles, yielding (article, result, error) in input order
+
+        result is None and error is set when a batch failed.
+        """
+        pending: deque = deque()
+
+        def drain_one():
+            batch, resolved, future = pending.popleft()
+            if future is None:
+                for article, result in zip(batch, resolved):
+                    yield article, result, None
+                return
+            try:
+                results = future.result()
+            except Exception as e:
+                for article in batch:
+                    yield article, None, e
+                return
+            for article, result in zip(batch, results):
+                yield article, result, None
+
+        with self._executor() as executor:
+            for batch, resolved in self._batches(articles):
+                # Hand back whatever is already finished before possibly
+                # blocking on the rate limiter
+                while pending and (pending[0][2] is None or pending[0][2].done()):
+                    yield from drain_one()
+
+                future: Optional[Future] = None
+                if resolved[0] is None:
+                    if self.limiter is not None:
+                        self.limiter.acquire(self.token_estimator(batch))
+                    future = executor.submit(self.score_batch, batch)
+                pending.append((batch, resolved, future))
+
+                while len(pending) > self.max_in_flight:
+                    yield from drain_one()
+
+            while pending:
+                yield from drain_one()
@@ -0,0 +1,274 @@
+"""
+Offline semantic scoring: hashed TF-IDF vectors against per-topic centroids
+"""
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import SEMANTIC_CONFIG
+from keyword_scorer import Article, KeywordScorer
+from metrics import METRICS
+
+# Sparse matrix as coordinate arrays: (rows, columns, values)
+SparseRows = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Distinct words whose hashes are remembered between batches
+_HASH_CACHE_SIZE = 500000
+
+# Odd 64-bit constant mixing two word hashes into a bigram hash
+_BIGRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class _HashCache(dict):
+    """word -> crc32, computed on first lookup"""
+
+    def __missing__(self, word: str) -> int:
+        value = self[word] = zlib.crc32(word.encode("utf-8"))
+        return value
+
+
+class HashedTfidfVectorizer:
+    """
+    TF-IDF over KeywordScorer.extract_keywords terms and their bigrams,
+    hashed into a fixed number of columns
+
+    Words are hashed with crc32 (stable across processes) and bigram hashes
+    are mixed from their two word hashes, with one hash bit choosing the
+    sign so colliding terms tend to cancel out instead of adding up.
+    Document frequencies are kept per column, so memory stays fixed
+    however many distinct words are seen. Unlike scikit-learn's
+    TfidfTransformer, the IDF grows batch by batch (partial_fit) as
+    articles stream in, and terms are the KeywordScorer tokens.
+    """
+
+    def __init__(
+        self,
+        n_features: int = SEMANTIC_CONFIG["n_features"],
+        bigrams: bool = SEMANTIC_CONFIG["bigrams"],
+        sublinear_tf: bool = SEMANTIC_CONFIG["sublinear_tf"]
+    ):
+        self.n_features = n_features
+        self.bigrams = bigrams
+        self.sublinear_tf = sublinear_tf
+        self.document_frequency = np.zeros(n_features, dtype=np.float64)
+        self.documents = 0
+        self._hash_cache = _HashCache()
+        self._lock = threading.Lock()
+
+    def _word_hashes(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(row, crc32) for every word, in text order"""
+        cache = self._hash_cache
+        if len(cache) > _HASH_CACHE_SIZE:
+            cache.clear()
+        rows: List[int] = []
+        hashes: List[int] = []
+        for row, text in enumerate(texts):
+            words = KeywordScorer.extract_keywords(text)
+            hashes.extend(map(cache.__getitem__, words))
+            rows.extend([row] * len(words))
+        return np.array(rows, dtype=np.int64), np.array(hashes, dtype=np.uint64)
+
+    def _hashed_terms(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(row, column, sign) for every term occurrence"""
+        rows, hashes = self._word_hashes(texts)
+        if self.bigrams and len(rows) > 1:
+            # Bigram hashes are mixed from the word hashes instead of hashing joined strings
+            same_text = rows[1:] == rows[:-1]
+            pairs = (hashes[:-1] * _BIGRAM_MULTIPLIER + hashes[1:]) & np.uint64(0xFFFFFFFF)
+            rows = np.concatenate([rows, rows[1:][same_text]])
+            hashes = np.concatenate([hashes, pairs[same_text]])
+        hashed = hashes.astype(np.int64)
+        signs = np.where(hashed & 0x80000000, -1.0, 1.0)
+        return rows, (hashed & 0x7FFFFFFF) % self.n_features, signs
+
+    def term_frequencies(self, texts: Sequence[str]) -> SparseRows:
+        """Signed, summed term counts per (row, column), duplicates merged"""
+        rows, columns, signs = self._hashed_terms(texts)
+        if not len(rows):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        keys, inverse = np.unique(rows * self.n_features + columns, return_inverse=True)
+        counts = np.bincount(inverse, weights=signs)
+        return keys // self.n_features, keys % self.n_features, counts
+
+    def partial_fit(self, frequencies: SparseRows, documents: int):
+        """Add a batch of documents to the document frequencies"""
+        _, columns, _ = frequencies
+        with self._lock:
+            self.document_frequency += np.bincount(columns, minlength=self.n_features)
+            self.documents += documents
+
+    def idf(self, columns: np.ndarray) -> np.ndarray:
+        """Smoothed inverse document frequency of the given columns"""
+        with self._lock:
+            documents = self.documents
+            frequency = self.document_frequency[columns]
+        return np.log((1.0 + documents) / (1.0 + frequency)) + 1.0
+
+    def transform(self, texts: Sequence[str], update_idf: bool = False) -> SparseRows:
+        """L2-normalized TF-IDF rows"""
+        frequencies = self.term_frequencies(texts)
+        if update_idf:
+            self.partial_fit(frequencies, len(texts))
+        rows, columns, counts = frequencies
+        if self.sublinear_tf:
+            # Colliding terms can cancel out to a zero count
+            magnitudes = np.abs(counts)
+            values = np.where(magnitudes > 0, np.sign(counts) * (1.0 + np.log(np.maximum(magnitudes, 1.0))), 0.0)
+        else:
+            values = counts
+        values = values * self.idf(columns)
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(norms[rows] > 0, values / norms[rows], 0.0)
+        return rows, columns, values
+
+
+class SemanticScorer:
+    """
+    Scores articles by cosine similarity of their TF-IDF vectors to one
+    centroid per topic
+
+    Centroids start from the topic's keyword lists (negative keywords pull
+    away at half weight) and can be refined with add_examples() from
+    highly rated articles. The 0-100 score is the similarity-weighted
+    topic preference, pulled towards the neutral 30 when even the best
+    similarity is weak. Runs fully offline.
+    """
+
+    def __init__(
+        self,
+        keywords: Optional[Dict] = None,
+        topic_scores: Optional[Dict[str, float]] = None,
+        vectorizer: Optional[HashedTfidfVectorizer] = None,
+        update_idf: bool = True
+    ):
+        self.vectorizer = vectorizer or HashedTfidfVectorizer()
+        self.update_idf = update_idf
+        self.keyword_scorer = KeywordScorer(keywords=keywords, topic_scores=topic_scores)
+        self.full_confidence_similarity = SEMANTIC_CONFIG["full_confidence_similarity"]
+        self.example_weight = SEMANTIC_CONFIG["example_weight"]
+        self._examples: Dict[str, Tuple[np.ndarray, int]] = {}
+        self._lock = threading.Lock()
+        self._centroids_for: Optional[str] = None
+        self._build_centroids()
+
+    def _build_centroids(self):
+        """(Re)build the topic x feature centroid matrix from the current topic model"""
+        model = self.keyword_scorer.model
+        topics = model.topics
+        centroids = np.zeros((len(topics), self.vectorizer.n_features), dtype=np.float32)
+        for index, topic in enumerate(topics):
+            topic_keywords = model.keywords.get(topic, {})
+            for polarity, sign in (("positive", 1.0), ("negative", -0.5)):
+                phrases = topic_keywords.get(polarity, [])
+                if phrases:
+                    centroids[index] += sign * self._phrase_vector(phrases)
+            example_sum, example_count = self._examples.get(topic, (None, 0))
+            if example_count:
+                centroids[index] = _unit(centroids[index]) + self.example_weight * _unit(example_sum / example_count)
+            centroids[index] = _unit(centroids[index])
+        with self._lock:
+            self.topics = topics
+            self.topic_score_vector = model.topic_score_vector
+            self.centroids = centroids
+            self._centroids_for = model.fingerprint
+
+    def _phrase_vector(self, phrases: List[str]) -> np.ndarray:
+        """Sum of the unit term-frequency vectors of the given phrases (no IDF: they are short)"""
+        rows, columns, counts = self.vectorizer.term_frequencies(phrases)
+        norms = np.sqrt(np.bincount(rows, weights=counts * counts, minlength=len(phrases)))
+        vector = np.zeros(self.vectorizer.n_features, dtype=np.float32)
+        np.add.at(vector, columns, counts / np.where(norms[rows] > 0, norms[rows], 1.0))
+        return vector
+
+    def add_examples(self, topic: str, articles: Iterable[Article]):
+        """Pull a topic centroid towards highly rated articles of that topic"""
+        articles = list(articles)
+        if not articles or topic not in self.keyword_scorer.model.topics:
+            return
+        rows, columns, values = self.vectorizer.transform([article.normalized_text for article in articles])
+        vector = np.zeros(self.vectorizer.n_features, dtype=np.float32)
+        np.add.at(vector, columns, values)
+        previous, count = self._examples.get(topic, (np.zeros_like(vector), 0))
+        self._examples[topic] = (previous + vector, count + len(articles))
+        self._build_centroids()
+
+    def add_rated_articles(self, rated: Iterable[Tuple[Article, str, float]], min_score: float = SEMANTIC_CONFIG["min_example_score"]):
+        """add_examples() for every (article, topic, score) scoring at least min_score"""
+        by_topic: Dict[str, List[Article]] = {}
+        for article, topic, score in rated:
+            if score >= min_score:
+                by_topic.setdefault(topic, []).append(article)
+        for topic, articles in by_topic.items():
+            self.add_examples(topic, articles)
+
+    def _topic_state(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """(topics, topic score vector, centroids), read together under the lock"""
+        if self.keyword_scorer.model.fingerprint != self._centroids_for:
+            self._build_centroids()
+        with self._lock:
+            return self.topics, self.topic_score_vector, self.centroids
+
+    def similarities(self, articles: Sequence[Article]) -> np.ndarray:
+        """Cosine similarity of each article to each topic centroid (articles x topics)"""
+        _, _, centroids = self._topic_state()
+        return self._similarities(articles, centroids)
+
+    def _similarities(self, articles: Sequence[Article], centroids: np.ndarray) -> np.ndarray:
+        rows, columns, values = self.vectorizer.transform(
+            [article.normalized_text for article in articles], update_idf=self.update_idf
+        )
+        similarities = np.zeros((len(articles), len(centroids)))
+        for topic in range(len(centroids)):
+            similarities[:, topic] = np.bincount(rows, weights=values * centroids[topic, columns], minlength=len(articles))
+        return similarities
+
+    def _scores(self, similarities: np.ndarray, topic_score_vector: np.ndarray) -> np.ndarray:
+        positive = np.maximum(similarities, 0)
+        total = positive.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            preference = np.where(total > 0, positive @ topic_score_vector / total, 30.0)
+        confidence = np.minimum(1.0, positive.max(axis=1, initial=0.0) / self.full_confidence_similarity)
+        return 30.0 + confidence * (preference - 30.0)
+
+    def score_article(self, article: Article) -> Tuple[float, Dict[str, any]]:
+        """
+        Score one article
+        Returns: (score, details)
+        """
+        result = self.score_articles_batch([article])[0]
+        return result["semantic_score"], result["details"]
+
+    @METRICS.timed("semantic_batch_seconds")
+    def score_articles_batch(self, articles: List[Article]) -> List[Dict[str, any]]:
+        """Score multiple articles with one sparse-dense product"""
+        if not articles:
+            return []
+        # One consistent snapshot, even if the topic model is swapped meanwhile
+        topics, topic_score_vector, centroids = self._topic_state()
+        similarities = self._similarities(articles, centroids)
+        scores = self._scores(similarities, topic_score_vector)
+        METRICS.increment("semantic_articles_scored_total", len(articles))
+
+        results = []
+        for article, score, row in zip(articles, scores.tolist(), similarities.tolist()):
+            topic_similarities = dict(zip(topics, row))
+            best_topic = max(topic_similarities, key=topic_similarities.get) if max(row, default=0) > 0 else None
+            results.append({
+                "article": article,
+                "semantic_score": score,
+                "details": {
+                    "topic_similarities": topic_similarities,
+                    "best_topic": best_topic,
+                },
+                "scoring_method": "semantic"
+            })
+        return results
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
@@ -0,0 +1,130 @@
+"""
+Incremental parsing of large Google Reader JSON responses
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Union
+
+_WHITESPACE_RE = re.compile(r'\s*')
+
+# Drop consumed text from the front of the buffer once it exceeds this
+_COMPACT_THRESHOLD = 1 << 16
+
+
+class _Buffer:
+    """Growing text window over a stream of byte or str chunks"""
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def read_more(self) -> bool:
+        """Append the next non-empty chunk; False once the stream has ended"""
+        while not self.exhausted:
+            try:
+                chunk = next(self.chunks)
+            except StopIteration:
+                self.exhausted = True
+                tail = self.decoder.decode(b"", final=True)
+                if tail:
+                    self.text += tail
+                    return True
+                return False
+            if isinstance(chunk, bytes):
+                chunk = self.decoder.decode(chunk)
+            if chunk:
+                if self.pos > _COMPACT_THRESHOLD:
+                    self.text = self.text[self.pos:]
+                    self.pos = 0
+                self.text += chunk
+                return True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character (consuming the whitespace), '' at end"""
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.read_more():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        """Decode one complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+                # A number or literal touching the end of the buffer may continue
+                if end < len(self.text) or self.exhausted:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+            self.read_more()
+
+
+def iter_json_array_items(
+    chunks: Iterable[Union[bytes, str]],
+    array_key: str = "items",
+    meta: Dict[str, Any] = None
+) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level array field of a JSON object one by one
+
+    Only one element (plus the current read chunk) is held in memory at a
+    time. Every other top-level field (e.g. 'continuation', which follows
+    'items' in FreshRSS responses) is stored in meta as it is parsed, so
+    meta is complete only once the generator is exhausted; meta[array_key]
+    is set to True when the array field was present.
+    """
+    if meta is None:
+        meta = {}
+    buffer = _Buffer(chunks)
+    decoder = json.JSONDecoder()
+
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        buffer.pos += 1
+        return
+
+    while True:
+        key = buffer.value(decoder)
+        if not isinstance(key, str):
+            raise ValueError(f"Expected an object key at offset {buffer.pos}")
+        buffer.expect(":")
+
+        if key == array_key and buffer.peek() == "[":
+            buffer.pos += 1
+            meta[array_key] = True
+            if buffer.peek() == "]":
+                buffer.pos += 1
+            else:
+                while True:
+                    yield buffer.value(decoder)
+                    separator = buffer.peek()
+                    buffer.pos += 1
+                    if separator == "]":
+                        break
+                    if separator != ",":
+                        raise ValueError(f"Expected ',' or ']' in {array_key!r} at offset {buffer.pos - 1}")
+        else:
+            meta[key] = buffer.value(decoder)
+
+        separator = buffer.peek()
+        buffer.pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' at offset {buffer.pos - 1}")
@@ -0,0 +1,47 @@
+"""
+HTML-to-text normalization for fetched article content
+"""
+import html
+import re
+
+from config import MAX_ARTICLE_TEXT_CHARS
+
+# Compiled once; applied in this order
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style|noscript)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _collapse_whitespace(text: str) -> str:
+    # str.split() is a C-level whitespace scan, much faster than re.sub(r'\s+')
+    return ' '.join(text.split())
+
+
+def html_to_text(content: str, max_chars: int = MAX_ARTICLE_TEXT_CHARS) -> str:
+    """
+    Convert an HTML fragment to plain text
+
+    Drops script/style bodies and comments, replaces tags with spaces,
+    decodes entities, collapses whitespace and caps the length.
+    """
+    if not content:
+        return ''
+    if '<' in content:
+        content = _SCRIPT_STYLE_RE.sub(' ', content)
+        content = _COMMENT_RE.sub(' ', content)
+        content = _TAG_RE.sub(' ', content)
+    if '&' in content:
+        content = html.unescape(content)
+    return _collapse_whitespace(content)[:max_chars]
+
+
+def decode_title(title: str) -> str:
+    """Decode entities and flatten whitespace in a feed title"""
+    if '&' in title:
+        title = html.unescape(title)
+    return _collapse_whitespace(title)
+
+
+def normalize_for_matching(text: str) -> str:
+    """Lowercase, whitespace-collapsed form of already plain text"""
+    return _collapse_whitespace(text.lower())
@@ -0,0 +1,246 @@
+"""
+Compiled topic model: everything KeywordScorer derives from the keyword
+table and topic scores, precomputed once and stored as a versioned artifact
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import HIGH_VALUE_KEYWORDS, TOPIC_MODEL_CHECK_SECONDS, get_topic_scores, settings
+from keyword_matcher import KeywordMatcher
+from score_cache import config_fingerprint
+
+# Bump when the artifact layout or any derived field changes
+TOPIC_MODEL_FORMAT = "rss-ai-scorer/topic-model"
+TOPIC_MODEL_VERSION = 2
+
+
+class CompiledTopicModel:
+    """
+    Immutable, precompiled scoring tables
+
+    topics                 topic names, the column order of every matrix
+    matcher                single-pass KeywordMatcher over all phrases
+    phrase_targets         phrase id -> [(topic, polarity, weight)]
+    phrase_topic_entries   phrase id -> [(topic index, positive weight, negative weight)]
+    phrase_topic_weights   phrases x topics net weight matrix for batch scoring
+    topic_score_vector     topic preference per column (default 50)
+    fingerprint            config_fingerprint of the sources, also the cache key
+    """
+
+    # Derived fields stored in the artifact's JSON header next to the sources;
+    # phrase_topic_weights is stored as its own array
+    _TABLES = ("topics", "phrase_targets", "phrase_topic_entries", "topic_score_list")
+
+    def __init__(self, keywords: Dict, topic_scores: Dict[str, float]):
+        self.keywords = keywords
+        self.topic_scores = topic_scores
+        self.fingerprint = config_fingerprint(keywords, topic_scores)
+        self.topics: List[str] = list(keywords.keys())
+        self.matcher = KeywordMatcher(
+            keyword
+            for topic_keywords in keywords.values()
+            for polarity in ("positive", "negative")
+            for keyword in topic_keywords.get(polarity, [])
+        )
+
+        topic_index = {topic: i for i, topic in enumerate(self.topics)}
+        
+        # Longer phrases weigh more: weight is the number of words
+        self.phrase_targets: List[List[Tuple[str, str, int]]] = [[] for _ in self.matcher.phrases]
+        for topic, topic_keywords in keywords.items():
+            for polarity in ("positive", "negative"):
+                for keyword in topic_keywords.get(polarity, []):
+                    phrase_id = self.matcher.phrase_ids.get(keyword.lower())
+                    if phrase_id is not None:
+                        self.phrase_targets[phrase_id].append((topic, polarity, len(keyword.split())))
+
+        self.phrase_topic_entries: List[List[Tuple[int, int, int]]] = [
+            [
+                (topic_index[topic], weight if polarity == "positive" else 0, weight if polarity != "positive" else 0)
+                for topic, polarity, weight in targets
+            ]
+            for targets in self.phrase_targets
+        ]
+
+        # Net weight: phrase length for positive terms, -0.5 x length for negative terms
+        self.phrase_topic_weights = np.zeros((len(self.matcher.phrases), len(self.topics)))
+        for phrase_id, entries in enumerate(self.phrase_topic_entries):
+            for column, positive, negative in entries:
+                self.phrase_topic_weights[phrase_id, column] += positive - 0.5 * negative
+
+        self.topic_score_list: List[float] = [topic_scores.get(topic, 50) for topic in self.topics]
+        self.topic_score_vector = np.array(self.topic_score_list, dtype=float)
+
+    @classmethod
+    def compile(cls, keywords: Optional[Dict] = None, topic_scores: Optional[Dict[str, float]] = None) -> "CompiledTopicModel":
+        """Build from the given sources, defaulting to the configured ones"""
+        return cls(
+            keywords if keywords is not None else HIGH_VALUE_KEYWORDS,
+            topic_scores if topic_scores is not None else get_topic_scores()
+        )
+
+    def save(self, path: str):
+        """
+        Atomically write the artifact (temp file + fsync + rename)
+
+        The artifact is an .npz with a JSON header and the weight matrix,
+        so loading it never unpickles anything from the data volume.
+        """
+        header = {
+            "format": TOPIC_MODEL_FORMAT,
+            "version": TOPIC_MODEL_VERSION,
+            "fingerprint": self.fingerprint,
+            "created_at": time.time(),
+            "keywords": self.keywords,
+            "topic_scores": self.topic_scores,
+            "matcher": self.matcher.state(),
+            "tables": {name: getattr(self, name) for name in self._TABLES},
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".topic-model-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, header=np.array(json.dumps(header)), phrase_topic_weights=self.phrase_topic_weights)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledTopicModel":
+        """Read an artifact; raises ValueError for foreign or outdated versions"""
+        with np.load(path, allow_pickle=False) as arrays:
+            payload = json.loads(str(arrays["header"]))
+            phrase_topic_weights = arrays["phrase_topic_weights"]
+        if not isinstance(payload, dict) or payload.get("format") != TOPIC_MODEL_FORMAT:
+            raise ValueError(f"{path} is not a topic model artifact")
+        if payload.get("version") != TOPIC_MODEL_VERSION:
+            raise ValueError(f"Topic model version {payload.get('version')} != {TOPIC_MODEL_VERSION}")
+        if config_fingerprint(payload["keywords"], payload["topic_scores"]) != payload["fingerprint"]:
+            raise ValueError(f"Topic model fingerprint mismatch in {path}")
+        
+        # Restore the precomputed tables instead of recompiling
+        model = cls.__new__(cls)
+        model.keywords = payload["keywords"]
+        model.topic_scores = payload["topic_scores"]
+        model.fingerprint = payload["fingerprint"]
+        model.matcher = KeywordMatcher.from_state(*payload["matcher"])
+        tables = payload["tables"]
+        model.topics = tables["topics"]
+        model.phrase_targets = [[tuple(target) for target in targets] for targets in tables["phrase_targets"]]
+        model.phrase_topic_entries = [[tuple(entry) for entry in entries] for entries in tables["phrase_topic_entries"]]
+        model.topic_score_list = tables["topic_score_list"]
+        model.phrase_topic_weights = phrase_topic_weights
+        model.topic_score_vector = np.array(model.topic_score_list, dtype=float)
+        return model
+
+
+class TopicModelStore:
+    """
+    Holds the current CompiledTopicModel and hot-swaps it when its sources change
+
+    current() is cheap: at most every check_seconds it checks whether the
+    topic score file (via get_topic_scores' mtime cache) or the artifact on
+    disk changed. A changed source is compiled and swapped in with a single
+    reference assignment; scoring calls that already took the old model
+    finish with it, and only one thread rebuilds while the others keep
+    using the current model.
+
+    A rebuilt model is only saved when the artifact path was passed in or
+    set with TOPIC_MODEL_FILE, so constructing a scorer does not write to
+    data/ under whatever directory it runs from. --compile-topic-model
+    writes the default artifact explicitly.
+    """
+
+    def __init__(
+        self,
+        artifact_path: Optional[str] = None,
+        keywords: Optional[Dict] = None,
+        check_seconds: float = TOPIC_MODEL_CHECK_SECONDS
+    ):
+        self.save_artifact = artifact_path is not None or settings.getenv("TOPIC_MODEL_FILE") is not None
+        self.artifact_path = artifact_path or settings.topic_model_file
+        self.keywords = keywords if keywords is not None else HIGH_VALUE_KEYWORDS
+        self.check_seconds = check_seconds
+        self.swaps = 0
+        self._rebuild_lock = threading.Lock()
+        self._checked_at = 0.0
+        self._topic_scores: Optional[Dict[str, float]] = None
+        self._artifact_mtime: Optional[int] = None
+        self._model: Optional[CompiledTopicModel] = None
+        self.refresh(force=True)
+
+    def current(self) -> CompiledTopicModel:
+        """The model to use for one scoring call"""
+        if time.monotonic() - self._checked_at >= self.check_seconds:
+            self.refresh()
+        return self._model
+
+    def _artifact_mtime_ns(self) -> Optional[int]:
+        try:
+            return os.stat(self.artifact_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh(self, force: bool = False) -> bool:
+        """Swap in a new model if a source changed; returns True on swap"""
+        if not self._rebuild_lock.acquire(blocking=force):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            topic_scores = get_topic_scores()
+            artifact_mtime = self._artifact_mtime_ns()
+            if not force and topic_scores is self._topic_scores and artifact_mtime == self._artifact_mtime:
+                return False
+
+            expected = config_fingerprint(self.keywords, topic_scores)
+            model = None
+            if artifact_mtime is not None:
+                try:
+                    loaded = CompiledTopicModel.load(self.artifact_path)
+                    if loaded.fingerprint == expected:
+                        model = loaded
+                except Exception as e:
+                    print(f"⚠️  Ignoring topic model artifact: {e}")
+
+            if model is None:
+                model = CompiledTopicModel(self.keywords, topic_scores)
+                if self.save_artifact:
+                    try:
+                        model.save(self.artifact_path)
+                        artifact_mtime = self._artifact_mtime_ns()
+                    except Exception as e:
+                        print(f"⚠️  Could not save topic model artifact: {e}")
+
+            self._topic_scores = topic_scores
+            self._artifact_mtime = artifact_mtime
+            if self._model is None or model.fingerprint != self._model.fingerprint:
+                self._model = model
+                self.swaps += 1
+                return True
+            return False
+        finally:
+            self._rebuild_lock.release()
+
+
+_default_store: Optional[TopicModelStore] = None
+_default_store_lock = threading.Lock()
+
+
+def default_topic_model_store() -> TopicModelStore:
+    """Process-wide store over the configured keywords, topic scores and artifact"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TopicModelStore()
+        return _default_store
@@ -0,0 +1,135 @@
+"""
+Long-running watch mode: repeat scoring cycles at an interval that follows
+the article arrival rate, until SIGTERM/SIGINT
+"""
+import signal
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+from config import WATCH_CONFIG
+from metrics import METRICS
+
+
+class AdaptiveInterval:
+    """
+    Seconds to wait between polls
+
+    Aims for target_articles per cycle: the interval is target_articles
+    divided by the arrival rate, an exponential moving average of observed
+    articles per second, clamped to [min_seconds, max_seconds]. Quiet
+    cycles back off by backoff_factor; a cycle that hit its article limit
+    (a backlog) polls again after min_seconds.
+    """
+
+    def __init__(
+        self,
+        initial_seconds: float = WATCH_CONFIG["initial_seconds"],
+        min_seconds: float = WATCH_CONFIG["min_seconds"],
+        max_seconds: float = WATCH_CONFIG["max_seconds"],
+        target_articles: int = WATCH_CONFIG["target_articles"],
+        smoothing: float = WATCH_CONFIG["smoothing"],
+        backoff_factor: float = WATCH_CONFIG["backoff_factor"]
+    ):
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.target_articles = target_articles
+        self.smoothing = smoothing
+        self.backoff_factor = backoff_factor
+        self.seconds = self._clamp(initial_seconds)
+        self.rate: Optional[float] = None  # Articles per second
+
+    def _clamp(self, seconds: float) -> float:
+        return min(self.max_seconds, max(self.min_seconds, seconds))
+
+    def update(self, arrivals: int, elapsed_seconds: Optional[float], saturated: bool = False) -> float:
+        """
+        Record one cycle's arrivals over the time since the previous poll
+        (None for the first poll, whose backlog says nothing about the rate)
+        Returns: the next interval
+        """
+        if elapsed_seconds is not None and elapsed_seconds > 0:
+            observed = arrivals / elapsed_seconds
+            self.rate = observed if self.rate is None else self.smoothing * observed + (1 - self.smoothing) * self.rate
+
+        if saturated:
+            self.seconds = self.min_seconds
+        elif arrivals == 0:
+            self.seconds = self._clamp(self.seconds * self.backoff_factor)
+        elif self.rate:
+            self.seconds = self._clamp(self.target_articles / self.rate)
+        return self.seconds
+
+
+class Watcher:
+    """
+    Runs cycle() repeatedly until stopped
+
+    cycle() returns the number of new articles it handled. The first
+    SIGTERM or SIGINT lets the running cycle finish (so its sync watermark
+    is committed) and then exits; a second one interrupts immediately.
+    Errors in one cycle are reported and the next cycle runs as usual.
+    """
+
+    def __init__(
+        self,
+        cycle: Callable[[], int],
+        interval: Optional[AdaptiveInterval] = None,
+        limit: Optional[int] = None,
+        after_cycle: Optional[Callable[[], None]] = None,
+        verbose: bool = False
+    ):
+        self.cycle = cycle
+        self.interval = interval or AdaptiveInterval()
+        self.limit = limit
+        self.after_cycle = after_cycle
+        self.verbose = verbose
+        self.cycles = 0
+        self._stop = threading.Event()
+
+    def stop(self, signum=None, frame=None):
+        if self._stop.is_set():
+            raise KeyboardInterrupt
+        if signum is not None:
+            print(f"\n⏹️  {signal.Signals(signum).name} received, stopping after this cycle...")
+        self._stop.set()
+
+    def install_signal_handlers(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.stop)
+
+    def run(self, max_cycles: Optional[int] = None):
+        """Poll until stopped (or max_cycles cycles)"""
+        last_poll = None
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.cycles += 1
+            print(f"\n👀 Watch cycle {self.cycles} ({time.strftime('%H:%M:%S')})")
+            try:
+                arrivals = self.cycle()
+            except Exception as e:
+                METRICS.increment("watch_cycle_errors_total")
+                print(f"❌ Error in watch cycle: {e}")
+                if self.verbose:
+                    traceback.print_exc()
+                arrivals = 0
+            duration = time.monotonic() - started
+            METRICS.increment("watch_cycles_total")
+            METRICS.observe("watch_cycle_seconds", duration)
+
+            elapsed = started - last_poll if last_poll is not None else None
+            last_poll = started
+            saturated = self.limit is not None and arrivals >= self.limit
+            seconds = self.interval.update(arrivals, elapsed, saturated)
+            METRICS.set_gauge("watch_interval_seconds", seconds)
+            if self.after_cycle is not None:
+                self.after_cycle()
+
+            if max_cycles is not None and self.cycles >= max_cycles:
+                break
+            if not self._stop.is_set():
+                rate = f"{self.interval.rate * 3600:.0f}/h" if self.interval.rate is not None else "unknown"
+                print(f"💤 {arrivals} new articles, arrival rate {rate}; next poll in {seconds:.0f}s")
+            self._stop.wait(seconds)
+        print(f"👋 Watch mode stopped after {self.cycles} cycles")